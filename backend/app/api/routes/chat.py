@@ -1,16 +1,27 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import logging
-from datetime import datetime
+import asyncio
 
 from app.services.rag_service import RAGService
-from app.main import get_rag_service
+from app.services.batching import BatchingQueue
+from app.core.cache import ResponseCache
+from app.main import get_rag_service, get_response_cache, get_chat_batcher
+from app.core.time_cache import TimeCache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+CHAT_LOG_BATCH_SIZE = 500
+CHAT_LOG_FLUSH_INTERVAL = 0.1  # seconds
+
+# Chat interactions waiting to be written by the background writer
+_log_queue: asyncio.Queue = asyncio.Queue(maxsize=10000)
+_log_writer_task: Optional[asyncio.Task] = None
+
 class ChatRequest(BaseModel):
     query: str
     session_id: Optional[str] = "default"
@@ -30,12 +41,27 @@ class ChatResponse(BaseModel):
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    background_tasks: BackgroundTasks,
-    rag_service: RAGService = Depends(get_rag_service)
+    rag_service: RAGService = Depends(get_rag_service),
+    cache: ResponseCache = Depends(get_response_cache),
+    batcher: BatchingQueue = Depends(get_chat_batcher)
 ):
     """Process chat message and return AI response"""
     try:
-        logger.info(f"Processing chat request: {request.query[:100]}...")
+        logger.info("Processing chat request: %.100s...", request.query)
+        
+        # Serve repeated queries from the response cache
+        cache_key = cache.make_key(request.session_id, request.query, request.location)
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Chat cache hit for session %s", request.session_id)
+            rag_service.record_exchange(request.session_id, request.query, cached["answer"])
+            log_chat_interaction(
+                request.query,
+                cached["answer"],
+                request.session_id,
+                cached["confidence"]
+            )
+            return ORJSONResponse({**cached, "timestamp": TimeCache.iso()})
         
         # Process query with RAG
         if request.location:
@@ -43,32 +69,37 @@ async def chat(
                 request.query, request.location
             )
         else:
-            rag_response = await rag_service.process_query(
-                request.query, request.session_id
-            )
+            rag_response = await batcher.submit(request.query, request.session_id)
         
         # Log successful response
-        background_tasks.add_task(
-            log_chat_interaction,
+        log_chat_interaction(
             request.query,
             rag_response.answer,
             request.session_id,
             rag_response.confidence
         )
         
-        return ChatResponse(
-            answer=rag_response.answer,
-            sources=rag_response.sources,
-            entities=rag_response.entities,
-            confidence=rag_response.confidence,
-            session_id=request.session_id,
-            timestamp=datetime.utcnow().isoformat(),
-            query_type=rag_response.query_type,
-            reasoning=rag_response.reasoning
-        )
+        # Build the ChatResponse payload directly; returning a Response skips
+        # FastAPI's re-validation of data we produced ourselves
+        response = {
+            "answer": rag_response.answer,
+            "sources": rag_response.sources,
+            "entities": rag_response.entities,
+            "confidence": rag_response.confidence,
+            "session_id": request.session_id,
+            "timestamp": TimeCache.iso(),
+            "query_type": rag_response.query_type,
+            "reasoning": rag_response.reasoning
+        }
+        
+        # Don't cache error fallbacks
+        if rag_response.query_type != "error":
+            await cache.set(cache_key, response)
+        
+        return ORJSONResponse(response)
         
     except Exception as e:
-        logger.error(f"Chat processing error: {e}")
+        logger.error("Chat processing error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing chat request: {str(e)}"
@@ -82,14 +113,15 @@ async def get_chat_history(
 ):
     """Get chat history for a session"""
     try:
-        history = await rag_service.get_conversation_history(session_id)
+        # Only the last N messages are fetched from the service
+        history = await rag_service.get_conversation_history(session_id, limit=limit)
         return {
             "session_id": session_id,
-            "history": history[-limit:],  # Return last N messages
-            "total_messages": len(history)
+            "history": history,
+            "total_messages": await rag_service.get_conversation_length(session_id)
         }
     except Exception as e:
-        logger.error(f"Error retrieving chat history: {e}")
+        logger.error("Error retrieving chat history: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving chat history: {str(e)}"
@@ -98,23 +130,73 @@ async def get_chat_history(
 @router.delete("/chat/history/{session_id}")
 async def clear_chat_history(
     session_id: str,
-    rag_service: RAGService = Depends(get_rag_service)
+    rag_service: RAGService = Depends(get_rag_service),
+    cache: ResponseCache = Depends(get_response_cache)
 ):
     """Clear chat history for a session"""
     try:
         await rag_service.clear_conversation_history(session_id)
+        await cache.invalidate_session(session_id)
         return {"message": f"Chat history cleared for session {session_id}"}
     except Exception as e:
-        logger.error(f"Error clearing chat history: {e}")
+        logger.error("Error clearing chat history: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error clearing chat history: {str(e)}"
         )
 
-async def log_chat_interaction(query: str, response: str, session_id: str, confidence: float):
-    """Background task to log chat interactions"""
+def log_chat_interaction(query: str, response: str, session_id: str, confidence: float):
+    """Queue a chat interaction for the batched background writer"""
+    try:
+        _log_queue.put_nowait({
+            "query": query,
+            "response": response,
+            "session_id": session_id,
+            "confidence": confidence,
+            "timestamp": TimeCache.iso()
+        })
+    except asyncio.QueueFull:
+        logger.warning("Chat log queue full, dropping interaction for session %s", session_id)
+
+async def write_chat_interactions(records: List[Dict[str, Any]]):
+    """Write a batch of chat interactions"""
     try:
-        # This would typically log to a database or analytics service
-        logger.info(f"Chat interaction logged - Session: {session_id}, Confidence: {confidence}")
+        # This would typically be a single bulk insert into a database or analytics service
+        for record in records:
+            logger.info("Chat interaction logged - Session: %s, Confidence: %s",
+                        record["session_id"], record["confidence"])
     except Exception as e:
-        logger.error(f"Failed to log chat interaction: {e}")
\ No newline at end of file
+        logger.error("Failed to log chat interactions: %s", e)
+
+async def _chat_log_writer():
+    """Drain the log queue, flushing every CHAT_LOG_FLUSH_INTERVAL or CHAT_LOG_BATCH_SIZE records"""
+    loop = asyncio.get_running_loop()
+    while True:
+        records = [await _log_queue.get()]
+        deadline = loop.time() + CHAT_LOG_FLUSH_INTERVAL
+        while len(records) < CHAT_LOG_BATCH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                records.append(await asyncio.wait_for(_log_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        await write_chat_interactions(records)
+
+@router.on_event("startup")
+async def start_chat_log_writer():
+    global _log_writer_task
+    _log_writer_task = asyncio.create_task(_chat_log_writer())
+
+@router.on_event("shutdown")
+async def stop_chat_log_writer():
+    if _log_writer_task:
+        _log_writer_task.cancel()
+    
+    # Flush whatever is still queued
+    records = []
+    while not _log_queue.empty():
+        records.append(_log_queue.get_nowait())
+    if records:
+        await write_chat_interactions(records)
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Awaitable
 import logging
-from datetime import datetime
+import hashlib
+import orjson
 
 from app.services.enhanced_scraper import EnhancedMOSDACWebScraper
-from app.services.vector_search import VectorSearchService
+from app.services.vector_search import VectorSearchService, SearchResult
 from app.services.knowledge_graph import KnowledgeGraphService
+from app.services.cooccurrence import build_cooccurrence_relationships
 from app.main import get_vector_service, get_kg_service, get_scraper_service
+from app.core.time_cache import TimeCache
+from app.core.http_cache import make_etag, conditional_response
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +35,23 @@ class DataIngestionRequest(BaseModel):
     build_kg: Optional[bool] = True
     update_vectors: Optional[bool] = True
 
+# URL characters that are replaced when deriving document ids
+_URL_ID_TRANS = str.maketrans({char: '_' for char in '/?&:#=%'})
+MAX_URL_ID_LENGTH = 128
+
+def scraped_document_id(url: str) -> str:
+    """Stable vector-store id for a scraped URL; long URLs are hashed"""
+    slug = url.translate(_URL_ID_TRANS)
+    if len(slug) > MAX_URL_ID_LENGTH:
+        slug = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+    return f"scraped_{slug}"
+
+# Search implementations by search_type; unknown types fall back to semantic search
+SEARCH_DISPATCH: Dict[str, Callable[..., Awaitable[List[SearchResult]]]] = {
+    "semantic": VectorSearchService.search,
+    "hybrid": VectorSearchService.hybrid_search,
+}
+
 @router.post("/data/scrape", response_model=ScrapeResponse)
 async def start_scraping(
     request: ScrapeRequest,
@@ -40,7 +62,7 @@ async def start_scraping(
 ):
     """Start web scraping process"""
     try:
-        logger.info(f"Starting scraping with max_pages={request.max_pages}, max_depth={request.max_depth}")
+        logger.info("Starting scraping with max_pages=%s, max_depth=%s", request.max_pages, request.max_depth)
         
         # Start scraping in background
         background_tasks.add_task(
@@ -52,16 +74,16 @@ async def start_scraping(
             request.max_depth
         )
         
-        return ScrapeResponse(
-            status="started",
-            message="Scraping process started in background",
-            pages_scraped=0,
-            entities_extracted=0,
-            timestamp=datetime.utcnow().isoformat()
-        )
+        return ORJSONResponse({
+            "status": "started",
+            "message": "Scraping process started in background",
+            "pages_scraped": 0,
+            "entities_extracted": 0,
+            "timestamp": TimeCache.iso()
+        })
         
     except Exception as e:
-        logger.error(f"Error starting scraping: {e}")
+        logger.error("Error starting scraping: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error starting scraping: {str(e)}"
@@ -104,11 +126,11 @@ async def ingest_data(
             "status": "success",
             "message": "Data ingestion completed",
             "results": results,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": TimeCache.iso()
         }
         
     except Exception as e:
-        logger.error(f"Error ingesting data: {e}")
+        logger.error("Error ingesting data: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error ingesting data: {str(e)}"
@@ -116,6 +138,7 @@ async def ingest_data(
 
 @router.get("/data/statistics")
 async def get_data_statistics(
+    request: Request,
     vector_service: VectorSearchService = Depends(get_vector_service),
     kg_service: KnowledgeGraphService = Depends(get_kg_service)
 ):
@@ -124,14 +147,21 @@ async def get_data_statistics(
         vector_stats = await vector_service.get_statistics()
         kg_stats = await kg_service.get_graph_statistics()
         
-        return {
-            "vector_search": vector_stats,
-            "knowledge_graph": kg_stats,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+        # The ETag covers the statistics only, not the timestamp
+        etag = make_etag(orjson.dumps([vector_stats, kg_stats], option=orjson.OPT_SERIALIZE_NUMPY))
+        
+        return conditional_response(
+            request,
+            lambda: orjson.dumps({
+                "vector_search": vector_stats,
+                "knowledge_graph": kg_stats,
+                "timestamp": TimeCache.iso()
+            }, option=orjson.OPT_SERIALIZE_NUMPY),
+            etag=etag
+        )
         
     except Exception as e:
-        logger.error(f"Error getting statistics: {e}")
+        logger.error("Error getting statistics: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error getting statistics: {str(e)}"
@@ -146,14 +176,11 @@ async def search_data(
 ):
     """Search data using vector search"""
     try:
-        if search_type == "semantic":
-            results = await vector_service.search(query, k)
-        elif search_type == "hybrid":
-            results = await vector_service.hybrid_search(query, k)
-        else:
-            results = await vector_service.search(query, k)
+        search = SEARCH_DISPATCH.get(search_type, VectorSearchService.search)
+        results = await search(vector_service, query, k)
         
-        return {
+        # Serialize directly with orjson, bypassing jsonable_encoder
+        return ORJSONResponse({
             "query": query,
             "results": [
                 {
@@ -165,10 +192,10 @@ async def search_data(
                 for result in results
             ],
             "total_results": len(results)
-        }
+        })
         
     except Exception as e:
-        logger.error(f"Error searching data: {e}")
+        logger.error("Error searching data: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error searching data: {str(e)}"
@@ -179,14 +206,15 @@ async def search_entities(
     query: str,
     entity_type: Optional[str] = None,
     limit: int = 10,
+    skip: int = 0,
     kg_service: KnowledgeGraphService = Depends(get_kg_service)
 ):
     """Search entities in knowledge graph"""
     try:
         if entity_type:
-            results = await kg_service.find_entities_by_type(entity_type, limit)
+            results = await kg_service.find_entities_by_type(entity_type, limit, skip=skip)
         else:
-            results = await kg_service.search_entities(query, limit)
+            results = await kg_service.search_entities(query, limit, skip=skip)
         
         return {
             "query": query,
@@ -196,7 +224,7 @@ async def search_entities(
         }
         
     except Exception as e:
-        logger.error(f"Error searching entities: {e}")
+        logger.error("Error searching entities: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error searching entities: {str(e)}"
@@ -222,11 +250,12 @@ async def run_full_scraping_pipeline(
         
         # Step 2: Prepare documents for vector store
         documents = []
-        all_entities = []
+        # One entry per (url, text, type) so repeated mentions don't multiply KG work
+        unique_entities: Dict[tuple, Dict[str, Any]] = {}
         
         for item in scraped_data:
             documents.append({
-                'id': f"scraped_{item.url.replace('/', '_')}",
+                'id': scraped_document_id(item.url),
                 'content': item.content,
                 'metadata': {
                     'url': item.url,
@@ -239,37 +268,34 @@ async def run_full_scraping_pipeline(
             
             # Collect entities for knowledge graph
             for entity in item.entities:
-                all_entities.append({
-                    'text': entity['text'],
-                    'type': entity['type'],
-                    'confidence': entity.get('confidence', 0.8),
-                    'source_url': item.url,
-                    'source_title': item.title
-                })
+                key = (item.url, entity['text'], entity['type'])
+                confidence = entity.get('confidence', 0.8)
+                existing = unique_entities.get(key)
+                if existing is None:
+                    unique_entities[key] = {
+                        'text': entity['text'],
+                        'type': entity['type'],
+                        'confidence': confidence,
+                        'source_url': item.url,
+                        'source_title': item.title,
+                        'occurrences': 1
+                    }
+                else:
+                    existing['occurrences'] += 1
+                    existing['confidence'] = max(existing['confidence'], confidence)
+        
+        all_entities = list(unique_entities.values())
         
         # Step 3: Add to vector store
         vector_count = await vector_service.add_documents(documents)
-        logger.info(f"Added {vector_count} documents to vector store")
+        logger.info("Added %s documents to vector store", vector_count)
         
         # Step 4: Build knowledge graph
         # Generate simple relationships based on co-occurrence
-        relationships = []
-        for i, entity1 in enumerate(all_entities):
-            for entity2 in all_entities[i+1:i+10]:  # Limit to avoid explosion
-                if (entity1['source_url'] == entity2['source_url'] and 
-                    entity1['type'] != entity2['type']):
-                    relationships.append({
-                        'source': entity1['text'],
-                        'source_type': entity1['type'],
-                        'target': entity2['text'],
-                        'target_type': entity2['type'],
-                        'relation': 'co_occurs_with',
-                        'confidence': 0.6,
-                        'source_url': entity1['source_url']
-                    })
+        relationships = build_cooccurrence_relationships(all_entities)
         
         kg_stats = await kg_service.build_graph_from_entities(all_entities, relationships)
-        logger.info(f"Built knowledge graph: {kg_stats}")
+        logger.info("Built knowledge graph: %s", kg_stats)
         
         # Step 5: Save indexes
         await vector_service.save_index()
@@ -277,5 +303,5 @@ async def run_full_scraping_pipeline(
         logger.info("Full scraping pipeline completed successfully")
         
     except Exception as e:
-        logger.error(f"Error in scraping pipeline: {e}")
+        logger.error("Error in scraping pipeline: %s", e)
         raise
\ No newline at end of file
@@ -1,19 +1,57 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
-from datetime import datetime
 import psutil
-import os
+import sys
+import asyncio
 
 from app.services.vector_search import VectorSearchService
 from app.services.knowledge_graph import KnowledgeGraphService
 from app.main import get_vector_service, get_kg_service
+from app.core.time_cache import TimeCache
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+PYTHON_VERSION = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+SYSTEM_SAMPLE_INTERVAL = 2.0
+
+# Latest system sample, refreshed in the background so /health never blocks on psutil
+_system_info: Dict[str, Any] = {}
+_sampler_task: Optional[asyncio.Task] = None
+
+def _sample_system() -> Dict[str, Any]:
+    """Collect system metrics (blocking psutil calls)"""
+    return {
+        "cpu_percent": psutil.cpu_percent(),
+        "memory_percent": psutil.virtual_memory().percent,
+        "disk_percent": psutil.disk_usage('/').percent,
+        "python_version": PYTHON_VERSION
+    }
+
+async def _refresh_system_info():
+    global _system_info
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            _system_info = await loop.run_in_executor(None, _sample_system)
+        except Exception as e:
+            logger.warning("System metrics sampling failed: %s", e)
+        await asyncio.sleep(SYSTEM_SAMPLE_INTERVAL)
+
+@router.on_event("startup")
+async def start_system_sampler():
+    global _sampler_task
+    _sampler_task = asyncio.create_task(_refresh_system_info())
+
+@router.on_event("shutdown")
+async def stop_system_sampler():
+    if _sampler_task:
+        _sampler_task.cancel()
+
 class HealthResponse(BaseModel):
     status: str
     timestamp: str
@@ -28,44 +66,45 @@ async def health_check(
 ):
     """Comprehensive health check"""
     try:
-        # Check services
+        # Probe services concurrently
+        vector_stats, kg_stats = await asyncio.gather(
+            vector_service.get_statistics(),
+            kg_service.get_graph_statistics(),
+            return_exceptions=True
+        )
+        
         services_status = {}
         
         # Vector search service
-        try:
-            vector_stats = await vector_service.get_statistics()
+        if isinstance(vector_stats, Exception):
+            services_status["vector_search"] = {
+                "status": "unhealthy",
+                "error": str(vector_stats)
+            }
+        else:
             services_status["vector_search"] = {
                 "status": "healthy",
                 "documents": vector_stats.get("total_documents", 0),
                 "model": vector_stats.get("model_name", "unknown")
             }
-        except Exception as e:
-            services_status["vector_search"] = {
-                "status": "unhealthy",
-                "error": str(e)
-            }
         
         # Knowledge graph service
-        try:
-            kg_stats = await kg_service.get_graph_statistics()
+        if isinstance(kg_stats, Exception):
+            services_status["knowledge_graph"] = {
+                "status": "unhealthy",
+                "error": str(kg_stats)
+            }
+        else:
             services_status["knowledge_graph"] = {
                 "status": "healthy",
                 "entities": kg_stats.get("total_entities", 0),
                 "relationships": kg_stats.get("total_relationships", 0)
             }
-        except Exception as e:
-            services_status["knowledge_graph"] = {
-                "status": "unhealthy",
-                "error": str(e)
-            }
         
-        # System information
-        system_info = {
-            "cpu_percent": psutil.cpu_percent(),
-            "memory_percent": psutil.virtual_memory().percent,
-            "disk_percent": psutil.disk_usage('/').percent,
-            "python_version": f"{os.sys.version_info.major}.{os.sys.version_info.minor}.{os.sys.version_info.micro}"
-        }
+        # System information (sampled once if the background sampler hasn't run yet)
+        system_info = _system_info
+        if not system_info:
+            system_info = await asyncio.get_running_loop().run_in_executor(None, _sample_system)
         
         # Overall status
         overall_status = "healthy"
@@ -74,30 +113,30 @@ async def health_check(
                 overall_status = "degraded"
                 break
         
-        return HealthResponse(
-            status=overall_status,
-            timestamp=datetime.utcnow().isoformat(),
-            version="1.0.0",
-            services=services_status,
-            system=system_info
-        )
+        return ORJSONResponse({
+            "status": overall_status,
+            "timestamp": TimeCache.iso(),
+            "version": "1.0.0",
+            "services": services_status,
+            "system": system_info
+        })
         
     except Exception as e:
-        logger.error(f"Health check error: {e}")
-        return HealthResponse(
-            status="unhealthy",
-            timestamp=datetime.utcnow().isoformat(),
-            version="1.0.0",
-            services={"error": str(e)},
-            system={}
-        )
+        logger.error("Health check error: %s", e)
+        return ORJSONResponse({
+            "status": "unhealthy",
+            "timestamp": TimeCache.iso(),
+            "version": "1.0.0",
+            "services": {"error": str(e)},
+            "system": {}
+        })
 
 @router.get("/health/ready")
 async def readiness_check():
     """Kubernetes readiness probe"""
-    return {"status": "ready", "timestamp": datetime.utcnow().isoformat()}
+    return {"status": "ready", "timestamp": TimeCache.iso()}
 
 @router.get("/health/live")
 async def liveness_check():
     """Kubernetes liveness probe"""
-    return {"status": "alive", "timestamp": datetime.utcnow().isoformat()}
\ No newline at end of file
+    return {"status": "alive", "timestamp": TimeCache.iso()}
\ No newline at end of file
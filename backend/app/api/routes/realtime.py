@@ -1,10 +1,15 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Optional, Dict, Any, List
 import logging
 import asyncio
 import aiohttp
+import re
 from datetime import datetime, timedelta
 import json
+import orjson
+import numpy as np
+
+from app.core.http_cache import make_etag, conditional_response
 
 logger = logging.getLogger(__name__)
 
@@ -18,8 +23,18 @@ class RealTimeDataService:
         self.session = None
     
     async def get_session(self):
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        if not self.session or self.session.closed:
+            # Pooled keep-alive connections with DNS caching for repeated MOSDAC calls
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=200,
+                    limit_per_host=50,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=10),
+                raise_for_status=True
+            )
         return self.session
     
     async def close_session(self):
@@ -30,6 +45,294 @@ class RealTimeDataService:
 # Global service instance
 realtime_service = RealTimeDataService()
 
+def slot(name: str) -> str:
+    """Placeholder for a value filled in when a PayloadTemplate is rendered"""
+    return f"__slot:{name}__"
+
+def ts_slot(**offset) -> str:
+    """Placeholder for a timestamp relative to render time, e.g. ts_slot(hours=6)"""
+    return slot(f"ts:{int(timedelta(**offset).total_seconds())}")
+
+class PayloadTemplate:
+    """JSON payload serialized once, with per-request values spliced into named slots"""
+    
+    _SLOT_PATTERN = re.compile(rb'"__slot:([^"]+)__"')
+    
+    def __init__(self, payload: Any):
+        body = orjson.dumps(payload)
+        self.parts: List[bytes] = []
+        self.slots: List[str] = []
+        
+        position = 0
+        for match in self._SLOT_PATTERN.finditer(body):
+            self.parts.append(body[position:match.start()])
+            self.slots.append(match.group(1).decode())
+            position = match.end()
+        self.parts.append(body[position:])
+        
+        # Identifies the static content; slot values (timestamps, query echoes) are excluded
+        self.etag = make_etag(*self.parts, *(name.encode() for name in self.slots))
+        
+        self.offsets = {
+            name: timedelta(seconds=int(name[3:]))
+            for name in set(self.slots) if name.startswith("ts:")
+        }
+    
+    def render(self, now: datetime, **values: Any) -> bytes:
+        """Fill the slots; bytes values are inserted as already-serialized JSON"""
+        for name, offset in self.offsets.items():
+            values[name] = (now + offset).isoformat()
+        
+        chunks = [self.parts[0]]
+        for name, part in zip(self.slots, self.parts[1:]):
+            value = values[name]
+            chunks.append(value if isinstance(value, bytes) else orjson.dumps(value))
+            chunks.append(part)
+        return b"".join(chunks)
+
+def json_response(content: bytes) -> Response:
+    return Response(content=content, media_type="application/json")
+
+# Forecast timelines: hourly weather steps, 6-hourly ocean and cyclone track steps
+_HOURS = np.arange(24)
+_OCEAN_STEPS = np.arange(8)
+_CYCLONE_STEPS = np.arange(12)
+
+# Mock real-time weather data (replace with actual MOSDAC API calls)
+_WEATHER_TEMPLATE = PayloadTemplate({
+    "status": "success",
+    "data": {
+        "location": {
+            "lat": slot("lat"),
+            "lon": slot("lon"),
+            "name": slot("name")
+        },
+        "current": {
+            "temperature": 28.5,
+            "humidity": 78,
+            "pressure": 1013.2,
+            "wind_speed": 12.5,
+            "wind_direction": 225,
+            "visibility": 8.0,
+            "cloud_cover": 65,
+            "uv_index": 6
+        },
+        "forecast": [
+            {
+                "time": ts_slot(hours=hour),
+                "temperature": temperature,
+                "humidity": humidity,
+                "precipitation_probability": precipitation
+            }
+            for hour, temperature, humidity, precipitation in zip(
+                _HOURS.tolist(),
+                (28.5 + _HOURS * 0.5).tolist(),
+                (78 - _HOURS * 2).tolist(),
+                np.minimum(30 + _HOURS * 5, 80).tolist()
+            )
+        ],
+        "satellite_data": {
+            "source": "INSAT-3D",
+            "last_updated": ts_slot(),
+            "cloud_motion_vectors": True,
+            "precipitation_estimate": 2.5
+        },
+        "alerts": [
+            {
+                "type": "thunderstorm",
+                "severity": "moderate",
+                "message": "Thunderstorms possible in the evening",
+                "valid_until": ts_slot(hours=6)
+            }
+        ]
+    },
+    "timestamp": ts_slot(),
+    "source": "MOSDAC Real-time API"
+})
+
+# Mock real-time ocean data
+_OCEAN_TEMPLATE = PayloadTemplate({
+    "status": "success",
+    "data": {
+        "location": {
+            "lat": slot("lat"),
+            "lon": slot("lon"),
+            "region": slot("region")
+        },
+        "current": {
+            "sea_surface_temperature": 29.2,
+            "wave_height": 1.8,
+            "wave_period": 8.5,
+            "wave_direction": 270,
+            "current_speed": 0.45,
+            "current_direction": 180,
+            "salinity": 35.2,
+            "chlorophyll_concentration": 0.8
+        },
+        "satellite_data": {
+            "source": "OCEANSAT-2",
+            "last_updated": ts_slot(),
+            "sst_quality": "high",
+            "chlorophyll_quality": "medium"
+        },
+        "buoy_data": {
+            "nearest_buoy": "BD11",
+            "distance_km": 45.2,
+            "last_report": ts_slot(minutes=-30)
+        },
+        "forecast": [
+            {
+                "time": ts_slot(hours=step * 6),
+                "wave_height": wave_height,
+                "sst": sst
+            }
+            for step, wave_height, sst in zip(
+                _OCEAN_STEPS.tolist(),
+                (1.8 + _OCEAN_STEPS * 0.1).tolist(),
+                (29.2 - _OCEAN_STEPS * 0.05).tolist()
+            )
+        ]
+    },
+    "timestamp": ts_slot(),
+    "source": "MOSDAC Ocean Data Service"
+})
+
+# Mock satellite status data
+_SATELLITES = [
+    {
+        "name": "INSAT-3D",
+        "status": "operational",
+        "last_contact": ts_slot(),
+        "orbit_position": "82°E",
+        "instruments": {
+            "imager": {"status": "active", "last_image": ts_slot()},
+            "sounder": {"status": "active", "last_data": ts_slot()}
+        },
+        "data_products": ["weather", "cloud_motion", "temperature_profile"],
+        "coverage": "Indian subcontinent"
+    },
+    {
+        "name": "SCATSAT-1",
+        "status": "operational",
+        "last_contact": ts_slot(minutes=-45),
+        "orbit_type": "polar",
+        "instruments": {
+            "scatterometer": {"status": "active", "last_data": ts_slot()}
+        },
+        "data_products": ["ocean_winds", "soil_moisture"],
+        "coverage": "global"
+    },
+    {
+        "name": "OCEANSAT-2",
+        "status": "operational",
+        "last_contact": ts_slot(minutes=-20),
+        "orbit_type": "polar",
+        "instruments": {
+            "ocm": {"status": "active", "last_data": ts_slot()},
+            "scatterometer": {"status": "active", "last_data": ts_slot()}
+        },
+        "data_products": ["ocean_color", "sst", "ocean_winds"],
+        "coverage": "global oceans"
+    }
+]
+
+_SATELLITE_TEMPLATE = PayloadTemplate({
+    "status": "success",
+    "satellites": _SATELLITES,
+    "total_active": len([s for s in _SATELLITES if s["status"] == "operational"]),
+    "last_updated": ts_slot(),
+    "data_latency": {
+        "weather": "15 minutes",
+        "ocean": "30 minutes",
+        "winds": "45 minutes"
+    }
+})
+
+# Mock cyclone data
+_CYCLONES = [
+    {
+        "id": "CYC_2024_001",
+        "name": "CYCLONE_BIPARJOY",
+        "status": "active",
+        "category": "Category 2",
+        "current_position": {
+            "lat": 20.5,
+            "lon": 68.2,
+            "timestamp": ts_slot()
+        },
+        "intensity": {
+            "max_wind_speed": 95,
+            "central_pressure": 980,
+            "movement_speed": 12,
+            "movement_direction": 45
+        },
+        "forecast_track": [
+            {
+                "time": ts_slot(hours=step * 6),
+                "lat": lat,
+                "lon": lon,
+                "intensity": intensity
+            }
+            for step, lat, lon, intensity in zip(
+                _CYCLONE_STEPS.tolist(),
+                (20.5 + _CYCLONE_STEPS * 0.2).tolist(),
+                (68.2 + _CYCLONE_STEPS * 0.3).tolist(),
+                np.maximum(50, 95 - _CYCLONE_STEPS * 5).tolist()
+            )
+        ],
+        "affected_areas": ["Gujarat coast", "Rajasthan", "Southern Pakistan"],
+        "warnings": [
+            {
+                "type": "storm_surge",
+                "level": "high",
+                "areas": ["Kutch", "Saurashtra"]
+            }
+        ]
+    }
+]
+
+_CYCLONE_TEMPLATE = PayloadTemplate({
+    "status": "success",
+    "active_cyclones": _CYCLONES,
+    "total_active": len(_CYCLONES),
+    "last_updated": ts_slot(),
+    "data_source": "IMD Cyclone Warning Division"
+})
+
+# Mock weather alerts, each pre-serialized so region filtering only joins bytes
+_ALERTS = [
+    {
+        "id": "ALERT_001",
+        "type": "thunderstorm",
+        "severity": "moderate",
+        "region": "Mumbai Metropolitan Region",
+        "message": "Thunderstorms with lightning expected between 3 PM to 8 PM",
+        "issued_at": ts_slot(),
+        "valid_until": ts_slot(hours=5),
+        "source": "IMD Mumbai"
+    },
+    {
+        "id": "ALERT_002",
+        "type": "heavy_rainfall",
+        "severity": "high",
+        "region": "Kerala",
+        "message": "Heavy to very heavy rainfall expected in next 24 hours",
+        "issued_at": ts_slot(hours=-2),
+        "valid_until": ts_slot(hours=22),
+        "source": "IMD Thiruvananthapuram"
+    }
+]
+
+# (lowercased region, template) pairs; regions are lowercased once here, not per request
+_ALERT_TEMPLATES = [(alert["region"].lower(), PayloadTemplate(alert)) for alert in _ALERTS]
+
+_ALERTS_TEMPLATE = PayloadTemplate({
+    "status": "success",
+    "alerts": slot("alerts"),
+    "total_alerts": slot("total_alerts"),
+    "last_updated": ts_slot()
+})
+
 @router.get("/weather/realtime")
 async def get_realtime_weather(
     lat: Optional[float] = Query(None, description="Latitude"),
@@ -38,57 +341,15 @@ async def get_realtime_weather(
 ):
     """Get real-time weather data"""
     try:
-        # Mock real-time weather data (replace with actual MOSDAC API calls)
-        weather_data = {
-            "location": {
-                "lat": lat or 19.0760,
-                "lon": lon or 72.8777,
-                "name": location or "Mumbai"
-            },
-            "current": {
-                "temperature": 28.5,
-                "humidity": 78,
-                "pressure": 1013.2,
-                "wind_speed": 12.5,
-                "wind_direction": 225,
-                "visibility": 8.0,
-                "cloud_cover": 65,
-                "uv_index": 6
-            },
-            "forecast": [
-                {
-                    "time": (datetime.now() + timedelta(hours=i)).isoformat(),
-                    "temperature": 28.5 + (i * 0.5),
-                    "humidity": 78 - (i * 2),
-                    "precipitation_probability": min(30 + (i * 5), 80)
-                }
-                for i in range(24)
-            ],
-            "satellite_data": {
-                "source": "INSAT-3D",
-                "last_updated": datetime.now().isoformat(),
-                "cloud_motion_vectors": True,
-                "precipitation_estimate": 2.5
-            },
-            "alerts": [
-                {
-                    "type": "thunderstorm",
-                    "severity": "moderate",
-                    "message": "Thunderstorms possible in the evening",
-                    "valid_until": (datetime.now() + timedelta(hours=6)).isoformat()
-                }
-            ]
-        }
-        
-        return {
-            "status": "success",
-            "data": weather_data,
-            "timestamp": datetime.now().isoformat(),
-            "source": "MOSDAC Real-time API"
-        }
-        
+        return json_response(_WEATHER_TEMPLATE.render(
+            datetime.now(),
+            lat=lat or 19.0760,
+            lon=lon or 72.8777,
+            name=location or "Mumbai"
+        ))
+    
     except Exception as e:
-        logger.error(f"Error fetching real-time weather data: {e}")
+        logger.error("Error fetching real-time weather data: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching weather data: {str(e)}"
@@ -102,115 +363,32 @@ async def get_realtime_ocean(
 ):
     """Get real-time ocean data"""
     try:
-        # Mock real-time ocean data
-        ocean_data = {
-            "location": {
-                "lat": lat or 15.0,
-                "lon": lon or 70.0,
-                "region": region or "Arabian Sea"
-            },
-            "current": {
-                "sea_surface_temperature": 29.2,
-                "wave_height": 1.8,
-                "wave_period": 8.5,
-                "wave_direction": 270,
-                "current_speed": 0.45,
-                "current_direction": 180,
-                "salinity": 35.2,
-                "chlorophyll_concentration": 0.8
-            },
-            "satellite_data": {
-                "source": "OCEANSAT-2",
-                "last_updated": datetime.now().isoformat(),
-                "sst_quality": "high",
-                "chlorophyll_quality": "medium"
-            },
-            "buoy_data": {
-                "nearest_buoy": "BD11",
-                "distance_km": 45.2,
-                "last_report": (datetime.now() - timedelta(minutes=30)).isoformat()
-            },
-            "forecast": [
-                {
-                    "time": (datetime.now() + timedelta(hours=i*6)).isoformat(),
-                    "wave_height": 1.8 + (i * 0.1),
-                    "sst": 29.2 - (i * 0.05)
-                }
-                for i in range(8)
-            ]
-        }
-        
-        return {
-            "status": "success",
-            "data": ocean_data,
-            "timestamp": datetime.now().isoformat(),
-            "source": "MOSDAC Ocean Data Service"
-        }
-        
+        return json_response(_OCEAN_TEMPLATE.render(
+            datetime.now(),
+            lat=lat or 15.0,
+            lon=lon or 70.0,
+            region=region or "Arabian Sea"
+        ))
+    
     except Exception as e:
-        logger.error(f"Error fetching real-time ocean data: {e}")
+        logger.error("Error fetching real-time ocean data: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching ocean data: {str(e)}"
         )
 
 @router.get("/satellites/status")
-async def get_satellite_status():
+async def get_satellite_status(request: Request):
     """Get current satellite status and data availability"""
     try:
-        # Mock satellite status data
-        satellites = [
-            {
-                "name": "INSAT-3D",
-                "status": "operational",
-                "last_contact": datetime.now().isoformat(),
-                "orbit_position": "82°E",
-                "instruments": {
-                    "imager": {"status": "active", "last_image": datetime.now().isoformat()},
-                    "sounder": {"status": "active", "last_data": datetime.now().isoformat()}
-                },
-                "data_products": ["weather", "cloud_motion", "temperature_profile"],
-                "coverage": "Indian subcontinent"
-            },
-            {
-                "name": "SCATSAT-1",
-                "status": "operational",
-                "last_contact": (datetime.now() - timedelta(minutes=45)).isoformat(),
-                "orbit_type": "polar",
-                "instruments": {
-                    "scatterometer": {"status": "active", "last_data": datetime.now().isoformat()}
-                },
-                "data_products": ["ocean_winds", "soil_moisture"],
-                "coverage": "global"
-            },
-            {
-                "name": "OCEANSAT-2",
-                "status": "operational",
-                "last_contact": (datetime.now() - timedelta(minutes=20)).isoformat(),
-                "orbit_type": "polar",
-                "instruments": {
-                    "ocm": {"status": "active", "last_data": datetime.now().isoformat()},
-                    "scatterometer": {"status": "active", "last_data": datetime.now().isoformat()}
-                },
-                "data_products": ["ocean_color", "sst", "ocean_winds"],
-                "coverage": "global oceans"
-            }
-        ]
-        
-        return {
-            "status": "success",
-            "satellites": satellites,
-            "total_active": len([s for s in satellites if s["status"] == "operational"]),
-            "last_updated": datetime.now().isoformat(),
-            "data_latency": {
-                "weather": "15 minutes",
-                "ocean": "30 minutes",
-                "winds": "45 minutes"
-            }
-        }
-        
+        return conditional_response(
+            request,
+            lambda: _SATELLITE_TEMPLATE.render(datetime.now()),
+            etag=_SATELLITE_TEMPLATE.etag
+        )
+    
     except Exception as e:
-        logger.error(f"Error fetching satellite status: {e}")
+        logger.error("Error fetching satellite status: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching satellite status: {str(e)}"
@@ -220,54 +398,10 @@ async def get_satellite_status():
 async def get_cyclone_tracking():
     """Get current cyclone tracking data"""
     try:
-        # Mock cyclone data
-        cyclones = [
-            {
-                "id": "CYC_2024_001",
-                "name": "CYCLONE_BIPARJOY",
-                "status": "active",
-                "category": "Category 2",
-                "current_position": {
-                    "lat": 20.5,
-                    "lon": 68.2,
-                    "timestamp": datetime.now().isoformat()
-                },
-                "intensity": {
-                    "max_wind_speed": 95,
-                    "central_pressure": 980,
-                    "movement_speed": 12,
-                    "movement_direction": 45
-                },
-                "forecast_track": [
-                    {
-                        "time": (datetime.now() + timedelta(hours=i*6)).isoformat(),
-                        "lat": 20.5 + (i * 0.2),
-                        "lon": 68.2 + (i * 0.3),
-                        "intensity": max(50, 95 - (i * 5))
-                    }
-                    for i in range(12)
-                ],
-                "affected_areas": ["Gujarat coast", "Rajasthan", "Southern Pakistan"],
-                "warnings": [
-                    {
-                        "type": "storm_surge",
-                        "level": "high",
-                        "areas": ["Kutch", "Saurashtra"]
-                    }
-                ]
-            }
-        ]
-        
-        return {
-            "status": "success",
-            "active_cyclones": cyclones,
-            "total_active": len(cyclones),
-            "last_updated": datetime.now().isoformat(),
-            "data_source": "IMD Cyclone Warning Division"
-        }
-        
+        return json_response(_CYCLONE_TEMPLATE.render(datetime.now()))
+    
     except Exception as e:
-        logger.error(f"Error fetching cyclone data: {e}")
+        logger.error("Error fetching cyclone data: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching cyclone data: {str(e)}"
@@ -275,45 +409,30 @@ async def get_cyclone_tracking():
 
 @router.get("/alerts")
 async def get_weather_alerts(
+    request: Request,
     region: Optional[str] = Query(None, description="Region filter")
 ):
     """Get current weather alerts and warnings"""
     try:
-        alerts = [
-            {
-                "id": "ALERT_001",
-                "type": "thunderstorm",
-                "severity": "moderate",
-                "region": "Mumbai Metropolitan Region",
-                "message": "Thunderstorms with lightning expected between 3 PM to 8 PM",
-                "issued_at": datetime.now().isoformat(),
-                "valid_until": (datetime.now() + timedelta(hours=5)).isoformat(),
-                "source": "IMD Mumbai"
-            },
-            {
-                "id": "ALERT_002",
-                "type": "heavy_rainfall",
-                "severity": "high",
-                "region": "Kerala",
-                "message": "Heavy to very heavy rainfall expected in next 24 hours",
-                "issued_at": (datetime.now() - timedelta(hours=2)).isoformat(),
-                "valid_until": (datetime.now() + timedelta(hours=22)).isoformat(),
-                "source": "IMD Thiruvananthapuram"
-            }
-        ]
+        templates = _ALERT_TEMPLATES
         
         if region:
-            alerts = [a for a in alerts if region.lower() in a["region"].lower()]
+            needle = region.lower()
+            templates = [t for t in templates if needle in t[0]]
         
-        return {
-            "status": "success",
-            "alerts": alerts,
-            "total_alerts": len(alerts),
-            "last_updated": datetime.now().isoformat()
-        }
+        def render() -> bytes:
+            now = datetime.now()
+            alerts = b"[" + b",".join(template.render(now) for _, template in templates) + b"]"
+            return _ALERTS_TEMPLATE.render(now, alerts=alerts, total_alerts=len(templates))
         
+        etag = make_etag(
+            _ALERTS_TEMPLATE.etag.encode(),
+            *(template.etag.encode() for _, template in templates)
+        )
+        return conditional_response(request, render, etag=etag)
+    
     except Exception as e:
-        logger.error(f"Error fetching weather alerts: {e}")
+        logger.error("Error fetching weather alerts: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching alerts: {str(e)}"
@@ -322,4 +441,4 @@ async def get_weather_alerts(
 # Cleanup on shutdown
 @router.on_event("shutdown")
 async def shutdown_event():
-    await realtime_service.close_session()
\ No newline at end of file
+    await realtime_service.close_session()
@@ -1,16 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import logging
-from datetime import datetime
-import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+import orjson
+
+from app.core.config import settings
+from app.core.session_store import SessionStore
+from app.core.http_cache import conditional_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # In-memory session storage (in production, use a database)
-sessions_db = {}
+sessions_db = SessionStore(
+    max_sessions=settings.SESSION_MAX_COUNT,
+    max_memory_mb=settings.SESSION_MAX_MEMORY_MB
+)
 
 class SessionCreate(BaseModel):
     title: Optional[str] = "New Chat"
@@ -25,136 +34,72 @@ class SessionResponse(BaseModel):
     updated_at: str
     message_count: int
 
+@lru_cache(maxsize=128)
+def _iso(timestamp_ns: int) -> str:
+    """ISO 8601 UTC string for a stored nanosecond timestamp, formatted only for responses"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc).isoformat()
+
+def _session_view(session: dict) -> dict:
+    """SessionResponse-shaped dict for a stored session"""
+    return {
+        "id": session["id"],
+        "title": session["title"],
+        "created_at": _iso(session["created_at_ns"]),
+        "updated_at": _iso(session["updated_at_ns"]),
+        "message_count": session["message_count"]
+    }
+
 @router.post("/sessions", response_model=SessionResponse)
 async def create_session(session: SessionCreate):
     """Create a new chat session"""
-    try:
-        session_id = str(uuid.uuid4())
-        now = datetime.utcnow().isoformat()
-        
-        new_session = {
-            "id": session_id,
-            "title": session.title,
-            "created_at": now,
-            "updated_at": now,
-            "messages": [],
-            "message_count": 0
-        }
-        
-        sessions_db[session_id] = new_session
-        
-        return SessionResponse(
-            id=session_id,
-            title=session.title,
-            created_at=now,
-            updated_at=now,
-            message_count=0
-        )
-        
-    except Exception as e:
-        logger.error(f"Error creating session: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error creating session: {str(e)}"
-        )
+    new_session = sessions_db.create(session.title)
+    
+    # Returning a Response skips re-validating data we built ourselves;
+    # response_model is kept for the OpenAPI schema
+    return ORJSONResponse(_session_view(new_session))
+
+@lru_cache(maxsize=8)
+def _render_sessions(version: int, limit: int) -> bytes:
+    """Serialized session list; keyed by store version so mutations miss the cache"""
+    return orjson.dumps([_session_view(session) for session in sessions_db.recent(limit)])
 
 @router.get("/sessions", response_model=List[SessionResponse])
-async def get_sessions(limit: int = 50):
+async def get_sessions(request: Request, limit: int = 50):
     """Get all chat sessions"""
-    try:
-        sessions = list(sessions_db.values())
-        
-        # Sort by updated_at descending
-        sessions.sort(key=lambda x: x["updated_at"], reverse=True)
-        
-        return [
-            SessionResponse(
-                id=session["id"],
-                title=session["title"],
-                created_at=session["created_at"],
-                updated_at=session["updated_at"],
-                message_count=session["message_count"]
-            )
-            for session in sessions[:limit]
-        ]
-        
-    except Exception as e:
-        logger.error(f"Error getting sessions: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error getting sessions: {str(e)}"
-        )
+    # Index is kept ordered by updated_at descending; the list only changes
+    # when the store version does, so polling clients get a 304
+    version = sessions_db.version
+    etag = f'W/"{sessions_db.epoch}-{version}-{limit}"'
+    
+    return conditional_response(
+        request,
+        lambda: _render_sessions(version, limit),
+        etag=etag,
+        max_age=0
+    )
 
 @router.get("/sessions/{session_id}", response_model=SessionResponse)
 async def get_session(session_id: str):
     """Get a specific session"""
-    try:
-        if session_id not in sessions_db:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        session = sessions_db[session_id]
-        
-        return SessionResponse(
-            id=session["id"],
-            title=session["title"],
-            created_at=session["created_at"],
-            updated_at=session["updated_at"],
-            message_count=session["message_count"]
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting session: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error getting session: {str(e)}"
-        )
+    session = sessions_db.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return ORJSONResponse(_session_view(session))
 
 @router.put("/sessions/{session_id}", response_model=SessionResponse)
 async def update_session(session_id: str, session_update: SessionUpdate):
     """Update a session"""
-    try:
-        if session_id not in sessions_db:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        session = sessions_db[session_id]
-        session["title"] = session_update.title
-        session["updated_at"] = datetime.utcnow().isoformat()
-        
-        return SessionResponse(
-            id=session["id"],
-            title=session["title"],
-            created_at=session["created_at"],
-            updated_at=session["updated_at"],
-            message_count=session["message_count"]
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating session: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error updating session: {str(e)}"
-        )
+    session = sessions_db.update(session_id, title=session_update.title)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return ORJSONResponse(_session_view(session))
 
 @router.delete("/sessions/{session_id}")
 async def delete_session(session_id: str):
     """Delete a session"""
-    try:
-        if session_id not in sessions_db:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        del sessions_db[session_id]
-        
-        return {"message": f"Session {session_id} deleted successfully"}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting session: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error deleting session: {str(e)}"
-        )
\ No newline at end of file
+    if not sessions_db.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    return {"message": f"Session {session_id} deleted successfully"}
\ No newline at end of file
@@ -1,12 +1,25 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, FileResponse
 import os
-import uuid
+import re
+import stat
+import secrets
+import hashlib
+import time
+import threading
 from pathlib import Path
 import logging
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+import asyncio
+import contextlib
 import aiofiles
 import mimetypes
+import orjson
+import pandas as pd
+from openpyxl import load_workbook
+
+from app.core.http_cache import is_not_modified
 
 logger = logging.getLogger(__name__)
 
@@ -14,125 +27,296 @@ router = APIRouter()
 
 # Configure upload settings
 UPLOAD_DIR = Path("./data/uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_DIR_STR = str(UPLOAD_DIR)
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-ALLOWED_EXTENSIONS = {
+UPLOAD_WRITE_BATCH_SIZE = 1024 * 1024  # bytes read and written per copy step
+SAMPLE_ROWS = 5  # rows returned as sample_data for tabular files
+LINE_COUNT_BLOCK_SIZE = 1024 * 1024
+LISTING_CACHE_TTL = 1.0  # seconds
+
+_upload_fd: Optional[int] = None
+_scratch = threading.local()
+
+# Last directory listing as (monotonic time, files), invalidated on upload/delete
+_listing_cache: Dict[str, Tuple[float, List[dict]]] = {}
+
+# Extensions whose processing reads the whole file, so small uploads are kept in memory
+INLINE_EXTENSIONS = frozenset({'.txt', '.json'})
+
+ALLOWED_EXTENSIONS = frozenset({
     '.pdf', '.doc', '.docx', '.xls', '.xlsx', 
     '.csv', '.txt', '.json', '.xml', '.zip'
-}
+})
+
+# Anchored match for an allowed extension; the preceding character rules out dotfiles
+_ALLOWED_EXT_RE = re.compile(
+    r"[^/]\.(" + "|".join(sorted(ext[1:] for ext in ALLOWED_EXTENSIONS)) + r")\Z",
+    re.IGNORECASE
+)
+
+@lru_cache(maxsize=4096)
+def _classify(filename: str) -> Tuple[str, Optional[str], bool]:
+    """(lowercased extension, guessed MIME type, allowed) for a filename"""
+    match = _ALLOWED_EXT_RE.search(filename)
+    if match:
+        return f".{match.group(1).lower()}", mimetypes.guess_type(filename)[0], True
+    
+    # Rejected: parse the extension only for the error message (PurePath.suffix rules)
+    stem, dot, suffix = filename.rpartition('.')
+    ext = f".{suffix.lower()}" if dot and stem and suffix and '/' not in suffix else ''
+    return ext, None, False
+
+def _upload_dir_fd() -> int:
+    """Directory fd for UPLOAD_DIR, opened once; file operations resolve names relative to it"""
+    global _upload_fd
+    if _upload_fd is None:
+        # exist_ok also covers another worker creating the directory concurrently
+        os.makedirs(UPLOAD_DIR_STR, exist_ok=True)
+        _upload_fd = os.open(UPLOAD_DIR_STR, os.O_DIRECTORY | os.O_CLOEXEC)
+    return _upload_fd
+
+@router.on_event("startup")
+async def open_upload_dir():
+    await asyncio.to_thread(_upload_dir_fd)
+
+@router.on_event("shutdown")
+async def close_upload_dir():
+    global _upload_fd
+    if _upload_fd is not None:
+        os.close(_upload_fd)
+        _upload_fd = None
 
 @router.post("/upload")
 async def upload_files(files: List[UploadFile] = File(...)):
     """Upload and process files"""
+    uploaded_files = []
+    
+    for file in files:
+        # Validate file
+        if not file.filename:
+            raise HTTPException(status_code=400, detail="No filename provided")
+        
+        # Check file extension
+        file_ext, mime_type, allowed = _classify(file.filename)
+        if not allowed:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"File type {file_ext} not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+            )
+        
+        # Generate unique filename
+        file_id = secrets.token_hex(16)
+        safe_filename = f"{file_id}_{file.filename}"
+        file_path = f"{UPLOAD_DIR_STR}/{safe_filename}"
+        
+        # Stream to disk in chunks, hashing as we go and rejecting oversize files early
+        total, sha256, content = await save_upload(
+            file, safe_filename, keep_content=file_ext in INLINE_EXTENSIONS
+        )
+        
+        # Get file metadata
+        file_info = {
+            "id": file_id,
+            "original_name": file.filename,
+            "saved_name": safe_filename,
+            "size": total,
+            "sha256": sha256,
+            "mime_type": mime_type,
+            "extension": file_ext,
+            "upload_path": file_path,
+            "url": f"/uploads/{safe_filename}"
+        }
+        
+        uploaded_files.append(file_info)
+        
+        # Process file content (extract text, metadata, etc.)
+        try:
+            processed_content = await process_uploaded_file(file_path, file_info, content)
+            file_info["processed_content"] = processed_content
+        except Exception as e:
+            logger.warning(f"Could not process file {file.filename}: {e}")
+            file_info["processing_error"] = str(e)
+    
+    _listing_cache.clear()
+    
+    return {
+        "status": "success",
+        "message": f"Successfully uploaded {len(uploaded_files)} files",
+        "files": uploaded_files
+    }
+
+def _scratch_buffer() -> bytearray:
+    """Per-thread reusable read buffer for upload copies"""
+    buffer = getattr(_scratch, "buffer", None)
+    if buffer is None:
+        buffer = _scratch.buffer = bytearray(UPLOAD_WRITE_BATCH_SIZE)
+    return buffer
+
+def _copy_upload(source, fd: int, keep_content: bool = False) -> Tuple[int, str, Optional[bytes]]:
+    """Copy an upload's spooled file to fd through the thread's scratch buffer
+    
+    Returns (size, sha256 hex digest, content). content is only kept when
+    requested and the file fit in a single buffer; size is MAX_FILE_SIZE + 1
+    as soon as the limit is exceeded.
+    """
+    view = memoryview(_scratch_buffer())
+    total = 0
+    hasher = hashlib.sha256()
+    content = None
+    while n := source.readinto(view):
+        total += n
+        if total > MAX_FILE_SIZE:
+            return MAX_FILE_SIZE + 1, "", None
+        data = view[:n]
+        if keep_content:
+            content = bytes(data) if total == n else None
+        hasher.update(data)
+        while data:
+            data = data[os.write(fd, data):]
+    return total, hasher.hexdigest(), content
+
+async def save_upload(file: UploadFile, filename: str,
+                      keep_content: bool = False) -> Tuple[int, str, Optional[bytes]]:
+    """Stream an upload into UPLOAD_DIR; returns (size, sha256 hex digest, content)
+    
+    The whole copy runs as one worker-thread call that reads into a reused
+    UPLOAD_WRITE_BATCH_SIZE buffer and writes it out, so there is no executor
+    round trip or bytes allocation per chunk. With keep_content, files that fit
+    in one buffer are also returned so processing doesn't re-read them.
+    Raises 413 (and removes the partial file) once MAX_FILE_SIZE is exceeded.
+    """
+    dir_fd = _upload_dir_fd()
+    
+    def copy() -> Tuple[int, str, Optional[bytes]]:
+        fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644, dir_fd=dir_fd)
+        try:
+            file.file.seek(0)
+            return _copy_upload(file.file, fd, keep_content)
+        finally:
+            os.close(fd)
+    
+    total, sha256, content = await asyncio.to_thread(copy)
+    
+    if total > MAX_FILE_SIZE:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(filename, dir_fd=dir_fd)
+        raise HTTPException(
+            status_code=413, 
+            detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
+        )
+    
+    return total, sha256, content
+
+def _count_lines(file_path: str) -> int:
+    """Count lines by scanning fixed-size blocks for newlines"""
+    lines = 0
+    last = b''
+    with open(file_path, 'rb', buffering=0) as f:
+        while block := f.read(LINE_COUNT_BLOCK_SIZE):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last and last != b'\n':
+        lines += 1
+    return lines
+
+def _sample_csv(file_path: str) -> dict:
+    """Columns and first rows of a CSV without parsing the whole file"""
+    df = pd.read_csv(file_path, nrows=SAMPLE_ROWS)
+    return {
+        "type": "csv",
+        # Data rows, excluding the header (approximate for quoted multi-line fields)
+        "rows": max(_count_lines(file_path) - 1, 0),
+        "columns": len(df.columns),
+        "column_names": df.columns.tolist(),
+        "sample_data": df.to_dict('records')
+    }
+
+def _sample_xlsx(file_path: str) -> dict:
+    """Columns and first rows of the first worksheet, streamed in read-only mode"""
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
     try:
-        uploaded_files = []
-        
-        for file in files:
-            # Validate file
-            if not file.filename:
-                raise HTTPException(status_code=400, detail="No filename provided")
-            
-            # Check file extension
-            file_ext = Path(file.filename).suffix.lower()
-            if file_ext not in ALLOWED_EXTENSIONS:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"File type {file_ext} not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
-                )
-            
-            # Check file size
-            content = await file.read()
-            if len(content) > MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"File too large. Maximum size: {MAX_FILE_SIZE // (1024*1024)}MB"
-                )
-            
-            # Generate unique filename
-            file_id = str(uuid.uuid4())
-            safe_filename = f"{file_id}_{file.filename}"
-            file_path = UPLOAD_DIR / safe_filename
-            
-            # Save file
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
-            
-            # Get file metadata
-            file_info = {
-                "id": file_id,
-                "original_name": file.filename,
-                "saved_name": safe_filename,
-                "size": len(content),
-                "mime_type": mimetypes.guess_type(file.filename)[0],
-                "extension": file_ext,
-                "upload_path": str(file_path),
-                "url": f"/uploads/{safe_filename}"
-            }
-            
-            uploaded_files.append(file_info)
-            
-            # Process file content (extract text, metadata, etc.)
-            try:
-                processed_content = await process_uploaded_file(file_path, file_info)
-                file_info["processed_content"] = processed_content
-            except Exception as e:
-                logger.warning(f"Could not process file {file.filename}: {e}")
-                file_info["processing_error"] = str(e)
+        sheet = workbook.worksheets[0]
+        rows = sheet.iter_rows(max_row=SAMPLE_ROWS + 1, values_only=True)
+        header = next(rows, ())
+        column_names = [
+            str(name) if name is not None else f"Unnamed: {i}"
+            for i, name in enumerate(header)
+        ]
+        sample_data = [dict(zip(column_names, row)) for row in rows]
+        
+        total_rows = sheet.max_row
+        if total_rows is None:
+            # No stored dimensions, count rows by streaming
+            total_rows = sum(1 for _ in sheet.iter_rows(values_only=True))
         
         return {
-            "status": "success",
-            "message": f"Successfully uploaded {len(uploaded_files)} files",
-            "files": uploaded_files
+            "type": "excel",
+            "rows": max(total_rows - 1, 0),
+            "columns": len(column_names),
+            "column_names": column_names,
+            "sample_data": sample_data
         }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error uploading files: {e}")
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    finally:
+        workbook.close()
+
+def _sample_xls(file_path: str) -> dict:
+    """Columns and first rows of a legacy .xls workbook"""
+    df = pd.read_excel(file_path)
+    return {
+        "type": "excel",
+        "rows": len(df),
+        "columns": len(df.columns),
+        "column_names": df.columns.tolist(),
+        "sample_data": df.head(SAMPLE_ROWS).to_dict('records')
+    }
 
-async def process_uploaded_file(file_path: Path, file_info: dict) -> dict:
-    """Process uploaded file to extract content and metadata"""
+def _summarize_text(text_content: str) -> dict:
+    return {
+        "type": "text",
+        "text": text_content,
+        "word_count": len(text_content.split()),
+        "char_count": len(text_content)
+    }
+
+async def process_uploaded_file(file_path: str, file_info: dict,
+                                file_bytes: Optional[bytes] = None) -> dict:
+    """Process uploaded file to extract content and metadata
+    
+    Parsing runs in worker threads so large files don't block other requests.
+    Text/JSON bytes captured during the upload are used instead of re-reading.
+    """
     try:
         content = {}
         
         if file_info["extension"] == '.txt':
             # Process text file
-            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                text_content = await f.read()
-                content = {
-                    "type": "text",
-                    "text": text_content,
-                    "word_count": len(text_content.split()),
-                    "char_count": len(text_content)
-                }
+            if file_bytes is not None:
+                text_content = file_bytes.decode('utf-8')
+            else:
+                async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
+                    text_content = await f.read()
+            content = await asyncio.to_thread(_summarize_text, text_content)
         
         elif file_info["extension"] == '.json':
             # Process JSON file
-            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                json_content = await f.read()
-                import json
-                parsed_json = json.loads(json_content)
-                content = {
-                    "type": "json",
-                    "data": parsed_json,
-                    "keys": list(parsed_json.keys()) if isinstance(parsed_json, dict) else None,
-                    "size": len(json_content)
-                }
-        
-        elif file_info["extension"] == '.csv':
-            # Process CSV file
-            import pandas as pd
-            df = pd.read_csv(file_path)
+            # orjson parses bytes directly, no decode round trip
+            json_content = file_bytes
+            if json_content is None:
+                async with aiofiles.open(file_path, 'rb') as f:
+                    json_content = await f.read()
+            parsed_json = await asyncio.to_thread(orjson.loads, json_content)
             content = {
-                "type": "csv",
-                "rows": len(df),
-                "columns": len(df.columns),
-                "column_names": df.columns.tolist(),
-                "sample_data": df.head(5).to_dict('records')
+                "type": "json",
+                "data": parsed_json,
+                "keys": list(parsed_json.keys()) if isinstance(parsed_json, dict) else None,
+                "size": len(json_content)
             }
         
+        elif file_info["extension"] == '.csv':
+            # Process CSV file (header and sample only)
+            content = await asyncio.to_thread(_sample_csv, file_path)
+        
         elif file_info["extension"] in ['.pdf']:
             # Process PDF file (placeholder - would need proper PDF processing)
             content = {
@@ -149,17 +333,13 @@ async def process_uploaded_file(file_path: Path, file_info: dict) -> dict:
                 "note": "Document processing requires additional setup"
             }
         
-        elif file_info["extension"] in ['.xls', '.xlsx']:
-            # Process Excel file
-            import pandas as pd
-            df = pd.read_excel(file_path)
-            content = {
-                "type": "excel",
-                "rows": len(df),
-                "columns": len(df.columns),
-                "column_names": df.columns.tolist(),
-                "sample_data": df.head(5).to_dict('records')
-            }
+        elif file_info["extension"] == '.xlsx':
+            # Process Excel file (streamed in read-only mode)
+            content = await asyncio.to_thread(_sample_xlsx, file_path)
+        
+        elif file_info["extension"] == '.xls':
+            # Process legacy Excel file
+            content = await asyncio.to_thread(_sample_xls, file_path)
         
         else:
             content = {
@@ -178,73 +358,79 @@ async def process_uploaded_file(file_path: Path, file_info: dict) -> dict:
         }
 
 @router.get("/uploads/{filename}")
-async def get_uploaded_file(filename: str):
+async def get_uploaded_file(request: Request, filename: str):
     """Serve uploaded files"""
+    file_path = f"{UPLOAD_DIR_STR}/{filename}"
+    
     try:
-        file_path = UPLOAD_DIR / filename
-        
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        # Return file info (in a real app, you might serve the actual file)
-        return {
-            "filename": filename,
-            "exists": True,
-            "size": file_path.stat().st_size,
-            "path": str(file_path)
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error retrieving file {filename}: {e}")
-        raise HTTPException(status_code=500, detail=f"Error retrieving file: {str(e)}")
+        file_stat = await asyncio.to_thread(os.stat, filename, dir_fd=_upload_dir_fd())
+    except FileNotFoundError:
+        file_stat = None
+    if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    headers = {
+        "Cache-Control": "public, max-age=3600",
+        "ETag": f'W/"{file_stat.st_mtime_ns}-{file_stat.st_size}"'
+    }
+    if is_not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    
+    # FileResponse streams via sendfile(2) where available; passing the stat avoids a second one
+    return FileResponse(
+        file_path,
+        filename=filename,
+        media_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        stat_result=file_stat,
+        headers=headers
+    )
 
 @router.delete("/uploads/{filename}")
 async def delete_uploaded_file(filename: str):
     """Delete uploaded file"""
     try:
-        file_path = UPLOAD_DIR / filename
-        
-        if not file_path.exists():
-            raise HTTPException(status_code=404, detail="File not found")
-        
-        file_path.unlink()
-        
-        return {
-            "status": "success",
-            "message": f"File {filename} deleted successfully"
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting file {filename}: {e}")
-        raise HTTPException(status_code=500, detail=f"Error deleting file: {str(e)}")
+        await asyncio.to_thread(os.unlink, filename, dir_fd=_upload_dir_fd())
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    _listing_cache.clear()
+    
+    return {
+        "status": "success",
+        "message": f"File {filename} deleted successfully"
+    }
+
+def _scan_uploads() -> List[dict]:
+    """Single scandir pass; DirEntry caches the type and stat info per entry"""
+    files = []
+    # By path rather than dir fd: scandir(fd) shares the fd's read offset across threads
+    with os.scandir(UPLOAD_DIR_STR) as entries:
+        for entry in entries:
+            if entry.is_file(follow_symlinks=False):
+                entry_stat = entry.stat(follow_symlinks=False)
+                files.append({
+                    "filename": entry.name,
+                    "size": entry_stat.st_size,
+                    "created": entry_stat.st_ctime,
+                    "modified": entry_stat.st_mtime,
+                    "url": f"/uploads/{entry.name}"
+                })
+    return files
 
 @router.get("/uploads")
 async def list_uploaded_files():
     """List all uploaded files"""
-    try:
-        files = []
-        
-        for file_path in UPLOAD_DIR.iterdir():
-            if file_path.is_file():
-                stat = file_path.stat()
-                files.append({
-                    "filename": file_path.name,
-                    "size": stat.st_size,
-                    "created": stat.st_ctime,
-                    "modified": stat.st_mtime,
-                    "url": f"/uploads/{file_path.name}"
-                })
-        
-        return {
-            "status": "success",
-            "files": files,
-            "total": len(files)
-        }
-        
-    except Exception as e:
-        logger.error(f"Error listing files: {e}")
-        raise HTTPException(status_code=500, detail=f"Error listing files: {str(e)}")
\ No newline at end of file
+    # Listings are cached briefly since the endpoint tends to be polled
+    now = time.monotonic()
+    cached = _listing_cache.get("files")
+    if cached is not None and now - cached[0] < LISTING_CACHE_TTL:
+        files = cached[1]
+    else:
+        files = await asyncio.to_thread(_scan_uploads)
+        _listing_cache["files"] = (now, files)
+    
+    return {
+        "status": "success",
+        "files": files,
+        "total": len(files)
+    }
\ No newline at end of file
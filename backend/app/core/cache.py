@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+import redis.asyncio as aioredis
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Redis glob metacharacters, escaped so a key prefix matches only literally
+_GLOB_SPECIAL_RE = re.compile(r'([*?\[\]\\])')
+
+class ResponseCache:
+    """Two-tier response cache: in-process LRU in front of Redis"""
+
+    def __init__(self, redis_url: Optional[str], ttl: int = 300, max_entries: int = 1024,
+                 namespace: str = "chat"):
+        self.ttl = ttl
+        self.namespace = namespace
+        self.local: TTLCache = TTLCache(maxsize=max_entries, ttl=max(ttl, 1))
+        self.redis = None
+
+        if redis_url and ttl > 0:
+            try:
+                self.redis = aioredis.from_url(redis_url, socket_connect_timeout=0.5)
+            except Exception as e:
+                logger.warning(f"Redis cache unavailable, using in-process cache only: {e}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def make_key(self, session_id: str, query: str, location: Optional[Dict[str, Any]] = None) -> str:
+        """Build a cache key from session, normalized query and location"""
+        raw = f"{session_id}|{query.strip().lower()}|{json.dumps(location, sort_keys=True)}"
+        digest = hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+        # Session id stays in clear text so a session's entries can be invalidated by prefix
+        return f"{self.namespace}:{session_id}:{digest}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get cached payload, checking the local tier before Redis"""
+        if not self.enabled:
+            return None
+
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self.local[key] = value
+                    return value
+            except Exception as e:
+                logger.warning(f"Redis cache get failed: {e}")
+
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None):
+        """Store payload in both tiers"""
+        if not self.enabled:
+            return
+
+        self.local[key] = value
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(key, json.dumps(value), ex=ttl or self.ttl)
+            except Exception as e:
+                logger.warning(f"Redis cache set failed: {e}")
+
+    async def invalidate_session(self, session_id: str) -> int:
+        """Delete all cached entries for a session"""
+        prefix = f"{self.namespace}:{session_id}:"
+
+        local_keys = [key for key in list(self.local.keys()) if key.startswith(prefix)]
+        for key in local_keys:
+            self.local.pop(key, None)
+        removed = len(local_keys)
+
+        if self.redis is not None:
+            try:
+                pattern = _GLOB_SPECIAL_RE.sub(r'\\\1', prefix) + "*"
+                redis_keys = [key async for key in self.redis.scan_iter(match=pattern)]
+                if redis_keys:
+                    removed += await self.redis.delete(*redis_keys)
+            except Exception as e:
+                logger.warning(f"Redis cache invalidation failed: {e}")
+
+        return removed
+
+    async def close(self):
+        """Close the Redis connection pool"""
+        if self.redis is not None:
+            await self.redis.close()
+
+class SemanticCache:
+    """In-process cache keyed by L2-normalized query embeddings
+    
+    A lookup is a single matrix-vector product against the stored embeddings;
+    the most similar live entry is returned if its cosine similarity reaches the
+    threshold. Entries live in a fixed-size ring, so the oldest is replaced first.
+    """
+    
+    def __init__(self, max_entries: int = 512, threshold: float = 0.95, ttl: int = 300):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        # Allocated on the first put, once the embedding dimension is known
+        self._keys: Optional[np.ndarray] = None
+        self._expires = np.zeros(max_entries)
+        self._values: list = [None] * max_entries
+        self._count = 0
+        self._next = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+    
+    def get(self, embedding: np.ndarray) -> Optional[Any]:
+        """Value of the most similar unexpired entry, or None below the threshold"""
+        if not self.enabled or self._count == 0:
+            return None
+        similarities = self._keys[:self._count] @ np.asarray(embedding, dtype=np.float32).ravel()
+        similarities[self._expires[:self._count] <= time.monotonic()] = -np.inf
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            return self._values[best]
+        return None
+    
+    def put(self, embedding: np.ndarray, value: Any):
+        """Store a value under a query embedding, replacing the oldest entry when full"""
+        if not self.enabled:
+            return
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        if self._keys is None:
+            self._keys = np.zeros((self.max_entries, embedding.shape[0]), dtype=np.float32)
+        slot = self._next
+        self._keys[slot] = embedding
+        self._values[slot] = value
+        self._expires[slot] = time.monotonic() + self.ttl
+        self._next = (slot + 1) % self.max_entries
+        self._count = min(self._count + 1, self.max_entries)
+    
+    def clear(self):
+        self._values = [None] * self.max_entries
+        self._expires[:] = 0
+        self._count = 0
+        self._next = 0
@@ -0,0 +1,39 @@
+import hashlib
+from typing import Callable, Optional, Union
+
+from fastapi import Request, Response
+
+def make_etag(*parts: bytes) -> str:
+    """Weak ETag over the given byte strings"""
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(part)
+    return f'W/"{digest.hexdigest()}"'
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore the W/ prefix on either side
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+def conditional_response(request: Request, body: Union[bytes, Callable[[], bytes]],
+                         etag: Optional[str] = None, max_age: int = 30) -> Response:
+    """JSON response with ETag/Cache-Control, or an empty 304 if the client copy is current
+
+    When an etag is given, body may be a callable so it is only rendered on a miss.
+    """
+    if etag is None:
+        body = body() if callable(body) else body
+        etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": f"max-age={max_age}"}
+
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    body = body() if callable(body) else body
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,23 +1,56 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
+from typing import Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Background thread that owns the file/stream handlers
+_listener: Optional[logging.handlers.QueueListener] = None
 
 def setup_logging():
-    """Setup logging configuration"""
+    """Setup logging configuration
+    
+    Loggers only enqueue records; a QueueListener thread does the actual
+    file and stdout writes so request handlers never block on disk I/O.
+    """
+    global _listener
     
     # Create logs directory
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_dir / "mosdac_ai.log"),
-            logging.StreamHandler(sys.stdout)
-        ]
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_dir / "mosdac_ai.log",
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        delay=True
     )
+    stream_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+    
+    if _listener is not None:
+        _listener.stop()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
+    
+    # Configure logging; records are formatted by the listener's handlers
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
     
     # Set specific log levels
     logging.getLogger("uvicorn").setLevel(logging.INFO)
@@ -26,4 +59,4 @@ def setup_logging():
     logging.getLogger("sentence_transformers").setLevel(logging.WARNING)
     
     logger = logging.getLogger(__name__)
-    logger.info("Logging configured successfully")
\ No newline at end of file
+    logger.info("Logging configured successfully")
@@ -0,0 +1,184 @@
+import logging
+import secrets
+import sys
+import threading
+import time
+import uuid
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+from sortedcontainers import SortedList
+
+logger = logging.getLogger(__name__)
+
+class SessionStore:
+    """Sharded in-memory session map with a recency index
+
+    Sessions are keyed by 16-byte UUIDs and spread over SHARD_COUNT dicts, each
+    behind its own lock (always taken before the index lock). A SortedList of
+    (-updated_at_ns, key) keeps sessions ordered most recent first, so listing
+    is a slice rather than a full sort.
+    
+    The store is bounded by session count and approximate memory; the least
+    recently updated sessions are evicted first.
+    """
+    
+    SHARD_COUNT = 16
+    
+    def __init__(self, max_sessions: int = 10000, max_memory_mb: int = 64):
+        self._shards: List[Dict[bytes, Dict[str, Any]]] = [{} for _ in range(self.SHARD_COUNT)]
+        self._locks = [threading.Lock() for _ in range(self.SHARD_COUNT)]
+        self._index = SortedList()
+        self._index_lock = threading.Lock()
+        # Bumped on every mutation; with the per-instance epoch, identifies the store contents
+        self.epoch = secrets.token_hex(4)
+        self.version = 0
+        
+        self.max_sessions = max_sessions
+        self.max_bytes = max_memory_mb * 1024 * 1024
+        # Approximate size per session and in total, guarded by the index lock
+        self._sizes: Dict[bytes, int] = {}
+        self._total_bytes = 0
+        self.evicted_total = 0
+    
+    @staticmethod
+    def _key(session_id: str) -> Optional[bytes]:
+        # Accepts both the 32-char hex ids we issue and dashed UUID strings
+        try:
+            return uuid.UUID(session_id).bytes
+        except (ValueError, AttributeError, TypeError):
+            return None
+    
+    def _shard(self, key: bytes) -> int:
+        return hash(key) & (self.SHARD_COUNT - 1)
+    
+    @staticmethod
+    def _approx_size(session: Dict[str, Any]) -> int:
+        return (
+            sys.getsizeof(session)
+            + sys.getsizeof(session["title"])
+            + sys.getsizeof(session["messages"])
+            + sum(sys.getsizeof(message) for message in session["messages"])
+        )
+    
+    def _track_size(self, key: bytes, session: Dict[str, Any]):
+        # Caller holds the index lock
+        size = self._approx_size(session)
+        self._total_bytes += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+    
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+    
+    def create(self, title: str) -> Dict[str, Any]:
+        """Create and store a new session"""
+        session_uuid = uuid.uuid4()
+        key = session_uuid.bytes
+        now = time.time_ns()
+        session = {
+            "id": session_uuid.hex,
+            "title": title,
+            "created_at_ns": now,
+            "updated_at_ns": now,
+            "messages": [],
+            "message_count": 0
+        }
+        
+        shard = self._shard(key)
+        with self._locks[shard]:
+            self._shards[shard][key] = session
+            with self._index_lock:
+                self._index.add((-now, key))
+                self._track_size(key, session)
+                self.version += 1
+        self._evict()
+        return session
+    
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get a session by id, or None if it doesn't exist"""
+        key = self._key(session_id)
+        if key is None:
+            return None
+        shard = self._shard(key)
+        with self._locks[shard]:
+            return self._shards[shard].get(key)
+    
+    def update(self, session_id: str, **fields) -> Optional[Dict[str, Any]]:
+        """Update session fields and bump updated_at; None if the session doesn't exist"""
+        key = self._key(session_id)
+        if key is None:
+            return None
+        now = time.time_ns()
+        shard = self._shard(key)
+        with self._locks[shard]:
+            session = self._shards[shard].get(key)
+            if session is None:
+                return None
+            previous = session["updated_at_ns"]
+            session.update(fields)
+            session["updated_at_ns"] = now
+            with self._index_lock:
+                self._index.discard((-previous, key))
+                self._index.add((-now, key))
+                self._track_size(key, session)
+                self.version += 1
+        self._evict()
+        return session
+    
+    def delete(self, session_id: str) -> bool:
+        """Delete a session; returns False if it doesn't exist"""
+        key = self._key(session_id)
+        if key is None:
+            return False
+        return self._remove(key)
+    
+    def _remove(self, key: bytes, expected_updated_ns: Optional[int] = None) -> bool:
+        """Remove a session, optionally only if it hasn't been updated since expected_updated_ns"""
+        shard = self._shard(key)
+        with self._locks[shard]:
+            session = self._shards[shard].get(key)
+            if session is None:
+                return False
+            if expected_updated_ns is not None and session["updated_at_ns"] != expected_updated_ns:
+                return False
+            del self._shards[shard][key]
+            with self._index_lock:
+                self._index.discard((-session["updated_at_ns"], key))
+                self._total_bytes -= self._sizes.pop(key, 0)
+                self.version += 1
+        return True
+    
+    def _evict(self):
+        """Drop least recently updated sessions until count and memory are within bounds"""
+        while True:
+            with self._index_lock:
+                if len(self._index) <= self.max_sessions and self._total_bytes <= self.max_bytes:
+                    return
+                if not self._index:
+                    return
+                negative_ns, key = self._index[-1]
+            # Shard lock must be taken before the index lock, so remove outside it;
+            # a session touched in between is skipped and the next pass re-checks
+            if self._remove(key, expected_updated_ns=-negative_ns):
+                self.evicted_total += 1
+                logger.info("Evicted session %s (total evicted: %d)", key.hex(), self.evicted_total)
+    
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        """Most recently updated sessions first, touching only limit index entries"""
+        with self._index_lock:
+            keys = [key for _, key in islice(self._index, max(limit, 0))]
+        sessions = []
+        for key in keys:
+            shard = self._shard(key)
+            with self._locks[shard]:
+                session = self._shards[shard].get(key)
+            if session is not None:
+                sessions.append(session)
+        return sessions
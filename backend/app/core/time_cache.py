@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class TimeCache:
+    """UTC ISO timestamp memoized per tick and refreshed by a background task"""
+    
+    _iso: str = ""
+    _task: Optional[asyncio.Task] = None
+    
+    @classmethod
+    def iso(cls) -> str:
+        """Current UTC time in ISO format, accurate to one refresh interval"""
+        if cls._task is None or cls._task.done():
+            # Refresher not running (e.g. outside the app lifecycle), format directly
+            return datetime.utcnow().isoformat()
+        return cls._iso
+    
+    @classmethod
+    def start(cls, interval: float = 0.1):
+        """Start refreshing the cached timestamp every interval seconds"""
+        if cls._task is None or cls._task.done():
+            cls._iso = datetime.utcnow().isoformat()
+            cls._task = asyncio.create_task(cls._refresh(interval))
+    
+    @classmethod
+    async def _refresh(cls, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            cls._iso = datetime.utcnow().isoformat()
+    
+    @classmethod
+    async def stop(cls):
+        """Stop the background refresher"""
+        if cls._task is not None:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
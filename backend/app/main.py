@@ -1,14 +1,15 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uvicorn
 import logging
-from datetime import datetime
 import asyncio
 import os
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 from app.core.config import settings
@@ -17,8 +18,11 @@ from app.services.rag_service import RAGService
 from app.services.knowledge_graph import KnowledgeGraphService
 from app.services.vector_search import VectorSearchService
 from app.services.scraper_service import ScraperService
+from app.services.batching import BatchingQueue
 from app.core.database import init_db
+from app.core.cache import ResponseCache
 from app.core.logging_config import setup_logging
+from app.core.time_cache import TimeCache
 
 # Load environment variables
 load_dotenv()
@@ -27,72 +31,124 @@ load_dotenv()
 setup_logging()
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="MOSDAC AI Chatbot API",
-    description="AI-powered chatbot for MOSDAC meteorological and oceanographic data with real-time capabilities",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.ALLOWED_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Security
-security = HTTPBearer()
-
 # Global services
 rag_service: Optional[RAGService] = None
 kg_service: Optional[KnowledgeGraphService] = None
 vector_service: Optional[VectorSearchService] = None
 scraper_service: Optional[ScraperService] = None
+response_cache: Optional[ResponseCache] = None
+chat_batcher: Optional[BatchingQueue] = None
 
-@app.on_event("startup")
-async def startup_event():
+async def startup_services():
     """Initialize services on startup"""
-    global rag_service, kg_service, vector_service, scraper_service
+    global rag_service, kg_service, vector_service, scraper_service, response_cache, chat_batcher
     
     logger.info("Starting MOSDAC AI Chatbot API...")
     
+    TimeCache.start()
+    
     try:
-        # Initialize database
-        await init_db()
-        
-        # Initialize services
+        # Initialize services (construction is cheap and synchronous)
         kg_service = KnowledgeGraphService()
         vector_service = VectorSearchService()
         scraper_service = ScraperService()
         rag_service = RAGService(kg_service, vector_service)
+        response_cache = ResponseCache(
+            settings.REDIS_URL,
+            ttl=settings.CHAT_CACHE_TTL,
+            max_entries=settings.CHAT_CACHE_MAX_ENTRIES
+        )
+        chat_batcher = BatchingQueue(
+            rag_service,
+            max_batch=settings.CHAT_BATCH_MAX_SIZE,
+            max_wait_ms=settings.CHAT_BATCH_MAX_WAIT_MS
+        )
         
-        # Load existing data if available
-        await vector_service.load_index()
-        await kg_service.connect()
+        # Initialize database, load existing data and connect concurrently
+        results = await asyncio.gather(
+            init_db(),
+            vector_service.load_index(),
+            kg_service.connect(),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, Exception)]
+        for error in errors:
+            logger.error("Service initialization step failed: %s", error)
+        if errors:
+            raise errors[0]
         
         logger.info("All services initialized successfully")
         
     except Exception as e:
-        logger.error(f"Failed to initialize services: {e}")
+        logger.error("Failed to initialize services: %s", e)
         raise
 
-@app.on_event("shutdown")
-async def shutdown_event():
+async def shutdown_services():
     """Cleanup on shutdown"""
     logger.info("Shutting down MOSDAC AI Chatbot API...")
     
+    await TimeCache.stop()
+    if chat_batcher:
+        await chat_batcher.close()
+    if rag_service:
+        await rag_service.close()
     if kg_service:
         await kg_service.close()
     if vector_service:
         await vector_service.close()
+    if response_cache:
+        await response_cache.close()
+    if scraper_service:
+        await scraper_service.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup_services()
+    # Routers register their own background tasks with on_event; Starlette only
+    # runs those itself when no lifespan is given, so run them here
+    await app.router.startup()
+    try:
+        yield
+    finally:
+        await app.router.shutdown()
+        await shutdown_services()
+
+# Initialize FastAPI app
+app = FastAPI(
+    title="MOSDAC AI Chatbot API",
+    description="AI-powered chatbot for MOSDAC meteorological and oceanographic data with real-time capabilities",
+    version="1.0.0",
+    docs_url="/docs",
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.ALLOWED_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
 
-# Mount static files for uploads
-app.mount("/uploads", StaticFiles(directory="./data/uploads"), name="uploads")
+# Compress large JSON payloads for clients that send Accept-Encoding: gzip
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL
+)
+
+# Unexpected errors are logged once here instead of in per-route try/except blocks;
+# the response doesn't echo exception text back to clients
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.error("Unhandled error on %s %s: %s", request.method, request.url.path, exc, exc_info=exc)
+    return ORJSONResponse({"detail": "Internal server error"}, status_code=500)
+
+# Mount static files for uploads (the directory is created by the upload router at startup)
+app.mount("/uploads", StaticFiles(directory="./data/uploads", check_dir=False), name="uploads")
 
 # Include routers
 app.include_router(chat.router, prefix="/api/v1", tags=["chat"])
@@ -119,7 +175,7 @@ async def root():
             "Knowledge graph integration",
             "Vector search capabilities"
         ],
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": TimeCache.iso()
     }
 
 # Dependency to get services
@@ -143,11 +199,23 @@ def get_scraper_service() -> ScraperService:
         raise HTTPException(status_code=503, detail="Scraper service not initialized")
     return scraper_service
 
+def get_response_cache() -> ResponseCache:
+    if response_cache is None:
+        raise HTTPException(status_code=503, detail="Response cache not initialized")
+    return response_cache
+
+def get_chat_batcher() -> BatchingQueue:
+    if chat_batcher is None:
+        raise HTTPException(status_code=503, detail="Chat batcher not initialized")
+    return chat_batcher
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
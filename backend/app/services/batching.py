@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+from app.services.rag_service import RAGService, RAGResponse
+
+logger = logging.getLogger(__name__)
+
+class BatchingQueue:
+    """Micro-batcher that groups concurrent chat queries into a single RAG call"""
+
+    def __init__(self, rag_service: RAGService, max_batch: int = 32, max_wait_ms: int = 10):
+        self.rag_service = rag_service
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    async def submit(self, query: str, session_id: str = "default") -> RAGResponse:
+        """Queue a query and wait for its response"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((query, session_id, future))
+        return await future
+
+    async def _run(self):
+        """Collect up to max_batch queries within max_wait and dispatch them together"""
+        while True:
+            items = [await self.queue.get()]
+            self._drain(items)
+
+            # Give concurrent requests a short window to join the batch
+            if len(items) < self.max_batch and self.max_wait > 0:
+                await asyncio.sleep(self.max_wait)
+                self._drain(items)
+
+            task = asyncio.create_task(self._dispatch(items))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    def _drain(self, items: List[Tuple[str, str, asyncio.Future]]):
+        while len(items) < self.max_batch and not self.queue.empty():
+            items.append(self.queue.get_nowait())
+
+    async def _dispatch(self, items: List[Tuple[str, str, asyncio.Future]]):
+        # Skip requests whose clients have already gone away
+        items = [item for item in items if not item[2].done()]
+        if not items:
+            return
+
+        logger.debug(f"Dispatching chat batch of {len(items)} queries")
+
+        try:
+            responses = await self.rag_service.process_query_batch(
+                [query for query, _, _ in items],
+                [session_id for _, session_id, _ in items]
+            )
+        except Exception as e:
+            logger.error(f"Batch query processing failed: {e}")
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), response in zip(items, responses):
+            if not future.done():
+                future.set_result(response)
+
+    async def close(self):
+        """Stop the background worker"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
@@ -0,0 +1,69 @@
+import logging
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+from numba import njit, prange
+
+logger = logging.getLogger(__name__)
+
+@njit(parallel=True, cache=True)
+def build_pairs(url_codes: np.ndarray, type_codes: np.ndarray, window: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (source, target) indices of same-page, different-type entities within the window"""
+    n = url_codes.shape[0]
+
+    # First pass: count matches per entity so every row can write into its own slice
+    counts = np.zeros(n, dtype=np.int64)
+    for i in prange(n):
+        count = 0
+        for j in range(i + 1, min(i + window, n)):
+            if url_codes[i] == url_codes[j] and type_codes[i] != type_codes[j]:
+                count += 1
+        counts[i] = count
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+
+    # Second pass: fill the pair indices in entity-major order
+    src_idx = np.empty(offsets[n], dtype=np.int64)
+    tgt_idx = np.empty(offsets[n], dtype=np.int64)
+    for i in prange(n):
+        k = offsets[i]
+        for j in range(i + 1, min(i + window, n)):
+            if url_codes[i] == url_codes[j] and type_codes[i] != type_codes[j]:
+                src_idx[k] = i
+                tgt_idx[k] = j
+                k += 1
+
+    return src_idx, tgt_idx
+
+def _encode(values: List[str]) -> np.ndarray:
+    """Map strings to small integer codes"""
+    codes: Dict[str, int] = {}
+    return np.fromiter((codes.setdefault(value, len(codes)) for value in values),
+                       dtype=np.int32, count=len(values))
+
+def build_cooccurrence_relationships(entities: List[Dict[str, Any]], window: int = 10) -> List[Dict[str, Any]]:
+    """Relate entities of different types found near each other on the same page"""
+    if len(entities) < 2:
+        return []
+
+    url_codes = _encode([entity['source_url'] for entity in entities])
+    type_codes = _encode([entity['type'] for entity in entities])
+
+    src_idx, tgt_idx = build_pairs(url_codes, type_codes, window)
+
+    relationships = []
+    for i, j in zip(src_idx.tolist(), tgt_idx.tolist()):
+        source, target = entities[i], entities[j]
+        relationships.append({
+            'source': source['text'],
+            'source_type': source['type'],
+            'target': target['text'],
+            'target_type': target['type'],
+            'relation': 'co_occurs_with',
+            'confidence': 0.6,
+            'source_url': source['source_url']
+        })
+
+    logger.debug(f"Built {len(relationships)} co-occurrence relationships from {len(entities)} entities")
+    return relationships
@@ -1,28 +1,73 @@
-import requests
 from bs4 import BeautifulSoup
 import json
+import orjson
 import os
 import re
 from urllib.parse import urljoin, urlparse
 import time
 from pathlib import Path
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from typing import Dict, List, Any, Optional
 import logging
 from dataclasses import dataclass, asdict
+from functools import lru_cache, partial
 from collections import defaultdict
-import networkx as nx
-from sentence_transformers import SentenceTransformer
-import numpy as np
 from datetime import datetime
-import hashlib
 import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import aiohttp
 import aiofiles
+import ahocorasick
+import xxhash
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Hex length of generate_url_hash keys; cache entries keyed otherwise predate it
+URL_HASH_LENGTH = 16
+
+# Pages larger than this are skipped; checked against Content-Length and while reading
+MAX_PAGE_BYTES = 5 * 1024 * 1024
+PAGE_READ_CHUNK_SIZE = 64 * 1024
+
+# Entity patterns made only of word characters, hyphens and spaces match literally
+_LITERAL_PATTERN_RE = re.compile(r'[\w\- ]+')
+
+# Check if it's a valid MOSDAC or ISRO related URL
+_VALID_DOMAINS = ('mosdac.gov.in', 'isro.gov.in', 'nrsc.gov.in', 'sac.gov.in')
+# Exclude certain file types and paths
+_EXCLUDED_EXTENSIONS = ('.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx')
+_EXCLUDED_PATHS_RE = re.compile('/download/|/files/|/media/')
+
+@lru_cache(maxsize=100_000)
+def _valid_url_netloc(url: str) -> Optional[str]:
+    """The URL's netloc if it passes is_valid_url, else None
+    
+    Links repeat across pages, so results are memoised; returning the netloc
+    lets callers classify the link without parsing it again.
+    """
+    if len(url) >= 500 or '//' not in url:
+        # No '//' means urlparse would find no host
+        return None
+    
+    url_lower = url.lower()
+    if url_lower.endswith(_EXCLUDED_EXTENSIONS) or _EXCLUDED_PATHS_RE.search(url_lower):
+        return None
+    
+    try:
+        netloc = urlparse(url).netloc
+    except ValueError:
+        return None
+    if any(domain in netloc for domain in _VALID_DOMAINS):
+        return netloc
+    return None
+
+_HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+# Every tag any extractor looks at, collected in one traversal
+_WALK_TAGS = ['title', *sorted(_HEADING_TAGS), 'p', 'li', 'table', 'meta', 'a', 'img']
+
 @dataclass
 class ScrapedContent:
     """Data class for scraped content"""
@@ -35,9 +80,18 @@ class ScrapedContent:
     scraped_at: float
     content_hash: str
 
+def write_rows_csv(rows: List[Dict], path: Path):
+    """Write a list of same-keyed dicts as CSV with a header row"""
+    pacsv.write_csv(pa.Table.from_pylist(rows), str(path))
+
 class EnhancedMOSDACWebScraper:
     """Enhanced web scraper with async support and better error handling"""
     
+    # Concurrent crawl tasks, each with at most one request in flight
+    CRAWL_WORKERS = 16
+    # Re-serializing each table's subtree is costly and nothing reads it back
+    KEEP_TABLE_HTML = False
+    
     def __init__(self, base_url="https://www.mosdac.gov.in", output_dir="./data"):
         self.base_url = base_url
         self.output_dir = Path(output_dir)
@@ -49,23 +103,73 @@ class EnhancedMOSDACWebScraper:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
                 'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
+                'Accept-Encoding': 'gzip, deflate, br',
                 'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1'
             },
-            'timeout': aiohttp.ClientTimeout(total=30),
-            'connector': aiohttp.TCPConnector(limit=10, limit_per_host=5)
+            'timeout': aiohttp.ClientTimeout(total=30)
+        }
+        # Connection pool for the shared session; DNS answers and idle
+        # keep-alive connections are reused across crawls
+        self.connector_config = {
+            'limit': 50,
+            'limit_per_host': 10,
+            'ttl_dns_cache': 300,
+            'use_dns_cache': True,
+            'keepalive_timeout': 60
         }
+        self._session: Optional[aiohttp.ClientSession] = None
         
         # Initialize components
         self.scraped_urls = set()
         self.failed_urls = set()
         self.content_cache = {}
+        # Hashes of everything in content_cache, for O(1) duplicate checks
+        self._content_hashes = set()
         self.entity_extractor = EnhancedEntityExtractor()
+        # Append handle on the JSONL cache log, opened on the first new entry
+        self._cache_log = None
+        self._cache_log_lock = asyncio.Lock()
+        # Worker processes for HTML parsing, started on first use
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
         
         # Load existing data if available
         asyncio.create_task(self.load_existing_data())
     
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session, created on first use and kept until close()"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**self.connector_config),
+                **self.session_config
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the HTTP session, cache log and parsing workers"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        await self.save_cache()
+        await self.close_parse_pool()
+    
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        if self._parse_pool is None:
+            # spawn rather than fork: the parent has logging and event loop threads
+            self._parse_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._parse_pool
+    
+    async def close_parse_pool(self):
+        """Shut down the parsing worker processes without blocking the event loop"""
+        if self._parse_pool is not None:
+            pool, self._parse_pool = self._parse_pool, None
+            await asyncio.get_running_loop().run_in_executor(
+                None, partial(pool.shutdown, cancel_futures=True)
+            )
+    
     def setup_directories(self):
         """Create necessary directories"""
         directories = ["raw", "processed", "pdfs", "metadata", "embeddings", "knowledge_graph"]
@@ -73,87 +177,196 @@ class EnhancedMOSDACWebScraper:
             (self.output_dir / directory).mkdir(parents=True, exist_ok=True)
     
     async def load_existing_data(self):
-        """Load existing scraped data to avoid reprocessing"""
-        cache_file = self.output_dir / "metadata" / "content_cache.json"
-        if cache_file.exists():
-            try:
-                async with aiofiles.open(cache_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    self.content_cache = json.loads(content)
-                logger.info(f"Loaded {len(self.content_cache)} cached items")
-            except Exception as e:
-                logger.warning(f"Could not load cache: {e}")
+        """Load existing scraped data to avoid reprocessing
+        
+        The cache is an append-only JSONL log of [url_hash, entry] lines; later
+        lines win. A content_cache.json from older versions is read first and
+        folded into the log.
+        """
+        legacy_file = self.output_dir / "metadata" / "content_cache.json"
+        cache_file = self.output_dir / "metadata" / "content_cache.jsonl"
+        needs_compaction = False
+        try:
+            if legacy_file.exists():
+                async with aiofiles.open(legacy_file, 'rb') as f:
+                    self.content_cache = orjson.loads(await f.read())
+                needs_compaction = True
+            
+            if cache_file.exists():
+                line_count = 0
+                async with aiofiles.open(cache_file, 'rb') as f:
+                    async for line in f:
+                        line_count += 1
+                        try:
+                            url_hash, entry = orjson.loads(line)
+                        except (orjson.JSONDecodeError, ValueError):
+                            # Typically a line cut short by a crash mid-write
+                            logger.warning(f"Skipping malformed cache line {line_count}")
+                            needs_compaction = True
+                            continue
+                        self.content_cache[url_hash] = entry
+                if line_count > len(self.content_cache):
+                    needs_compaction = True
+            
+            if self._rehash_cache_entries():
+                needs_compaction = True
+            
+            self._content_hashes = {
+                item.get('content_hash') for item in self.content_cache.values()
+            }
+            logger.info(f"Loaded {len(self.content_cache)} cached items")
+            
+            # The legacy file is only removed once its entries are safely in the log
+            if needs_compaction and await self.compact_cache() and legacy_file.exists():
+                legacy_file.unlink()
+        except Exception as e:
+            logger.warning(f"Could not load cache: {e}")
+    
+    def _rehash_cache_entries(self) -> bool:
+        """Re-key entries cached under older hash functions; True if any changed"""
+        stale = [
+            url_hash for url_hash in self.content_cache
+            if len(url_hash) != URL_HASH_LENGTH
+        ]
+        for url_hash in stale:
+            entry = self.content_cache.pop(url_hash)
+            entry['content_hash'] = self.generate_content_hash(entry['content'])
+            self.content_cache[self.generate_url_hash(entry['url'])] = entry
+        if stale:
+            logger.info(f"Re-hashed {len(stale)} cached items")
+        return bool(stale)
+    
+    async def _append_cache_entry(self, url_hash: str, entry: Dict):
+        """Append one entry to the cache log, opening it on first use"""
+        # Held across the write so save_cache or compact_cache can't close or
+        # replace the log under it
+        async with self._cache_log_lock:
+            if self._cache_log is None:
+                self._cache_log = await aiofiles.open(
+                    self.output_dir / "metadata" / "content_cache.jsonl", 'ab'
+                )
+            await self._cache_log.write(orjson.dumps([url_hash, entry]) + b'\n')
     
     async def save_cache(self):
-        """Save content cache"""
-        cache_file = self.output_dir / "metadata" / "content_cache.json"
+        """Flush and close the cache log; entries are appended as pages are scraped"""
         try:
-            async with aiofiles.open(cache_file, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(self.content_cache, indent=2, ensure_ascii=False))
+            async with self._cache_log_lock:
+                await self._close_cache_log()
         except Exception as e:
             logger.error(f"Could not save cache: {e}")
     
-    def is_valid_url(self, url: str) -> bool:
-        """Enhanced URL validation"""
+    async def _close_cache_log(self):
+        """Close the cache log handle; the caller holds _cache_log_lock"""
+        if self._cache_log is not None:
+            log, self._cache_log = self._cache_log, None
+            await log.close()
+    
+    async def compact_cache(self) -> bool:
+        """Rewrite the cache log with one line per cached URL
+        
+        The log lock is held from snapshot through rename, so no appends land
+        on the old file after it has been read. Returns True once the
+        rewritten log is in place.
+        """
+        cache_file = self.output_dir / "metadata" / "content_cache.jsonl"
+        tmp_file = cache_file.with_suffix('.jsonl.tmp')
         try:
-            parsed = urlparse(url)
-            # Check if it's a valid MOSDAC or ISRO related URL
-            valid_domains = ['mosdac.gov.in', 'isro.gov.in', 'nrsc.gov.in', 'sac.gov.in']
-            domain_check = any(domain in parsed.netloc for domain in valid_domains)
-            
-            # Exclude certain file types and paths
-            excluded_extensions = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx']
-            excluded_paths = ['/download/', '/files/', '/media/']
-            
-            extension_check = not any(url.lower().endswith(ext) for ext in excluded_extensions)
-            path_check = not any(path in url.lower() for path in excluded_paths)
-            
-            return domain_check and extension_check and path_check and len(url) < 500
-        except Exception:
+            async with self._cache_log_lock:
+                await self._close_cache_log()
+                data = b''.join(
+                    orjson.dumps([url_hash, entry]) + b'\n'
+                    for url_hash, entry in self.content_cache.items()
+                )
+                async with aiofiles.open(tmp_file, 'wb') as f:
+                    await f.write(data)
+                os.replace(tmp_file, cache_file)
+            logger.info(f"Compacted cache to {len(self.content_cache)} items")
+            return True
+        except Exception as e:
+            logger.error(f"Could not compact cache: {e}")
             return False
     
-    def generate_content_hash(self, content: str) -> str:
+    @staticmethod
+    def is_valid_url(url: str) -> bool:
+        """Enhanced URL validation"""
+        return _valid_url_netloc(url) is not None
+    
+    @staticmethod
+    def generate_content_hash(content: str) -> str:
         """Generate hash for content deduplication"""
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
+        return xxhash.xxh3_128_hexdigest(content.encode('utf-8'))
     
-    def extract_enhanced_text_content(self, soup: BeautifulSoup) -> str:
-        """Extract and clean text content with better structure preservation"""
-        # Remove unwanted elements
+    @staticmethod
+    def generate_url_hash(url: str) -> str:
+        """Generate the content cache key for a URL"""
+        return xxhash.xxh3_64_hexdigest(url.encode())
+    
+    @staticmethod
+    def _strip_boilerplate(soup: BeautifulSoup):
+        """Remove elements that never contribute content"""
         for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
             element.decompose()
+    
+    @staticmethod
+    def _collect_elements(soup: BeautifulSoup) -> Dict[str, List]:
+        """Walk the tree once, bucketing the tags the extractors need (in document order)"""
+        elements = {name: [] for name in ('title', 'heading', 'p', 'li', 'table', 'meta', 'a', 'img')}
+        for element in soup.find_all(_WALK_TAGS):
+            name = element.name
+            if name in _HEADING_TAGS:
+                elements['heading'].append(element)
+            elif name == 'a':
+                if element.has_attr('href'):
+                    elements['a'].append(element)
+            elif name == 'img':
+                if element.has_attr('src'):
+                    elements['img'].append(element)
+            else:
+                elements[name].append(element)
+        return elements
+    
+    @classmethod
+    def extract_enhanced_text_content(cls, soup: BeautifulSoup, elements: Optional[Dict[str, List]] = None) -> str:
+        """Extract and clean text content with better structure preservation"""
+        if elements is None:
+            # Remove unwanted elements
+            cls._strip_boilerplate(soup)
+            elements = cls._collect_elements(soup)
         
         # Extract text with some structure preservation
         text_parts = []
         
         # Extract title
-        title = soup.find('title')
-        if title:
-            text_parts.append(f"Title: {title.get_text(strip=True)}")
+        if elements['title']:
+            text_parts.append(f"Title: {elements['title'][0].get_text(strip=True)}")
         
         # Extract headings with hierarchy
-        for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
+        for heading in elements['heading']:
             level = heading.name[1]
             text_parts.append(f"{'#' * int(level)} {heading.get_text(strip=True)}")
         
         # Extract paragraphs
-        for p in soup.find_all('p'):
+        for p in elements['p']:
             text = p.get_text(strip=True)
             if text and len(text) > 20:  # Filter out short paragraphs
                 text_parts.append(text)
         
         # Extract list items
-        for li in soup.find_all('li'):
+        for li in elements['li']:
             text = li.get_text(strip=True)
             if text and len(text) > 10:
                 text_parts.append(f"• {text}")
         
         return '\n'.join(text_parts)
     
-    def extract_enhanced_tables(self, soup: BeautifulSoup) -> List[Dict]:
+    @classmethod
+    def extract_enhanced_tables(cls, soup: BeautifulSoup, elements: Optional[Dict[str, List]] = None) -> List[Dict]:
         """Extract tables with better structure and metadata"""
+        if elements is None:
+            elements = cls._collect_elements(soup)
         tables = []
         
-        for i, table in enumerate(soup.find_all('table')):
+        for i, table in enumerate(elements['table']):
             # Extract table caption or nearby heading
             caption = ""
             if table.find('caption'):
@@ -180,20 +393,27 @@ class EnhancedMOSDACWebScraper:
                     rows.append(cells)
             
             if rows:
-                tables.append({
+                table_data = {
                     'id': f"table_{i}",
                     'caption': caption,
                     'headers': headers,
                     'data': rows,
                     'row_count': len(rows),
-                    'column_count': len(headers) if headers else len(rows[0]) if rows else 0,
-                    'raw_html': str(table)
-                })
+                    'column_count': len(headers) if headers else len(rows[0]) if rows else 0
+                }
+                if cls.KEEP_TABLE_HTML:
+                    table_data['raw_html'] = str(table)
+                tables.append(table_data)
         
         return tables
     
-    def extract_comprehensive_metadata(self, soup: BeautifulSoup, url: str) -> Dict:
+    @classmethod
+    def extract_comprehensive_metadata(cls, soup: BeautifulSoup, url: str,
+                                       elements: Optional[Dict[str, List]] = None) -> Dict:
         """Extract comprehensive metadata from HTML"""
+        if elements is None:
+            elements = cls._collect_elements(soup)
+        page_netloc = urlparse(url).netloc
         metadata = {
             'url': url,
             'title': '',
@@ -208,12 +428,11 @@ class EnhancedMOSDACWebScraper:
         }
         
         # Title
-        title_tag = soup.find('title')
-        if title_tag:
-            metadata['title'] = title_tag.get_text(strip=True)
+        if elements['title']:
+            metadata['title'] = elements['title'][0].get_text(strip=True)
         
         # Meta tags
-        meta_tags = soup.find_all('meta')
+        meta_tags = elements['meta']
         for meta in meta_tags:
             name = meta.get('name', '').lower()
             content = meta.get('content', '')
@@ -230,7 +449,7 @@ class EnhancedMOSDACWebScraper:
                 metadata['language'] = content
         
         # Open Graph tags
-        og_tags = soup.find_all('meta', property=lambda x: x and x.startswith('og:'))
+        og_tags = [meta for meta in meta_tags if meta.get('property', '').startswith('og:')]
         for og in og_tags:
             property_name = og.get('property', '')
             content = og.get('content', '')
@@ -242,20 +461,25 @@ class EnhancedMOSDACWebScraper:
             elif property_name == 'og:type':
                 metadata['page_type'] = content
         
-        # Extract links
-        for link in soup.find_all('a', href=True):
+        # Extract links, once per target URL
+        seen_links = set()
+        for link in elements['a']:
             href = link['href']
             full_url = urljoin(url, href)
-            if self.is_valid_url(full_url):
+            if full_url in seen_links:
+                continue
+            link_netloc = _valid_url_netloc(full_url)
+            if link_netloc is not None:
+                seen_links.add(full_url)
                 metadata['links'].append({
                     'url': full_url,
                     'text': link.get_text(strip=True)[:100],  # Limit text length
                     'title': link.get('title', ''),
-                    'type': 'internal' if urlparse(full_url).netloc == urlparse(url).netloc else 'external'
+                    'type': 'internal' if link_netloc == page_netloc else 'external'
                 })
         
         # Extract images
-        for img in soup.find_all('img', src=True):
+        for img in elements['img']:
             img_url = urljoin(url, img['src'])
             metadata['images'].append({
                 'url': img_url,
@@ -267,30 +491,83 @@ class EnhancedMOSDACWebScraper:
         
         return metadata
     
-    async def scrape_page_enhanced(self, session: aiohttp.ClientSession, url: str) -> Optional[ScrapedContent]:
-        """Enhanced page scraping with async support"""
-        try:
-            # Check if already scraped
-            if url in self.scraped_urls:
-                logger.debug(f"Already scraped: {url}")
+    @staticmethod
+    async def _read_body(response: aiohttp.ClientResponse) -> Optional[bytes]:
+        """Read the response body, or None once it exceeds MAX_PAGE_BYTES"""
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(PAGE_READ_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_PAGE_BYTES:
                 return None
+            chunks.append(chunk)
+        return b''.join(chunks)
+    
+    @staticmethod
+    def _conditional_headers(cached_data: Optional[Dict]) -> Optional[Dict[str, str]]:
+        """If-None-Match / If-Modified-Since headers from a cached page's validators"""
+        if cached_data is None:
+            return None
+        metadata = cached_data['metadata']
+        headers = {}
+        if metadata.get('etag'):
+            headers['If-None-Match'] = metadata['etag']
+        if metadata.get('last_modified'):
+            headers['If-Modified-Since'] = metadata['last_modified']
+        return headers or None
+    
+    async def scrape_page_enhanced(self, session: aiohttp.ClientSession, url: str,
+                                   revalidate: bool = False) -> Optional[ScrapedContent]:
+        """Enhanced page scraping with async support
+        
+        With revalidate, a cached page is re-requested conditionally on its
+        ETag/Last-Modified and the cached content is returned on 304.
+        """
+        try:
+            url_hash = self.generate_url_hash(url)
+            cached_data = self.content_cache.get(url_hash)
             
-            # Check cache
-            url_hash = hashlib.md5(url.encode()).hexdigest()
-            if url_hash in self.content_cache:
-                logger.debug(f"Using cached content for: {url}")
-                cached_data = self.content_cache[url_hash]
-                return ScrapedContent(**cached_data)
+            if not revalidate:
+                # Check if already scraped
+                if url in self.scraped_urls:
+                    logger.debug(f"Already scraped: {url}")
+                    return None
+                
+                # Check cache
+                if cached_data is not None:
+                    logger.debug(f"Using cached content for: {url}")
+                    return ScrapedContent(**cached_data)
             
             logger.info(f"Scraping: {url}")
+            headers = self._conditional_headers(cached_data) if revalidate else None
             
             # Make request with retry logic
             max_retries = 3
             for attempt in range(max_retries):
                 try:
-                    async with session.get(url) as response:
+                    async with session.get(url, headers=headers) as response:
+                        if response.status == 304 and cached_data is not None:
+                            logger.debug(f"Not modified, using cached content for: {url}")
+                            self.scraped_urls.add(url)
+                            return ScrapedContent(**cached_data)
                         response.raise_for_status()
-                        content = await response.text()
+                        
+                        # Check content type and size from the headers, before reading the body
+                        content_type = response.headers.get('content-type', '').lower()
+                        if 'text/html' not in content_type:
+                            logger.warning(f"Skipping non-HTML content: {url}")
+                            return None
+                        if (response.content_length or 0) > MAX_PAGE_BYTES:
+                            logger.warning(f"Skipping oversized page ({response.content_length} bytes): {url}")
+                            return None
+                        
+                        # Raw bytes: lets the parser sniff the charset in C instead of aiohttp's chardet
+                        content = await self._read_body(response)
+                        if content is None:
+                            logger.warning(f"Skipping oversized page (over {MAX_PAGE_BYTES} bytes): {url}")
+                            return None
+                        etag = response.headers.get('ETag')
+                        last_modified = response.headers.get('Last-Modified')
                         break
                 except Exception as e:
                     if attempt == max_retries - 1:
@@ -298,34 +575,33 @@ class EnhancedMOSDACWebScraper:
                     logger.warning(f"Retry {attempt + 1} for {url}: {e}")
                     await asyncio.sleep(2 ** attempt)  # Exponential backoff
             
-            # Check content type
-            content_type = response.headers.get('content-type', '').lower()
-            if 'text/html' not in content_type:
-                logger.warning(f"Skipping non-HTML content: {url}")
-                return None
-            
-            # Parse HTML
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Extract content
-            text_content = self.extract_enhanced_text_content(soup)
+            # Parsing and extraction are CPU-bound; run them in a worker process
+            # so the event loop keeps downloading other pages meanwhile
+            parsed = await asyncio.get_running_loop().run_in_executor(
+                self._get_parse_pool(), _parse_page, content, response.charset, url
+            )
             
             # Skip if content is too short
-            if len(text_content.strip()) < 100:
+            if parsed is None:
                 logger.warning(f"Skipping page with minimal content: {url}")
                 return None
+            text_content, content_hash, tables, metadata, entities = parsed
             
-            # Generate content hash for deduplication
-            content_hash = self.generate_content_hash(text_content)
-            
-            # Check for duplicate content
-            if content_hash in [item.get('content_hash') for item in self.content_cache.values()]:
+            # Check for duplicate content; a revalidated page that came back
+            # unchanged is served from the cache
+            if cached_data is not None and cached_data['content_hash'] == content_hash:
+                cached_metadata = cached_data['metadata']
+                if (cached_metadata.get('etag'), cached_metadata.get('last_modified')) != (etag, last_modified):
+                    # Persist the new validators so they survive a restart
+                    cached_metadata.update(etag=etag, last_modified=last_modified)
+                    await self._append_cache_entry(url_hash, cached_data)
+                self.scraped_urls.add(url)
+                return ScrapedContent(**cached_data)
+            if content_hash in self._content_hashes:
                 logger.debug(f"Skipping duplicate content: {url}")
                 return None
-            
-            tables = self.extract_enhanced_tables(soup)
-            metadata = self.extract_comprehensive_metadata(soup, url)
-            entities = self.entity_extractor.extract_entities(text_content)
+            if cached_data is not None:
+                self._content_hashes.discard(cached_data['content_hash'])
             
             # Create content object
             content_obj = ScrapedContent(
@@ -339,13 +615,16 @@ class EnhancedMOSDACWebScraper:
                 content_hash=content_hash
             )
             
-            # Cache the content
-            self.content_cache[url_hash] = asdict(content_obj)
+            # Cache the content; cached pages only need link URLs, to be crawled through
+            entry = asdict(content_obj)
+            entry['metadata']['links'] = [{'url': link['url']} for link in metadata['links']]
+            # Validators for conditional re-requests
+            entry['metadata']['etag'] = etag
+            entry['metadata']['last_modified'] = last_modified
+            self.content_cache[url_hash] = entry
+            self._content_hashes.add(content_hash)
             self.scraped_urls.add(url)
-            
-            # Save progress periodically
-            if len(self.scraped_urls) % 10 == 0:
-                await self.save_cache()
+            await self._append_cache_entry(url_hash, entry)
             
             logger.info(f"Successfully scraped: {url} ({len(text_content)} chars, {len(entities)} entities)")
             return content_obj
@@ -356,57 +635,66 @@ class EnhancedMOSDACWebScraper:
             return None
     
     async def crawl_website_enhanced(self, max_pages: int = 100, max_depth: int = 3) -> List[ScrapedContent]:
-        """Enhanced crawling with async support and depth control"""
-        urls_to_visit = [(self.base_url, 0)]  # (url, depth)
+        """Enhanced crawling with async support and depth control
+        
+        CRAWL_WORKERS tasks pull from a shared frontier queue and push discovered
+        links back onto it, so at most CRAWL_WORKERS requests are in flight.
+        The parsing pool outlives the crawl and is shut down in close().
+        """
+        urls_to_visit: asyncio.Queue = asyncio.Queue()  # (url, depth)
+        urls_to_visit.put_nowait((self.base_url, 0))
+        # Every URL ever put on the frontier, so membership checks don't scan the queue
+        queued_urls = {self.base_url}
         visited_urls = set()
         all_content = []
         
         logger.info(f"Starting async crawl with max_pages={max_pages}, max_depth={max_depth}")
         
-        async with aiohttp.ClientSession(**self.session_config) as session:
-            while urls_to_visit and len(all_content) < max_pages:
-                # Process URLs in batches for better performance
-                batch_size = min(5, len(urls_to_visit))
-                current_batch = urls_to_visit[:batch_size]
-                urls_to_visit = urls_to_visit[batch_size:]
-                
-                # Create tasks for concurrent processing
-                tasks = []
-                for url, depth in current_batch:
-                    if url not in visited_urls and depth <= max_depth:
-                        visited_urls.add(url)
-                        tasks.append(self.scrape_page_enhanced(session, url))
-                
-                # Execute tasks concurrently
-                if tasks:
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def worker(session: aiohttp.ClientSession):
+            while True:
+                url, depth = await urls_to_visit.get()
+                try:
+                    # Once max_pages is reached the remaining frontier is just drained
+                    if len(all_content) >= max_pages or url in visited_urls or depth > max_depth:
+                        continue
+                    visited_urls.add(url)
                     
-                    for result in results:
-                        if isinstance(result, ScrapedContent):
-                            all_content.append(result)
-                            
-                            # Add new URLs to visit (only if within depth limit)
-                            current_depth = next(depth for url, depth in current_batch if url == result.url)
-                            if current_depth < max_depth:
-                                new_urls = []
-                                for link in result.metadata.get('links', []):
-                                    link_url = link['url']
-                                    if (link_url not in visited_urls and 
-                                        link_url not in [u[0] for u in urls_to_visit] and
-                                        link_url not in self.failed_urls):
-                                        new_urls.append((link_url, current_depth + 1))
-                                
-                                # Add new URLs (limit to prevent explosion)
-                                urls_to_visit.extend(new_urls[:10])  # Limit new URLs per page
-                        elif isinstance(result, Exception):
-                            logger.error(f"Task failed: {result}")
-                
-                # Be respectful - add delay between batches
-                await asyncio.sleep(1)
-                
-                # Progress report
-                if len(all_content) % 5 == 0:
-                    logger.info(f"Scraped {len(all_content)} pages, {len(urls_to_visit)} URLs remaining")
+                    result = await self.scrape_page_enhanced(session, url)
+                    if result is None or len(all_content) >= max_pages:
+                        continue
+                    all_content.append(result)
+                    
+                    # Add new URLs to visit (only if within depth limit)
+                    if depth < max_depth:
+                        new_urls = 0
+                        for link in result.metadata.get('links', []):
+                            # Add new URLs (limit to prevent explosion)
+                            if new_urls >= 10:  # Limit new URLs per page
+                                break
+                            link_url = link['url']
+                            if (link_url not in queued_urls and
+                                link_url not in visited_urls and
+                                link_url not in self.failed_urls):
+                                queued_urls.add(link_url)
+                                urls_to_visit.put_nowait((link_url, depth + 1))
+                                new_urls += 1
+                    
+                    # Progress report
+                    if len(all_content) % 5 == 0:
+                        logger.info(f"Scraped {len(all_content)} pages, {urls_to_visit.qsize()} URLs remaining")
+                except Exception as e:
+                    logger.error(f"Task failed: {e}")
+                finally:
+                    urls_to_visit.task_done()
+        
+        session = await self.get_session()
+        workers = [asyncio.create_task(worker(session)) for _ in range(self.CRAWL_WORKERS)]
+        try:
+            await urls_to_visit.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
         
         logger.info(f"Crawling completed: {len(all_content)} pages scraped, {len(self.failed_urls)} failed")
         return all_content
@@ -417,8 +705,8 @@ class EnhancedMOSDACWebScraper:
         
         # Save raw data
         raw_file = self.output_dir / "raw" / f"scraped_data_{timestamp}.json"
-        async with aiofiles.open(raw_file, 'w', encoding='utf-8') as f:
-            await f.write(json.dumps([asdict(item) for item in data], indent=2, ensure_ascii=False))
+        async with aiofiles.open(raw_file, 'wb') as f:
+            await f.write(orjson.dumps([asdict(item) for item in data], option=orjson.OPT_INDENT_2))
         
         # Create structured datasets
         pages_data = []
@@ -464,23 +752,15 @@ class EnhancedMOSDACWebScraper:
                     'data': json.dumps(table['data'])
                 })
         
-        # Save structured data
-        pd.DataFrame(pages_data).to_csv(
-            self.output_dir / "processed" / f"pages_{timestamp}.csv", 
-            index=False
-        )
+        # Save structured data; CSV writing is synchronous, so keep it off the event loop
+        processed_dir = self.output_dir / "processed"
+        await asyncio.to_thread(write_rows_csv, pages_data, processed_dir / f"pages_{timestamp}.csv")
         
         if entities_data:
-            pd.DataFrame(entities_data).to_csv(
-                self.output_dir / "processed" / f"entities_{timestamp}.csv", 
-                index=False
-            )
+            await asyncio.to_thread(write_rows_csv, entities_data, processed_dir / f"entities_{timestamp}.csv")
         
         if tables_data:
-            pd.DataFrame(tables_data).to_csv(
-                self.output_dir / "processed" / f"tables_{timestamp}.csv", 
-                index=False
-            )
+            await asyncio.to_thread(write_rows_csv, tables_data, processed_dir / f"tables_{timestamp}.csv")
         
         # Save summary report
         summary = {
@@ -497,8 +777,8 @@ class EnhancedMOSDACWebScraper:
             'failed_urls': list(self.failed_urls)
         }
         
-        async with aiofiles.open(self.output_dir / "metadata" / f"summary_{timestamp}.json", 'w') as f:
-            await f.write(json.dumps(summary, indent=2, ensure_ascii=False))
+        async with aiofiles.open(self.output_dir / "metadata" / f"summary_{timestamp}.json", 'wb') as f:
+            await f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
         
         logger.info(f"Data saved with timestamp: {timestamp}")
         logger.info(f"Summary: {summary['scraping_session']}")
@@ -515,15 +795,24 @@ class EnhancedMOSDACWebScraper:
         if not pages_data:
             return {}
         
-        content_lengths = [page['content_length'] for page in pages_data]
-        entity_counts = [page['entity_count'] for page in pages_data]
+        # One pass over the pages instead of building and rescanning two lists
+        total_length = total_entities = 0
+        max_length = min_length = pages_data[0]['content_length']
+        for page in pages_data:
+            length = page['content_length']
+            total_length += length
+            total_entities += page['entity_count']
+            if length > max_length:
+                max_length = length
+            elif length < min_length:
+                min_length = length
         
         return {
             'total_pages': len(pages_data),
-            'avg_content_length': sum(content_lengths) / len(content_lengths),
-            'avg_entity_count': sum(entity_counts) / len(entity_counts),
-            'max_content_length': max(content_lengths),
-            'min_content_length': min(content_lengths)
+            'avg_content_length': total_length / len(pages_data),
+            'avg_entity_count': total_entities / len(pages_data),
+            'max_content_length': max_length,
+            'min_content_length': min_length
         }
     
     async def run_full_scrape(self, max_pages: int = 50, max_depth: int = 2):
@@ -650,83 +939,172 @@ class EnhancedEntityExtractor:
                 r'SPECTROMETER'
             ]
         }
+        
+        # Plain-word patterns are all found in one Aho-Corasick pass over the
+        # lowercased text; only the real regexes are scanned individually
+        self.literal_automaton = ahocorasick.Automaton()
+        regex_patterns = []
+        for patterns in self.entity_patterns.values():
+            for pattern in patterns:
+                if _LITERAL_PATTERN_RE.fullmatch(pattern):
+                    self.literal_automaton.add_word(pattern.lower(), pattern)
+                else:
+                    regex_patterns.append(pattern)
+        self.literal_automaton.make_automaton()
+        
+        # Lowercasing the regex source would turn escapes like \D or \S into
+        # their opposites, so the original pattern is compiled with IGNORECASE
+        self.compiled_patterns = [
+            (pattern, re.compile(pattern, re.IGNORECASE)) for pattern in regex_patterns
+        ]
+        # For text whose length changes when lowercased, offsets wouldn't line up
+        self.compiled_patterns_ignorecase = [
+            (pattern, re.compile(pattern, re.IGNORECASE))
+            for patterns in self.entity_patterns.values()
+            for pattern in patterns
+        ]
+        # Words near an entity that raise its confidence, by entity type (lowercase)
+        self.supporting_words = {
+            'SATELLITE': ('satellite', 'mission', 'orbit', 'launch'),
+            'DATA_PRODUCT': ('data', 'product', 'parameter', 'measurement'),
+            'ORGANIZATION': ('organization', 'agency', 'institute', 'center'),
+            'LOCATION': ('region', 'area', 'coast', 'ocean'),
+            'INSTRUMENT': ('instrument', 'sensor', 'detector', 'payload')
+        }
+        self.pattern_types = {
+            pattern: entity_type
+            for entity_type, patterns in self.entity_patterns.items()
+            for pattern in patterns
+        }
+    
+    def find_pattern_spans(self, text: str, lowered: Optional[str] = None) -> Dict[str, List[tuple]]:
+        """Non-overlapping (start, end) spans of each pattern's matches in text"""
+        spans = defaultdict(list)
+        
+        if lowered is None:
+            lowered = text.lower()
+        if len(lowered) != len(text):
+            for pattern, regex in self.compiled_patterns_ignorecase:
+                spans[pattern] = [match.span() for match in regex.finditer(text)]
+            return spans
+        
+        for last_index, pattern in self.literal_automaton.iter(lowered):
+            start = last_index - len(pattern) + 1
+            pattern_spans = spans[pattern]
+            # The automaton reports overlapping hits; finditer semantics don't
+            if not pattern_spans or start >= pattern_spans[-1][1]:
+                pattern_spans.append((start, last_index + 1))
+        for pattern, regex in self.compiled_patterns:
+            spans[pattern] = [match.span() for match in regex.finditer(lowered)]
+        return spans
     
     def extract_entities(self, text: str) -> List[Dict]:
-        """Extract entities with improved confidence scoring"""
-        entities = []
+        """Extract entities with improved confidence scoring
+        
+        Repeated mentions of the same text and type are collapsed into the
+        highest-confidence one (the first, on ties).
+        """
+        best: Dict[tuple, Dict] = {}
         entity_id = 0
+        lowered = text.lower()
+        spans = self.find_pattern_spans(text, lowered)
+        # Offsets into lowered only line up with text if lowering kept the length
+        text_lower = lowered if len(lowered) == len(text) else None
         
         for entity_type, patterns in self.entity_patterns.items():
             for pattern in patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
+                for start, end in spans.get(pattern, ()):
                     # Calculate confidence based on pattern complexity and context
-                    confidence = self.calculate_confidence(match, pattern, text)
+                    confidence = self.calculate_confidence(start, end, pattern, text, text_lower)
                     
-                    entities.append({
-                        'id': f"entity_{entity_id}",
-                        'text': match.group(),
-                        'type': entity_type,
-                        'start': match.start(),
-                        'end': match.end(),
-                        'confidence': confidence,
-                        'pattern': pattern,
-                        'context': self.get_context(text, match.start(), match.end())
-                    })
+                    matched = text[start:end]
+                    key = (matched.lower(), entity_type)
+                    existing = best.get(key)
+                    if existing is None or existing['confidence'] < confidence:
+                        best[key] = {
+                            'id': f"entity_{entity_id}",
+                            'text': matched,
+                            'type': entity_type,
+                            'start': start,
+                            'end': end,
+                            'confidence': confidence,
+                            'pattern': pattern,
+                            'context': self.get_context(text, start, end)
+                        }
                     entity_id += 1
         
-        return self.deduplicate_entities(entities)
+        return list(best.values())
     
-    def calculate_confidence(self, match, pattern: str, text: str) -> float:
-        """Calculate confidence score for extracted entity"""
+    def calculate_confidence(self, start: int, end: int, pattern: str, text: str,
+                             text_lower: Optional[str] = None) -> float:
+        """Calculate confidence score for extracted entity
+        
+        text_lower, if given, is text.lower() with the same offsets; supporting
+        words are then searched in place instead of in a lowercased copy.
+        """
         base_confidence = 0.8
         
         # Adjust based on pattern specificity
         if r'\d+' in pattern:  # Patterns with numbers are more specific
             base_confidence += 0.1
         
-        # Adjust based on context
-        context = self.get_context(text, match.start(), match.end(), window=50)
-        
-        # Look for supporting context words
-        supporting_words = {
-            'SATELLITE': ['satellite', 'mission', 'orbit', 'launch'],
-            'DATA_PRODUCT': ['data', 'product', 'parameter', 'measurement'],
-            'ORGANIZATION': ['organization', 'agency', 'institute', 'center'],
-            'LOCATION': ['region', 'area', 'coast', 'ocean'],
-            'INSTRUMENT': ['instrument', 'sensor', 'detector', 'payload']
-        }
-        
         # Check if any supporting words are in context
-        for word in supporting_words.get(self.get_entity_type(pattern), []):
-            if word.lower() in context.lower():
-                base_confidence += 0.05
+        supporting_words = self.supporting_words.get(self.get_entity_type(pattern), ())
+        if text_lower is not None:
+            context_start = max(0, start - 50)
+            for word in supporting_words:
+                if text_lower.find(word, context_start, end + 50) != -1:
+                    base_confidence += 0.05
+        else:
+            # Adjust based on context
+            context = self.get_context(text, start, end, window=50).lower()
+            for word in supporting_words:
+                if word in context:
+                    base_confidence += 0.05
         
         return min(0.99, base_confidence)
     
     def get_entity_type(self, pattern: str) -> str:
         """Get entity type from pattern"""
-        for entity_type, patterns in self.entity_patterns.items():
-            if pattern in patterns:
-                return entity_type
-        return 'UNKNOWN'
+        return self.pattern_types.get(pattern, 'UNKNOWN')
     
     def get_context(self, text: str, start: int, end: int, window: int = 30) -> str:
         """Get context around entity"""
         context_start = max(0, start - window)
         context_end = min(len(text), end + window)
         return text[context_start:context_end]
+
+# Per-process entity extractor for _parse_page, built on a worker's first page
+_worker_entity_extractor: Optional[EnhancedEntityExtractor] = None
+
+def _parse_page(content: bytes, charset: Optional[str], url: str) -> Optional[tuple]:
+    """Parse a page and run every extractor on it; runs in a parse worker process
     
-    def deduplicate_entities(self, entities: List[Dict]) -> List[Dict]:
-        """Remove duplicate entities"""
-        seen_entities = set()
-        unique_entities = []
-        
-        for entity in entities:
-            # Create key for deduplication
-            key = (entity['text'].lower(), entity['type'])
-            if key not in seen_entities:
-                seen_entities.add(key)
-                unique_entities.append(entity)
-        
-        return unique_entities
\ No newline at end of file
+    Returns (text_content, content_hash, tables, metadata, entities), or None
+    if the page has too little text to keep.
+    """
+    global _worker_entity_extractor
+    
+    # Parse HTML with lxml; a charset from the Content-Type header skips detection entirely
+    soup = BeautifulSoup(content, 'lxml', from_encoding=charset)
+    
+    # Extract content from a single tree walk
+    EnhancedMOSDACWebScraper._strip_boilerplate(soup)
+    elements = EnhancedMOSDACWebScraper._collect_elements(soup)
+    text_content = EnhancedMOSDACWebScraper.extract_enhanced_text_content(soup, elements)
+    
+    # Skip if content is too short
+    if len(text_content.strip()) < 100:
+        return None
+    
+    # Generate content hash for deduplication
+    content_hash = EnhancedMOSDACWebScraper.generate_content_hash(text_content)
+    
+    if _worker_entity_extractor is None:
+        _worker_entity_extractor = EnhancedEntityExtractor()
+    
+    tables = EnhancedMOSDACWebScraper.extract_enhanced_tables(soup, elements)
+    metadata = EnhancedMOSDACWebScraper.extract_comprehensive_metadata(soup, url, elements)
+    entities = _worker_entity_extractor.extract_entities(text_content)
+    
+    return text_content, content_hash, tables, metadata, entities
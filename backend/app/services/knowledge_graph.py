@@ -1,14 +1,367 @@
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase
 import json
 import logging
-from typing import Dict, List, Any, Optional
+import re
+import string
+import unicodedata
+from functools import lru_cache
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, List, Any, Optional
 import asyncio
 from dataclasses import dataclass
-import networkx as nx
+from cachetools import TTLCache
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    import networkx
+
 logger = logging.getLogger(__name__)
 
+# Bulk upserts; labels can't be parameters, so the entity query is formatted per type (see entity_query)
+BULK_ENTITY_QUERY = """
+UNWIND $rows AS row
+MERGE (e:Entity {{id: row.id}})
+ON CREATE SET e.created_at = datetime()
+SET e += row.properties,
+    e.name = row.name,
+    e.type = row.type,
+    e.properties = null,
+    e.searchable_text = row.searchable_text,
+    e.updated_at = datetime(),
+    e:{label}
+RETURN count(e) AS count
+"""
+
+# The relation name is the relationship type, formatted in per relation (see relationship_query)
+BULK_RELATIONSHIP_QUERY = """
+UNWIND $rows AS row
+MATCH (a:Entity {{id: row.source}})
+MATCH (b:Entity {{id: row.target}})
+MERGE (a)-[r:{relation_type}]->(b)
+ON CREATE SET r.created_at = datetime()
+SET r += row.properties,
+    r.confidence = row.confidence,
+    r.properties = null,
+    r.updated_at = datetime()
+RETURN count(r) AS count
+"""
+
+# Bulk write batches in flight at once, each on its own pooled connection
+BULK_WRITE_CONCURRENCY = 8
+
+# Page-cache warm-up: APOC's procedure where installed, otherwise scans that touch
+# node and relationship properties (a bare count(*) is served from the count store)
+APOC_WARMUP_QUERY = "CALL apoc.warmup.run(true, true, true)"
+FALLBACK_WARMUP_QUERIES = [
+    "MATCH (e:Entity) RETURN count(e.name) + count(e.searchable_text) AS count",
+    "MATCH ()-[r]->() RETURN count(r.confidence) AS count",
+]
+
+# Lucene query syntax characters, escaped in user search terms
+_LUCENE_SPECIAL_RE = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+# Operator words, lowercased in user search terms so they are matched as text
+_LUCENE_OPERATORS = frozenset({"AND", "OR", "NOT"})
+
+def _escape_lucene_term(term: str) -> str:
+    if term in _LUCENE_OPERATORS:
+        return term.lower()
+    return _LUCENE_SPECIAL_RE.sub(r'\\\1', term)
+
+def fulltext_query(search_term: str) -> str:
+    """Lucene query for the entitySearch index: every term must match as a prefix or fuzzily"""
+    terms = (_escape_lucene_term(term) for term in search_term.split())
+    return " AND ".join(f"({term}* OR {term}~)" for term in terms)
+
+# Full-text candidates fetched per requested result, re-ranked in Python
+SEARCH_CANDIDATE_FACTOR = 4
+
+def rank_search_results(rows: List[Dict], search_term: str) -> List[Dict]:
+    """Order full-text hits: exact name match, then name prefix, then Lucene score"""
+    term = search_term.strip().lower()
+    
+    def rank(row: Dict) -> tuple:
+        name = (row['name'] or '').lower()
+        tier = 0 if name == term else 1 if name.startswith(term) else 2
+        return tier, -row['score'], name
+    
+    return sorted(rows, key=rank)
+
+# Entity types and relation names become labels and relationship types, so
+# anything outside a plain identifier is replaced (e.g. "part of" -> part_of)
+_NON_IDENTIFIER_RE = re.compile(r'[^A-Za-z0-9_]')
+
+def cypher_identifier(name: str) -> str:
+    """Label or relationship type for a free-form entity type or relation name"""
+    identifier = _NON_IDENTIFIER_RE.sub('_', name)
+    if not identifier or identifier[0].isdigit():
+        identifier = '_' + identifier
+    return identifier
+
+@lru_cache(maxsize=256)
+def entity_query(entity_type: str) -> str:
+    """BULK_ENTITY_QUERY for one entity type
+    
+    The text is built once per type, so each type maps to one stable query
+    string and one cached server-side plan. The node's type property keeps
+    the name as given.
+    """
+    return BULK_ENTITY_QUERY.format(label=cypher_identifier(entity_type))
+
+@lru_cache(maxsize=256)
+def relationship_query(relation_type: str) -> str:
+    """BULK_RELATIONSHIP_QUERY for one relation name, cached like entity_query"""
+    return BULK_RELATIONSHIP_QUERY.format(relation_type=cypher_identifier(relation_type))
+
+# Cypher doesn't accept parameters in variable-length bounds, so without APOC
+# the depth is formatted in (one query text per depth). Each entity is returned
+# once at its shortest distance, as with the APOC spanning tree below
+RELATED_ENTITIES_QUERY = """
+MATCH (start:Entity {{name: $entity_name}})
+MATCH path = (start)-[*1..{max_depth}]-(related:Entity)
+WHERE related <> start
+WITH related, min(length(path)) AS distance
+RETURN related.name as name,
+       related.type as type,
+       properties(related) as properties,
+       distance
+ORDER BY distance, related.name
+SKIP $skip
+LIMIT $limit
+"""
+MAX_RELATED_DEPTH = 5
+
+# With APOC the depth is a parameter, so one plan serves every depth; the
+# breadth-first spanning tree reaches each entity once, at its shortest distance
+RELATED_ENTITIES_APOC_QUERY = """
+MATCH (start:Entity {name: $entity_name})
+CALL apoc.path.spanningTree(start, {minLevel: 1, maxLevel: $max_depth, labelFilter: '+Entity'})
+YIELD path
+WITH last(nodes(path)) AS related, length(path) AS distance
+RETURN related.name as name,
+       related.type as type,
+       properties(related) as properties,
+       distance
+ORDER BY distance, related.name
+SKIP $skip
+LIMIT $limit
+"""
+
+APOC_PATH_PROCEDURE_QUERY = """
+SHOW PROCEDURES YIELD name
+WHERE name = 'apoc.path.spanningTree'
+RETURN count(name) > 0 AS available
+"""
+
+# Keyset-paginated export: pages are ordered by the unique entity id and resume
+# after the last id seen, so each page is an index seek rather than a growing SKIP
+EXPORT_ENTITIES_QUERY = """
+MATCH (e:Entity)
+WHERE e.id > $after
+RETURN e.id as id, e.name as name, e.type as type, properties(e) as properties
+ORDER BY e.id
+LIMIT $limit
+"""
+
+# One row per source entity, so a page always covers exactly $limit entities
+EXPORT_RELATIONSHIPS_QUERY = """
+MATCH (a:Entity)
+WHERE a.id > $after
+WITH a ORDER BY a.id LIMIT $limit
+OPTIONAL MATCH (a)-[r]->(b:Entity)
+RETURN a.id as id,
+       collect(CASE WHEN r IS NULL THEN null ELSE {
+           target: b.id, relation: type(r), confidence: r.confidence, properties: properties(r)
+       } END) as relationships
+ORDER BY a.id
+"""
+EXPORT_PAGE_SIZE = 10_000
+
+def clamp_related_depth(max_depth: int) -> int:
+    return min(max(int(max_depth), 1), MAX_RELATED_DEPTH)
+
+@lru_cache(maxsize=MAX_RELATED_DEPTH)
+def related_entities_query(max_depth: int) -> str:
+    """RELATED_ENTITIES_QUERY for a traversal depth clamped to 1..MAX_RELATED_DEPTH"""
+    return RELATED_ENTITIES_QUERY.format(max_depth=clamp_related_depth(max_depth))
+
+# Entity and relationship properties are stored as top-level primitive
+# properties under this prefix, next to the id/name/type/timestamp bookkeeping
+PROPERTY_PREFIX = "prop_"
+
+def _flatten_properties(properties: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Prefixed primitive properties for SET +=; other values are stored as JSON"""
+    flat = {}
+    for key, value in (properties or {}).items():
+        if not isinstance(value, (str, int, float, bool, type(None))):
+            if not (isinstance(value, list) and all(isinstance(item, (str, int, float, bool)) for item in value)):
+                value = json.dumps(value)
+        flat[PROPERTY_PREFIX + key] = value
+    return flat
+
+def _unflatten_properties(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of _flatten_properties over a full properties(n) map"""
+    prefix_length = len(PROPERTY_PREFIX)
+    return {
+        key[prefix_length:]: value
+        for key, value in properties.items()
+        if key.startswith(PROPERTY_PREFIX)
+    }
+
+SCHEMA_QUERIES = [
+    # Create constraints
+    "CREATE CONSTRAINT entity_id IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE",
+    "CREATE CONSTRAINT satellite_name IF NOT EXISTS FOR (s:Satellite) REQUIRE s.name IS UNIQUE",
+    "CREATE CONSTRAINT organization_name IF NOT EXISTS FOR (o:Organization) REQUIRE o.name IS UNIQUE",
+    "CREATE CONSTRAINT location_name IF NOT EXISTS FOR (l:Location) REQUIRE l.name IS UNIQUE",
+    
+    # Create indexes
+    "CREATE INDEX entity_type IF NOT EXISTS FOR (e:Entity) ON (e.type)",
+    "CREATE INDEX entity_name IF NOT EXISTS FOR (e:Entity) ON (e.name)",
+    "CREATE INDEX satellite_mission IF NOT EXISTS FOR (s:Satellite) ON (s.mission_type)",
+    "CREATE INDEX data_product_type IF NOT EXISTS FOR (d:DataProduct) ON (d.product_type)",
+    f"CREATE INDEX entity_confidence IF NOT EXISTS FOR (e:Entity) ON (e.{PROPERTY_PREFIX}confidence)",
+    f"CREATE INDEX entity_source_url IF NOT EXISTS FOR (e:Entity) ON (e.{PROPERTY_PREFIX}source_url)",
+    "CREATE FULLTEXT INDEX entitySearch IF NOT EXISTS FOR (e:Entity) ON EACH [e.name, e.searchable_text]",
+]
+
+ENTITIES_BY_TYPE_QUERY = """
+MATCH (e:Entity {type: $entity_type})
+RETURN e.name as name, 
+       e.type as type, 
+       properties(e) as properties
+ORDER BY e.name, e.id
+SKIP $skip
+LIMIT $limit
+"""
+
+# One directed expansion per branch instead of an undirected match plus a
+# startNode() check per row; the entity_name index gives the seek for both
+ENTITY_RELATIONSHIPS_QUERY = """
+CALL {
+    MATCH (e:Entity {name: $entity_name})-[r]->(related:Entity)
+    RETURN r, related, true as is_outgoing
+    UNION ALL
+    MATCH (e:Entity {name: $entity_name})<-[r]-(related:Entity)
+    RETURN r, related, false as is_outgoing
+}
+RETURN type(r) as relationship_type,
+       r.confidence as confidence,
+       related.name as related_entity,
+       related.type as related_type,
+       is_outgoing
+ORDER BY r.confidence DESC, elementId(r)
+SKIP $skip
+LIMIT $limit
+"""
+
+# Listing for a blank search term, ordered as the old substring scan was
+LIST_ENTITIES_QUERY = """
+MATCH (e:Entity)
+RETURN e.name as name,
+       e.type as type,
+       properties(e) as properties
+ORDER BY e.name, e.id
+SKIP $skip
+LIMIT $limit
+"""
+
+SEARCH_ENTITIES_QUERY = """
+CALL db.index.fulltext.queryNodes("entitySearch", $lucene_query) YIELD node, score
+RETURN node.name as name,
+       node.type as type,
+       properties(node) as properties,
+       score
+ORDER BY score DESC
+LIMIT $limit
+"""
+
+# Counts are read as scalars, the per-type breakdowns as rows
+GRAPH_COUNT_QUERIES = {
+    'total_entities': "MATCH (e:Entity) RETURN count(e) as count",
+    'total_relationships': "MATCH ()-[r]->() RETURN count(r) as count",
+}
+GRAPH_BREAKDOWN_QUERIES = {
+    'entity_types': """
+        MATCH (e:Entity) 
+        RETURN e.type as type, count(e) as count 
+        ORDER BY count DESC
+    """,
+    'relationship_types': """
+        MATCH ()-[r]->() 
+        RETURN type(r) as type, count(r) as count 
+        ORDER BY count DESC
+    """
+}
+
+# query_for_chatbot queries over a list of entity names, by query type
+CHATBOT_QUERIES = {
+    # Find entities related to query entities
+    'related': """
+        MATCH (e:Entity)
+        WHERE e.name IN $entities
+        MATCH (e)-[path_rels*1..2]-(related:Entity)
+        UNWIND path_rels AS r
+        RETURN DISTINCT related.name as entity,
+               related.type as type,
+               properties(related) as properties,
+               collect(DISTINCT type(r)) as relationship_types
+        ORDER BY related.name
+        LIMIT 20
+    """,
+    # Get direct information about entities
+    'direct': """
+        MATCH (e:Entity)
+        WHERE e.name IN $entities
+        RETURN e.name as entity,
+               e.type as type,
+               properties(e) as properties
+    """,
+}
+
+# Find paths between the first two query entities
+CHATBOT_PATH_QUERY = """
+MATCH (start:Entity {name: $start_entity})
+MATCH (end:Entity {name: $end_entity})
+MATCH path = shortestPath((start)-[*1..4]-(end))
+RETURN [node in nodes(path) | {name: node.name, type: node.type}] as path_nodes,
+       [rel in relationships(path) | type(rel)] as path_relations
+LIMIT 5
+"""
+
+async def _read_data(tx, query: str, parameters: Dict) -> List[Dict]:
+    result = await tx.run(query, parameters)
+    rows = await result.data()
+    # Queries return properties(n) maps; reduce them to the stored entity properties
+    for row in rows:
+        properties = row.get('properties')
+        if isinstance(properties, dict):
+            row['properties'] = _unflatten_properties(properties)
+    return rows
+
+async def _read_values(tx, query: str, parameters: Dict) -> List[List[Any]]:
+    # Column lists without a dict per record, for callers that index by position
+    result = await tx.run(query, parameters)
+    return await result.values()
+
+async def _read_scalar(tx, query: str, parameters: Dict) -> Any:
+    result = await tx.run(query, parameters)
+    record = await result.single()
+    return record.value() if record else None
+
+async def _read_statistics(tx, stat_names: List[str]) -> Dict[str, Any]:
+    # All requested statistics in one transaction, on one pooled connection
+    stats = {}
+    for stat_name in stat_names:
+        if stat_name in GRAPH_COUNT_QUERIES:
+            stats[stat_name] = await _read_scalar(tx, GRAPH_COUNT_QUERIES[stat_name], {}) or 0
+        else:
+            stats[stat_name] = await _read_data(tx, GRAPH_BREAKDOWN_QUERIES[stat_name], {})
+    return stats
+
+async def _write_count(tx, query: str, rows: List[Dict]) -> int:
+    result = await tx.run(query, rows=rows)
+    record = await result.single()
+    return record["count"]
+
 @dataclass
 class KnowledgeGraphNode:
     id: str
@@ -24,28 +377,75 @@ class KnowledgeGraphRelation:
     confidence: float
     properties: Dict[str, Any] = None
 
+# Whitespace and punctuation in entity text all become separators in ids
+_ID_TRANS = str.maketrans({char: '_' for char in string.whitespace + string.punctuation})
+
+def entity_id(entity_type: str, text: str) -> str:
+    """Node id for an extracted entity
+    
+    The text is NFKC-normalized, lowercased and reduced to underscore-separated
+    words, so spacing, case and punctuation variants of a name share one node.
+    """
+    words = unicodedata.normalize('NFKC', text).lower().translate(_ID_TRANS).split('_')
+    return f"{entity_type}_{'_'.join(word for word in words if word)}"
+
+def _entity_row(entity: KnowledgeGraphNode) -> Dict[str, Any]:
+    """Parameters for one BULK_ENTITY_QUERY row"""
+    return {
+        'id': entity.id,
+        'name': entity.name,
+        'type': entity.type,
+        'properties': _flatten_properties(entity.properties),
+        # Property values denormalized into one string for the full-text index
+        'searchable_text': " ".join(str(value) for value in entity.properties.values())
+    }
+
+def _relation_row(relation: KnowledgeGraphRelation) -> Dict[str, Any]:
+    """Parameters for one BULK_RELATIONSHIP_QUERY row"""
+    return {
+        'source': relation.source,
+        'target': relation.target,
+        'confidence': relation.confidence,
+        'properties': _flatten_properties(relation.properties)
+    }
+
 class KnowledgeGraphService:
     """Neo4j-based Knowledge Graph Service"""
     
     def __init__(self):
         self.driver = None
-        self.graph = nx.DiGraph()  # NetworkX graph for local operations
+        self._warmup_task: Optional[asyncio.Task] = None
+        self.apoc_available = False
+        # Results of the read-heavy chatbot queries, keyed on (method, args);
+        # statistics are coarser and kept longer. Cleared on every write.
+        self._read_cache = TTLCache(maxsize=settings.KG_CACHE_MAX_ENTRIES, ttl=settings.KG_CACHE_TTL)
+        self._stats_cache = TTLCache(maxsize=16, ttl=settings.KG_STATS_CACHE_TTL)
+        # Cache misses currently being queried, so concurrent callers share one round-trip
+        self._pending_queries: Dict[tuple, asyncio.Future] = {}
         
     async def connect(self):
         """Connect to Neo4j database"""
         try:
-            self.driver = GraphDatabase.driver(
+            self.driver = AsyncGraphDatabase.driver(
                 settings.NEO4J_URI,
-                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
+                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                max_connection_pool_size=settings.NEO4J_POOL_SIZE,
+                connection_acquisition_timeout=settings.NEO4J_ACQUISITION_TIMEOUT,
+                max_connection_lifetime=settings.NEO4J_MAX_CONNECTION_LIFETIME,
+                max_transaction_retry_time=settings.NEO4J_MAX_RETRY_TIME,
+                keep_alive=True
             )
             
             # Test connection
-            with self.driver.session() as session:
-                result = session.run("RETURN 1 as test")
-                test_value = result.single()["test"]
+            async with self._session() as session:
+                result = await session.run("RETURN 1 as test")
+                test_value = (await result.single())["test"]
                 if test_value == 1:
                     logger.info("Successfully connected to Neo4j")
                     await self.initialize_schema()
+                    self.apoc_available = await self._detect_apoc()
+                    # Warm in the background so startup isn't held up by a large store
+                    self._warmup_task = asyncio.create_task(self.warm_up())
                 else:
                     raise Exception("Neo4j connection test failed")
                     
@@ -53,204 +453,305 @@ class KnowledgeGraphService:
             logger.error(f"Failed to connect to Neo4j: {e}")
             raise
     
+    def _session(self):
+        # Naming the database skips the driver's home-database lookup round trip
+        return self.driver.session(database=settings.NEO4J_DATABASE)
+    
     async def close(self):
         """Close Neo4j connection"""
+        if self._warmup_task and not self._warmup_task.done():
+            self._warmup_task.cancel()
         if self.driver:
-            self.driver.close()
+            await self.driver.close()
             logger.info("Neo4j connection closed")
     
     async def initialize_schema(self):
         """Initialize Neo4j schema with constraints and indexes"""
-        schema_queries = [
-            # Create constraints
-            "CREATE CONSTRAINT entity_id IF NOT EXISTS FOR (e:Entity) REQUIRE e.id IS UNIQUE",
-            "CREATE CONSTRAINT satellite_name IF NOT EXISTS FOR (s:Satellite) REQUIRE s.name IS UNIQUE",
-            "CREATE CONSTRAINT organization_name IF NOT EXISTS FOR (o:Organization) REQUIRE o.name IS UNIQUE",
-            "CREATE CONSTRAINT location_name IF NOT EXISTS FOR (l:Location) REQUIRE l.name IS UNIQUE",
-            
-            # Create indexes
-            "CREATE INDEX entity_type IF NOT EXISTS FOR (e:Entity) ON (e.type)",
-            "CREATE INDEX entity_name IF NOT EXISTS FOR (e:Entity) ON (e.name)",
-            "CREATE INDEX satellite_mission IF NOT EXISTS FOR (s:Satellite) ON (s.mission_type)",
-            "CREATE INDEX data_product_type IF NOT EXISTS FOR (d:DataProduct) ON (d.product_type)",
-        ]
-        
-        with self.driver.session() as session:
-            for query in schema_queries:
+        async with self._session() as session:
+            for query in SCHEMA_QUERIES:
                 try:
-                    session.run(query)
+                    await (await session.run(query)).consume()
                     logger.debug(f"Executed schema query: {query}")
                 except Exception as e:
                     logger.warning(f"Schema query failed (may already exist): {query} - {e}")
     
+    async def _detect_apoc(self) -> bool:
+        """Whether the APOC path procedures are installed"""
+        try:
+            async with self._session() as session:
+                record = await (await session.run(APOC_PATH_PROCEDURE_QUERY)).single()
+                available = bool(record and record["available"])
+        except Exception as e:
+            logger.debug(f"Could not list procedures: {e}")
+            available = False
+        logger.info(f"APOC path procedures {'available' if available else 'not available'}")
+        return available
+    
+    async def warm_up(self):
+        """Load the graph stores into Neo4j's page cache so first queries hit memory"""
+        async with self._session() as session:
+            try:
+                await (await session.run(APOC_WARMUP_QUERY)).consume()
+                logger.info("Neo4j page cache warmed with APOC")
+                return
+            except Exception as e:
+                logger.debug(f"APOC warm-up unavailable, scanning instead: {e}")
+            
+            try:
+                for query in FALLBACK_WARMUP_QUERIES:
+                    await (await session.run(query)).consume()
+                logger.info("Neo4j page cache warmed")
+            except Exception as e:
+                logger.warning(f"Neo4j warm-up failed: {e}")
+    
     async def create_entity_node(self, entity: KnowledgeGraphNode):
         """Create entity node in Neo4j"""
-        query = """
-        MERGE (e:Entity {id: $id})
-        SET e.name = $name,
-            e.type = $type,
-            e.properties = $properties,
-            e.created_at = datetime(),
-            e.updated_at = datetime()
-        """
-        
-        # Also create specific type label
-        type_query = f"""
-        MERGE (e:Entity {{id: $id}})
-        SET e:{entity.type}
-        """
+        query = entity_query(entity.type)
+        async with self._session() as session:
+            await session.execute_write(_write_count, query, [_entity_row(entity)])
+        self.clear_query_cache()
         
-        with self.driver.session() as session:
-            session.run(query, 
-                       id=entity.id, 
-                       name=entity.name, 
-                       type=entity.type, 
-                       properties=json.dumps(entity.properties))
-            
-            # Add type-specific label
-            session.run(type_query, id=entity.id)
-            
         logger.debug(f"Created entity node: {entity.name} ({entity.type})")
     
     async def create_relationship(self, relation: KnowledgeGraphRelation):
         """Create relationship between entities"""
-        query = """
-        MATCH (a:Entity {id: $source})
-        MATCH (b:Entity {id: $target})
-        MERGE (a)-[r:RELATES {type: $relation_type}]->(b)
-        SET r.confidence = $confidence,
-            r.properties = $properties,
-            r.created_at = datetime(),
-            r.updated_at = datetime()
-        """
-        
-        with self.driver.session() as session:
-            session.run(query,
-                       source=relation.source,
-                       target=relation.target,
-                       relation_type=relation.relation,
-                       confidence=relation.confidence,
-                       properties=json.dumps(relation.properties or {}))
+        query = relationship_query(relation.relation)
+        async with self._session() as session:
+            await session.execute_write(_write_count, query, [_relation_row(relation)])
+        self.clear_query_cache()
         
         logger.debug(f"Created relationship: {relation.source} -{relation.relation}-> {relation.target}")
     
-    async def query_graph(self, cypher_query: str, parameters: Dict = None) -> List[Dict]:
-        """Execute Cypher query and return results"""
+    async def query_graph(self, cypher_query: str, parameters: Dict = None,
+                          reader: Callable = _read_data) -> List[Dict]:
+        """Execute a read-only Cypher query and return results
+        
+        Runs as a read transaction function, so transient failures are retried
+        by the driver; anything still failing is logged and raised to the caller.
+        reader shapes the result: dicts per row by default, _read_values for
+        positional rows or _read_scalar for a single value.
+        """
         try:
-            with self.driver.session() as session:
-                result = session.run(cypher_query, parameters or {})
-                return [record.data() for record in result]
+            async with self._session() as session:
+                return await session.execute_read(reader, cypher_query, parameters or {})
         except Exception as e:
             logger.error(f"Graph query failed: {e}")
-            return []
+            raise
     
-    async def find_related_entities(self, entity_name: str, max_depth: int = 2) -> List[Dict]:
-        """Find entities related to given entity"""
-        query = """
-        MATCH (start:Entity {name: $entity_name})
-        MATCH path = (start)-[*1..$max_depth]-(related:Entity)
-        RETURN DISTINCT related.name as name, 
-               related.type as type, 
-               related.properties as properties,
-               length(path) as distance
-        ORDER BY distance, related.name
-        LIMIT 20
+    async def _cached_query(self, cache: TTLCache, key: tuple, cypher_query: str,
+                            parameters: Dict = None, reader: Callable = _read_data) -> List[Dict]:
+        """query_graph through a TTL cache; failed queries raise and are not cached
+        
+        Concurrent misses on the same key (e.g. the queries of one chat batch)
+        wait on a single in-flight query. Cached result lists are shared
+        between callers and must not be mutated.
         """
+        result = cache.get(key)
+        if result is not None:
+            return result
         
-        return await self.query_graph(query, {
-            'entity_name': entity_name,
-            'max_depth': max_depth
-        })
+        pending = self._pending_queries.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self.query_graph(cypher_query, parameters, reader=reader))
+            self._pending_queries[key] = pending
+            
+            def store(done: asyncio.Future):
+                # Skip queries orphaned by clear_query_cache; their result may be stale
+                if self._pending_queries.get(key) is not done:
+                    return
+                del self._pending_queries[key]
+                if not done.cancelled() and done.exception() is None:
+                    cache[key] = done.result()
+            
+            pending.add_done_callback(store)
+        # Shielded so one cancelled caller doesn't cancel the query for the others
+        return await asyncio.shield(pending)
     
-    async def find_entities_by_type(self, entity_type: str, limit: int = 50) -> List[Dict]:
-        """Find entities by type"""
-        query = """
-        MATCH (e:Entity {type: $entity_type})
-        RETURN e.name as name, 
-               e.type as type, 
-               e.properties as properties
-        ORDER BY e.name
-        LIMIT $limit
-        """
+    def clear_query_cache(self):
+        """Drop cached read results after the graph changes"""
+        self._read_cache.clear()
+        self._stats_cache.clear()
+        self._pending_queries.clear()
+    
+    async def _paginate(self, cypher_query: str, page_size: int, parameters: Dict = None,
+                        reader: Callable = _read_data) -> AsyncIterator[List[Any]]:
+        """Yield pages of a keyset-paginated query
         
-        return await self.query_graph(query, {
+        The query takes $after and $limit and returns rows ordered by an id
+        column, which must come first; each page resumes after the last id of
+        the previous one.
+        """
+        after = ''
+        while True:
+            page = await self.query_graph(cypher_query, {
+                **(parameters or {}),
+                'after': after,
+                'limit': page_size
+            }, reader=reader)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            last = page[-1]
+            after = last['id'] if isinstance(last, dict) else last[0]
+    
+    async def find_related_entities(self, entity_name: str, max_depth: int = 2,
+                                    skip: int = 0, limit: int = 20) -> List[Dict]:
+        """Find entities related to given entity"""
+        max_depth = clamp_related_depth(max_depth)
+        if self.apoc_available:
+            query = RELATED_ENTITIES_APOC_QUERY
+        else:
+            query = related_entities_query(max_depth)
+        return await self._cached_query(
+            self._read_cache,
+            ('related', entity_name, max_depth, skip, limit),
+            query,
+            {'entity_name': entity_name, 'max_depth': max_depth, 'skip': skip, 'limit': limit}
+        )
+    
+    async def find_entities_by_type(self, entity_type: str, limit: int = 50, skip: int = 0) -> List[Dict]:
+        """Find entities by type"""
+        return await self._cached_query(self._read_cache, ('by_type', entity_type, limit, skip), ENTITIES_BY_TYPE_QUERY, {
             'entity_type': entity_type,
+            'skip': skip,
             'limit': limit
         })
     
-    async def get_entity_relationships(self, entity_name: str) -> List[Dict]:
-        """Get all relationships for an entity"""
-        query = """
-        MATCH (e:Entity {name: $entity_name})-[r]-(related:Entity)
-        RETURN type(r) as relationship_type,
-               r.confidence as confidence,
-               related.name as related_entity,
-               related.type as related_type,
-               startNode(r).name = $entity_name as is_outgoing
-        ORDER BY r.confidence DESC
-        """
-        
-        return await self.query_graph(query, {'entity_name': entity_name})
+    async def get_entity_relationships(self, entity_name: str, skip: int = 0, limit: int = 100) -> List[Dict]:
+        """Get a page of an entity's relationships, strongest first"""
+        return await self.query_graph(ENTITY_RELATIONSHIPS_QUERY, {
+            'entity_name': entity_name,
+            'skip': skip,
+            'limit': limit
+        })
     
-    async def search_entities(self, search_term: str, limit: int = 10) -> List[Dict]:
-        """Search entities by name or properties"""
-        query = """
-        MATCH (e:Entity)
-        WHERE toLower(e.name) CONTAINS toLower($search_term)
-           OR any(prop IN keys(e.properties) WHERE toLower(toString(e.properties[prop])) CONTAINS toLower($search_term))
-        RETURN e.name as name,
-               e.type as type,
-               e.properties as properties
-        ORDER BY 
-            CASE WHEN toLower(e.name) = toLower($search_term) THEN 1
-                 WHEN toLower(e.name) STARTS WITH toLower($search_term) THEN 2
-                 ELSE 3 END,
-            e.name
-        LIMIT $limit
-        """
+    async def search_entities(self, search_term: str, limit: int = 10, skip: int = 0) -> List[Dict]:
+        """Search entities by name or properties through the entitySearch full-text index"""
+        lucene_query = fulltext_query(search_term)
+        if not lucene_query:
+            # Nothing to search for; list entities as the substring scan used to
+            return await self._cached_query(self._read_cache, ('search', search_term, limit, skip), LIST_ENTITIES_QUERY, {
+                'skip': skip,
+                'limit': limit
+            })
         
-        return await self.query_graph(query, {
-            'search_term': search_term,
-            'limit': limit
+        # Lucene ranks by relevance only; fetch a wider candidate set and put exact
+        # and prefix name matches first, as the substring scan's ORDER BY did
+        candidate_count = (skip + limit) * SEARCH_CANDIDATE_FACTOR
+        candidates = await self._cached_query(self._read_cache, ('search', search_term, candidate_count), SEARCH_ENTITIES_QUERY, {
+            'lucene_query': lucene_query,
+            'limit': candidate_count
         })
+        return rank_search_results(candidates, search_term)[skip:skip + limit]
     
     async def get_graph_statistics(self) -> Dict[str, Any]:
-        """Get knowledge graph statistics"""
-        queries = {
-            'total_entities': "MATCH (e:Entity) RETURN count(e) as count",
-            'total_relationships': "MATCH ()-[r]->() RETURN count(r) as count",
-            'entity_types': """
-                MATCH (e:Entity) 
-                RETURN e.type as type, count(e) as count 
-                ORDER BY count DESC
-            """,
-            'relationship_types': """
-                MATCH ()-[r]->() 
-                RETURN type(r) as type, count(r) as count 
-                ORDER BY count DESC
-            """
-        }
+        """Get knowledge graph statistics
         
+        Statistics missing from the cache are read together in one session and
+        transaction rather than one session per query.
+        """
         stats = {}
-        for stat_name, query in queries.items():
-            result = await self.query_graph(query)
-            if stat_name in ['total_entities', 'total_relationships']:
-                stats[stat_name] = result[0]['count'] if result else 0
+        missing = []
+        for stat_name in (*GRAPH_COUNT_QUERIES, *GRAPH_BREAKDOWN_QUERIES):
+            cached = self._stats_cache.get(stat_name)
+            if cached is None:
+                missing.append(stat_name)
             else:
-                stats[stat_name] = result
+                stats[stat_name] = cached
+        
+        if missing:
+            try:
+                async with self._session() as session:
+                    fresh = await session.execute_read(_read_statistics, missing)
+            except Exception as e:
+                logger.error(f"Graph statistics query failed: {e}")
+                raise
+            self._stats_cache.update(fresh)
+            stats.update(fresh)
+        
+        # Fixed key order, so the serialized statistics (and their ETag) are stable
+        return {stat_name: stats[stat_name] for stat_name in (*GRAPH_COUNT_QUERIES, *GRAPH_BREAKDOWN_QUERIES)}
+    
+    async def _write_batches(self, batches: List[tuple]) -> int:
+        """Run (query, rows, description) write batches concurrently; returns rows written
+        
+        Each batch is its own transaction on its own session, so a failed batch
+        is logged and skipped without affecting the others.
+        """
+        semaphore = asyncio.Semaphore(BULK_WRITE_CONCURRENCY)
+        
+        async def write(query: str, rows: List[Dict], description: str) -> int:
+            async with semaphore:
+                try:
+                    async with self._session() as session:
+                        return await session.execute_write(_write_count, query, rows)
+                except Exception as e:
+                    logger.error(f"Failed to create {len(rows)} {description}: {e}")
+                    return 0
+        
+        counts = await asyncio.gather(*(write(*batch) for batch in batches))
+        return sum(counts)
+    
+    async def create_entities_bulk(self, entities: List[KnowledgeGraphNode]) -> int:
+        """Upsert entity nodes in UNWIND batches, one query per entity type per batch"""
+        by_type: Dict[str, List[Dict]] = {}
+        for entity in entities:
+            by_type.setdefault(entity.type, []).append(_entity_row(entity))
+        
+        batch_size = settings.NEO4J_BATCH_SIZE
+        batches = []
+        for entity_type, rows in by_type.items():
+            query = entity_query(entity_type)
+            batches.extend(
+                (query, rows[start:start + batch_size], f"{entity_type} entities")
+                for start in range(0, len(rows), batch_size)
+            )
+        created = await self._write_batches(batches)
         
-        return stats
+        logger.debug(f"Created {created} entity nodes")
+        return created
+    
+    async def create_relationships_bulk(self, relations: List[KnowledgeGraphRelation]) -> int:
+        """Upsert relationships in UNWIND batches, one query per relation name per batch
+        
+        Relationships whose endpoints don't exist are skipped.
+        """
+        by_relation: Dict[str, List[Dict]] = {}
+        for relation in relations:
+            by_relation.setdefault(relation.relation, []).append(_relation_row(relation))
+        
+        batch_size = settings.NEO4J_BATCH_SIZE
+        batches = []
+        for relation_type, rows in by_relation.items():
+            query = relationship_query(relation_type)
+            batches.extend(
+                (query, rows[start:start + batch_size], f"{relation_type} relationships")
+                for start in range(0, len(rows), batch_size)
+            )
+        created = await self._write_batches(batches)
+        
+        logger.debug(f"Created {created} relationships")
+        return created
     
     async def build_graph_from_entities(self, entities_data: List[Dict], relationships_data: List[Dict]):
         """Build knowledge graph from extracted entities and relationships"""
         logger.info("Building knowledge graph from extracted data...")
         
-        # Create entity nodes
-        entity_count = 0
+        # Create entity nodes; ids are computed once and reused for relationship
+        # endpoints. Repeated entities collapse to their last occurrence (what the
+        # sequential upserts ended with), so no id is written by two concurrent batches.
+        entities: Dict[str, KnowledgeGraphNode] = {}
+        ids: Dict[tuple, str] = {}
         for entity_data in entities_data:
             try:
-                entity = KnowledgeGraphNode(
-                    id=f"{entity_data['type']}_{entity_data['text'].replace(' ', '_')}",
+                key = (entity_data['type'], entity_data['text'])
+                node_id = ids.get(key)
+                if node_id is None:
+                    node_id = ids[key] = entity_id(*key)
+                entities[node_id] = KnowledgeGraphNode(
+                    id=node_id,
                     name=entity_data['text'],
                     type=entity_data['type'],
                     properties={
@@ -260,126 +761,129 @@ class KnowledgeGraphService:
                         'extraction_method': 'pattern_matching'
                     }
                 )
-                
-                await self.create_entity_node(entity)
-                entity_count += 1
-                
             except Exception as e:
                 logger.error(f"Failed to create entity {entity_data}: {e}")
+        entity_count = await self.create_entities_bulk(list(entities.values()))
         
         # Create relationships
-        relationship_count = 0
+        relations = []
         for rel_data in relationships_data:
             try:
-                relation = KnowledgeGraphRelation(
-                    source=f"{rel_data['source_type']}_{rel_data['source'].replace(' ', '_')}",
-                    target=f"{rel_data['target_type']}_{rel_data['target'].replace(' ', '_')}",
+                # Endpoints outside this batch may already be in the graph, so they're
+                # still attempted rather than skipped
+                source_key = (rel_data['source_type'], rel_data['source'])
+                target_key = (rel_data['target_type'], rel_data['target'])
+                relations.append(KnowledgeGraphRelation(
+                    source=ids.get(source_key) or entity_id(*source_key),
+                    target=ids.get(target_key) or entity_id(*target_key),
                     relation=rel_data['relation'],
                     confidence=rel_data.get('confidence', 0.7),
                     properties={
                         'extraction_method': rel_data.get('method', 'co_occurrence'),
                         'source_url': rel_data.get('source_url', '')
                     }
-                )
-                
-                await self.create_relationship(relation)
-                relationship_count += 1
-                
+                ))
             except Exception as e:
                 logger.error(f"Failed to create relationship {rel_data}: {e}")
+        relationship_count = await self.create_relationships_bulk(relations)
+        self.clear_query_cache()
         
         logger.info(f"Knowledge graph built: {entity_count} entities, {relationship_count} relationships")
         return {'entities': entity_count, 'relationships': relationship_count}
     
-    async def export_graph_data(self, format: str = 'json') -> Dict[str, Any]:
-        """Export knowledge graph data"""
+    async def _export_relationship_pages(self, page_size: int) -> AsyncIterator[List[Dict]]:
+        """Pages of outgoing relationships, grouped by source entity"""
+        async for page in self._paginate(EXPORT_RELATIONSHIPS_QUERY, page_size, reader=_read_values):
+            # Relationship maps are projected server-side; only their properties need unprefixing
+            for source, relationships in page:
+                for relationship in relationships:
+                    relationship['source'] = source
+                    relationship['properties'] = _unflatten_properties(relationship['properties'])
+            yield [relationship for _, relationships in page for relationship in relationships]
+    
+    async def export_graph_data(self, format: str = 'json', page_size: int = EXPORT_PAGE_SIZE) -> Any:
+        """Export knowledge graph data
+        
+        Collects the whole graph into one dict for 'json', or returns a
+        NetworkX graph for 'networkx'. Use iter_graph_data to stream large
+        graphs instead.
+        """
         if format == 'json':
-            # Export as JSON
-            entities_query = """
-            MATCH (e:Entity)
-            RETURN e.id as id, e.name as name, e.type as type, e.properties as properties
-            """
-            
-            relationships_query = """
-            MATCH (a:Entity)-[r]->(b:Entity)
-            RETURN a.id as source, b.id as target, type(r) as relation, 
-                   r.confidence as confidence, r.properties as properties
-            """
-            
-            entities = await self.query_graph(entities_query)
-            relationships = await self.query_graph(relationships_query)
-            
-            return {
-                'entities': entities,
-                'relationships': relationships,
-                'metadata': await self.get_graph_statistics()
-            }
+            data: Dict[str, Any] = {'entities': [], 'relationships': []}
+            async for chunk in self.iter_graph_data(page_size):
+                if 'metadata' in chunk:
+                    data['metadata'] = chunk['metadata']
+                else:
+                    for key, items in chunk.items():
+                        data[key].extend(items)
+            return data
         
         elif format == 'networkx':
-            # Export as NetworkX graph
-            entities = await self.query_graph("MATCH (e:Entity) RETURN e")
-            relationships = await self.query_graph("MATCH (a)-[r]->(b) RETURN a, r, b")
-            
-            # Build NetworkX graph
-            G = nx.DiGraph()
-            
-            for entity in entities:
-                G.add_node(entity['e']['id'], **entity['e'])
-            
-            for rel in relationships:
-                G.add_edge(
-                    rel['a']['id'], 
-                    rel['b']['id'], 
-                    relation=rel['r']['type'],
-                    **rel['r']
-                )
-            
-            return G
+            return await self.export_networkx_graph(page_size)
         
         else:
             raise ValueError(f"Unsupported export format: {format}")
     
+    async def iter_graph_data(self, page_size: int = EXPORT_PAGE_SIZE) -> AsyncIterator[Dict[str, Any]]:
+        """Export knowledge graph data as a stream of JSON chunks
+        
+        Yields {'entities': [...]} pages, then {'relationships': [...]} pages,
+        then a final {'metadata': statistics} chunk; memory stays bounded by
+        the page size rather than the graph size.
+        """
+        async for page in self._paginate(EXPORT_ENTITIES_QUERY, page_size):
+            yield {'entities': page}
+        
+        async for page in self._export_relationship_pages(page_size):
+            if page:
+                yield {'relationships': page}
+        
+        yield {'metadata': await self.get_graph_statistics()}
+    
+    async def export_networkx_graph(self, page_size: int = EXPORT_PAGE_SIZE) -> "networkx.DiGraph":
+        """Export the knowledge graph as a NetworkX graph, read page by page"""
+        # Imported here: NetworkX is only needed for this export and is slow to import
+        import networkx as nx
+        
+        G = nx.DiGraph()
+        
+        # Positional rows go straight into (node, attributes) tuples for the bulk adders
+        async for page in self._paginate(EXPORT_ENTITIES_QUERY, page_size, reader=_read_values):
+            G.add_nodes_from(
+                (node_id, {'name': name, 'type': entity_type, **_unflatten_properties(properties)})
+                for node_id, name, entity_type, properties in page
+            )
+        
+        async for page in self._export_relationship_pages(page_size):
+            G.add_edges_from(
+                (rel['source'], rel['target'], {
+                    'relation': rel['relation'],
+                    'confidence': rel['confidence'],
+                    **rel['properties']
+                })
+                for rel in page
+            )
+        
+        return G
+    
     async def query_for_chatbot(self, entities: List[str], query_type: str = 'related') -> List[Dict]:
         """Query knowledge graph for chatbot responses"""
-        if query_type == 'related':
-            # Find entities related to query entities
-            query = """
-            MATCH (e:Entity)
-            WHERE e.name IN $entities
-            MATCH (e)-[r*1..2]-(related:Entity)
-            RETURN DISTINCT related.name as entity,
-                   related.type as type,
-                   related.properties as properties,
-                   collect(DISTINCT type(r)) as relationship_types
-            ORDER BY related.name
-            LIMIT 20
-            """
-            
-        elif query_type == 'direct':
-            # Get direct information about entities
-            query = """
-            MATCH (e:Entity)
-            WHERE e.name IN $entities
-            RETURN e.name as entity,
-                   e.type as type,
-                   e.properties as properties
-            """
-            
-        elif query_type == 'path':
-            # Find paths between entities
-            if len(entities) >= 2:
-                query = """
-                MATCH (start:Entity {name: $start_entity})
-                MATCH (end:Entity {name: $end_entity})
-                MATCH path = shortestPath((start)-[*1..4]-(end))
-                RETURN [node in nodes(path) | {name: node.name, type: node.type}] as path_nodes,
-                       [rel in relationships(path) | type(rel)] as path_relations
-                LIMIT 5
-                """
-                
-                return await self.query_graph(query, {
-                    'start_entity': entities[0],
-                    'end_entity': entities[1]
-                })
+        if query_type == 'path':
+            if len(entities) < 2:
+                return []
+            return await self._cached_query(
+                self._read_cache,
+                ('chatbot', query_type, entities[0], entities[1]),
+                CHATBOT_PATH_QUERY,
+                {'start_entity': entities[0], 'end_entity': entities[1]}
+            )
         
-        return await self.query_graph(query, {'entities': entities})
\ No newline at end of file
+        query = CHATBOT_QUERIES.get(query_type)
+        if query is None:
+            return []
+        return await self._cached_query(
+            self._read_cache,
+            ('chatbot', query_type, tuple(entities)),
+            query,
+            {'entities': entities}
+        )
@@ -1,11 +1,18 @@
+import hashlib
 import logging
+import re
+import threading
+import uuid
 from typing import List, Dict, Any, Optional
 import asyncio
 from dataclasses import dataclass
 import json
+from collections import deque
+from itertools import islice
+import ahocorasick
+import numpy as np
 import openai
 from langchain.chains import ConversationalRetrievalChain
-from langchain.memory import ConversationBufferMemory
 from langchain.llms import OpenAI
 from langchain.schema import Document as LangChainDocument
 from langchain.vectorstores.base import VectorStore
@@ -14,6 +21,9 @@ from langchain.embeddings import OpenAIEmbeddings
 from app.services.knowledge_graph import KnowledgeGraphService
 from app.services.vector_search import VectorSearchService, SearchResult
 from app.core.config import settings
+from app.core.cache import SemanticCache
+from app.core.time_cache import TimeCache
+from cachetools import LRUCache, TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -26,49 +36,115 @@ class RAGResponse:
     reasoning: str
     query_type: str
 
+# Event loop running in a daemon thread, shared by every sync-to-async bridge call
+_bridge_loop: Optional[asyncio.AbstractEventLoop] = None
+_bridge_lock = threading.Lock()
+
+def _get_bridge_loop() -> asyncio.AbstractEventLoop:
+    global _bridge_loop
+    with _bridge_lock:
+        if _bridge_loop is None:
+            _bridge_loop = asyncio.new_event_loop()
+            threading.Thread(target=_bridge_loop.run_forever, name="vectorstore-bridge", daemon=True).start()
+        return _bridge_loop
+
 class CustomVectorStore(VectorStore):
     """Custom VectorStore wrapper for our VectorSearchService"""
     
     def __init__(self, vector_service: VectorSearchService):
         self.vector_service = vector_service
     
+    @staticmethod
+    def _to_documents(results: List[SearchResult]) -> List[LangChainDocument]:
+        return [
+            LangChainDocument(
+                page_content=result.document.content,
+                metadata={
+                    **result.document.metadata,
+                    'score': result.score,
+                    'rank': result.rank
+                }
+            )
+            for result in results
+        ]
+    
     def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[LangChainDocument]:
-        """Synchronous similarity search for LangChain compatibility"""
-        # Run async search in sync context
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            results = loop.run_until_complete(self.vector_service.search(query, k))
-            
-            documents = []
-            for result in results:
-                doc = LangChainDocument(
-                    page_content=result.document.content,
-                    metadata={
-                        **result.document.metadata,
-                        'score': result.score,
-                        'rank': result.rank
-                    }
-                )
-                documents.append(doc)
-            
-            return documents
-        finally:
-            loop.close()
+        """Synchronous similarity search for LangChain compatibility
+        
+        The search runs on a long-lived background loop, so no event loop is
+        created per call and it works from threads that already run a loop.
+        """
+        future = asyncio.run_coroutine_threadsafe(self.vector_service.search(query, k), _get_bridge_loop())
+        return self._to_documents(future.result())
+    
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs) -> List[LangChainDocument]:
+        """Async similarity search, used directly by LangChain's async paths"""
+        return self._to_documents(await self.vector_service.search(query, k))
     
     def add_texts(self, texts: List[str], metadatas: List[dict] = None, **kwargs) -> List[str]:
-        """Add texts to vector store"""
-        # This would be implemented for adding new documents
-        pass
+        """Add texts to vector store, returning their ids"""
+        future = asyncio.run_coroutine_threadsafe(
+            self.aadd_texts(texts, metadatas, **kwargs), _get_bridge_loop()
+        )
+        return future.result()
+    
+    async def aadd_texts(self, texts: List[str], metadatas: List[dict] = None, **kwargs) -> List[str]:
+        """Async add_texts; all texts are embedded together by add_documents"""
+        texts = list(texts)
+        ids = kwargs.get('ids') or [uuid.uuid4().hex for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        await self.vector_service.add_documents([
+            {'id': doc_id, 'content': text, 'metadata': metadata}
+            for doc_id, text, metadata in zip(ids, texts, metadatas)
+        ])
+        return list(ids)
     
     @classmethod
     def from_texts(cls, texts: List[str], embedding, metadatas: List[dict] = None, **kwargs):
         """Create vector store from texts"""
         pass
 
+# Fixed across requests so it stays an identical, cacheable prompt prefix
+SYSTEM_PROMPT = """You are an AI assistant specialized in MOSDAC (Meteorological & Oceanographic Satellite Data Archival Centre) data and services. 
+
+Your role is to provide accurate, helpful information about:
+- Indian meteorological and oceanographic satellites (INSAT, SCATSAT, OCEANSAT, etc.)
+- Weather data and forecasting
+- Ocean data and marine parameters
+- Satellite data products and access methods
+- ISRO missions and capabilities
+
+Guidelines:
+1. Be accurate and cite sources when possible
+2. If you don't know something, say so clearly
+3. Provide practical information about data access when relevant
+4. Use technical terms appropriately but explain them when needed
+5. Keep responses concise but comprehensive
+
+Each user message gives context information, a question and its query type. Please provide a helpful and accurate response based on the context provided. If the context doesn't contain enough information to fully answer the question, acknowledge this and provide what information you can."""
+
+# Satellite families recognised in retrieved content, by display name
+_SAT_RE = re.compile(r"(?P<INSAT>insat)|(?P<SCATSAT>scatsat)|(?P<OCEANSAT>oceansat)", re.I)
+SATELLITE_DISPLAY_NAMES = {
+    'INSAT': 'INSAT series',
+    'SCATSAT': 'SCATSAT',
+    'OCEANSAT': 'OCEANSAT'
+}
+
 class RAGService:
     """Retrieval-Augmented Generation service combining vector search and knowledge graph"""
     
+    # Knowledge graph query mode by query type; anything else uses 'related'
+    KG_QUERY_MODES = {'weather': 'direct', 'ocean': 'direct'}
+    
+    # Query classification keywords, highest precedence first
+    QUERY_KEYWORDS = {
+        'weather': ['weather', 'temperature', 'rainfall', 'wind', 'humidity', 'forecast'],
+        'satellite': ['satellite', 'insat', 'scatsat', 'oceansat', 'mission'],
+        'ocean': ['ocean', 'sea', 'marine', 'sst', 'chlorophyll', 'wave'],
+        'data_access': ['data', 'download', 'access', 'api', 'format'],
+    }
+    
     def __init__(self, kg_service: KnowledgeGraphService, vector_service: VectorSearchService):
         self.kg_service = kg_service
         self.vector_service = vector_service
@@ -76,6 +152,13 @@ class RAGService:
         # Initialize OpenAI
         if settings.OPENAI_API_KEY:
             openai.api_key = settings.OPENAI_API_KEY
+            # Native async client: concurrent completions share its connection pool
+            # instead of each holding an executor thread
+            self.openai_client = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=settings.OPENAI_MAX_RETRIES
+            )
             self.llm = OpenAI(
                 temperature=0.7,
                 max_tokens=1000,
@@ -83,14 +166,32 @@ class RAGService:
             )
         else:
             logger.warning("OpenAI API key not provided, using mock responses")
+            self.openai_client = None
             self.llm = None
         
-        # Initialize memory for conversation
-        self.memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True,
-            output_key="answer"
+        # Per-session message history, bounded so memory stays flat for long sessions;
+        # the least recently used sessions are dropped, like sessions in the SessionStore
+        self.conversation_history: LRUCache = LRUCache(maxsize=settings.SESSION_MAX_COUNT)
+        
+        # Answers don't depend on the session, so they are shared across sessions:
+        # exact repeats by normalized query and location, near-repeats (without a
+        # location) by query embedding
+        self._exact_cache = TTLCache(
+            maxsize=settings.CHAT_CACHE_MAX_ENTRIES,
+            ttl=max(settings.CHAT_CACHE_TTL, 1)
         )
+        # LLM answers by (context pack version, normalized query, query type)
+        self._answer_cache = TTLCache(
+            maxsize=settings.CHAT_CACHE_MAX_ENTRIES,
+            ttl=max(settings.CHAT_CACHE_TTL, 1)
+        )
+        self._semantic_cache = SemanticCache(
+            max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+            threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+            ttl=settings.CHAT_CACHE_TTL
+        )
+        # Pipeline runs by exact cache key, while they are in flight
+        self._inflight: Dict[tuple, asyncio.Future] = {}
         
         # Entity extraction patterns
         self.entity_patterns = {
@@ -107,24 +208,127 @@ class RAGService:
                 r'wind\s+speed', r'wave\s+height', r'precipitation'
             ]
         }
+        # One case-insensitive alternation per type, so each type is a single scan
+        self.entity_regexes = {
+            entity_type: re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+            for entity_type, patterns in self.entity_patterns.items()
+        }
+        
+        # Keyword automaton for _classify_query: one pass over the query finds every
+        # keyword, each tagged with its category's precedence
+        self.query_precedence = {category: rank for rank, category in enumerate(self.QUERY_KEYWORDS)}
+        self.keyword_automaton = ahocorasick.Automaton()
+        for category, keywords in self.QUERY_KEYWORDS.items():
+            for keyword in keywords:
+                self.keyword_automaton.add_word(keyword, self.query_precedence[category])
+        self.keyword_automaton.make_automaton()
         
         logger.info("RAG Service initialized")
     
     async def process_query(self, query: str, session_id: str = "default", 
                           location: Dict[str, Any] = None) -> RAGResponse:
         """Process user query using RAG approach"""
+        return await self._process_query(query, session_id, location)
+    
+    async def process_query_batch(self, queries: List[str],
+                                  session_ids: List[str] = None) -> List[RAGResponse]:
+        """Process several queries together, embedding them in a single model call"""
+        session_ids = session_ids or ["default"] * len(queries)
+        
+        try:
+            query_embeddings = list(await self.vector_service.embed_queries(queries))
+        except Exception as e:
+            logger.error(f"Batch query embedding failed, embedding individually: {e}")
+            query_embeddings = [None] * len(queries)
+        
+        # One FAISS search for the whole batch instead of one per query
+        vector_batch = [None] * len(queries)
+        if query_embeddings[0] is not None:
+            try:
+                vector_batch = await self.vector_service.hybrid_search_batch(
+                    queries, k=5, query_embeddings=np.stack(query_embeddings)
+                )
+            except Exception as e:
+                logger.error(f"Batch vector search failed, searching individually: {e}")
+        
+        return list(await asyncio.gather(*(
+            self._process_query(query, session_id, query_embedding=query_embedding, vector_results=vector_results)
+            for query, session_id, query_embedding, vector_results
+            in zip(queries, session_ids, query_embeddings, vector_batch)
+        )))
+    
+    async def _process_query(self, query: str, session_id: str = "default",
+                             location: Dict[str, Any] = None,
+                             query_embedding: Any = None,
+                             vector_results: Optional[List[SearchResult]] = None) -> RAGResponse:
+        """Run the RAG pipeline for a single query
+        
+        vector_results, when given, are this query's precomputed vector context.
+        """
         logger.info(f"Processing query: {query}")
         
+        exact_key = (" ".join(query.lower().split()), json.dumps(location, sort_keys=True))
+        cached = self._exact_cache.get(exact_key) if settings.CHAT_CACHE_TTL > 0 else None
+        
+        if cached is None and location is None and self._semantic_cache.enabled:
+            # The embedding is needed for vector retrieval anyway, so compute it up front
+            if query_embedding is None:
+                try:
+                    query_embedding = (await self.vector_service.embed_queries([query]))[0]
+                except Exception as e:
+                    logger.error(f"Query embedding failed: {e}")
+            if query_embedding is not None:
+                cached = self._semantic_cache.get(query_embedding)
+                if cached is not None:
+                    self._exact_cache[exact_key] = cached
+        
+        if cached is not None:
+            logger.debug("RAG response cache hit")
+            self.record_exchange(session_id, query, cached.answer)
+            return cached
+        
+        # Identical queries already in flight share one pipeline run
+        pending = self._inflight.get(exact_key)
+        if pending is None:
+            pending = asyncio.ensure_future(
+                self._run_pipeline(query, location, query_embedding, vector_results, exact_key)
+            )
+            self._inflight[exact_key] = pending
+            
+            def release(done: asyncio.Future):
+                if self._inflight.get(exact_key) is done:
+                    del self._inflight[exact_key]
+            
+            pending.add_done_callback(release)
+        else:
+            logger.debug("Joining in-flight RAG query")
+        
+        # Shielded so one cancelled caller doesn't cancel the run for the others
+        rag_response = await asyncio.shield(pending)
+        if rag_response.query_type != "error":
+            self.record_exchange(session_id, query, rag_response.answer)
+        return rag_response
+    
+    async def _run_pipeline(self, query: str, location: Optional[Dict[str, Any]],
+                            query_embedding: Any, vector_results: Optional[List[SearchResult]],
+                            exact_key: tuple) -> RAGResponse:
+        """Retrieve, generate and cache the response for a query cache miss"""
         try:
             # Step 1: Extract entities from query
-            query_entities = await self._extract_query_entities(query)
+            query_entities = self._extract_query_entities(query)
             
             # Step 2: Determine query type
-            query_type = await self._classify_query(query, query_entities)
+            query_type = self._classify_query(query, query_entities)
             
-            # Step 3: Retrieve relevant information
-            vector_results = await self._retrieve_vector_context(query, location)
-            kg_context = await self._retrieve_kg_context(query_entities, query_type)
+            # Step 3: Retrieve relevant information; vector and graph retrieval are
+            # independent, so they run concurrently
+            if vector_results is None:
+                vector_results, kg_context = await asyncio.gather(
+                    self._retrieve_vector_context(query, location, query_embedding),
+                    self._retrieve_kg_context(query_entities, query_type)
+                )
+            else:
+                kg_context = await self._retrieve_kg_context(query_entities, query_type)
             
             # Step 4: Generate response
             response = await self._generate_response(
@@ -132,9 +336,9 @@ class RAGService:
             )
             
             # Step 5: Calculate confidence
-            confidence = await self._calculate_confidence(response, vector_results, kg_context)
+            confidence = self._calculate_confidence(response, vector_results, kg_context)
             
-            return RAGResponse(
+            rag_response = RAGResponse(
                 answer=response['answer'],
                 sources=response['sources'],
                 entities=query_entities,
@@ -143,6 +347,13 @@ class RAGService:
                 query_type=query_type
             )
             
+            if settings.CHAT_CACHE_TTL > 0:
+                self._exact_cache[exact_key] = rag_response
+                if location is None and query_embedding is not None:
+                    self._semantic_cache.put(query_embedding, rag_response)
+            
+            return rag_response
+            
         except Exception as e:
             logger.error(f"Error processing query: {e}")
             return RAGResponse(
@@ -154,58 +365,45 @@ class RAGService:
                 query_type="error"
             )
     
-    async def _extract_query_entities(self, query: str) -> List[Dict[str, Any]]:
+    def _extract_query_entities(self, query: str) -> List[Dict[str, Any]]:
         """Extract entities from user query"""
-        import re
-        
         entities = []
         entity_id = 0
         
-        for entity_type, patterns in self.entity_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, query, re.IGNORECASE)
-                for match in matches:
-                    entities.append({
-                        'id': f"query_entity_{entity_id}",
-                        'text': match.group(),
-                        'type': entity_type,
-                        'start': match.start(),
-                        'end': match.end(),
-                        'confidence': 0.9
-                    })
-                    entity_id += 1
+        for entity_type, regex in self.entity_regexes.items():
+            for match in regex.finditer(query):
+                entities.append({
+                    'id': f"query_entity_{entity_id}",
+                    'text': match.group(),
+                    'type': entity_type,
+                    'start': match.start(),
+                    'end': match.end(),
+                    'confidence': 0.9
+                })
+                entity_id += 1
         
         return entities
     
-    async def _classify_query(self, query: str, entities: List[Dict]) -> str:
+    def _classify_query(self, query: str, entities: List[Dict]) -> str:
         """Classify the type of query"""
-        query_lower = query.lower()
-        
-        # Weather-related queries
-        weather_keywords = ['weather', 'temperature', 'rainfall', 'wind', 'humidity', 'forecast']
-        if any(keyword in query_lower for keyword in weather_keywords):
-            return 'weather'
-        
-        # Satellite-related queries
-        satellite_keywords = ['satellite', 'insat', 'scatsat', 'oceansat', 'mission']
-        if any(keyword in query_lower for keyword in satellite_keywords) or \
-           any(entity['type'] == 'SATELLITE' for entity in entities):
-            return 'satellite'
-        
-        # Ocean/marine queries
-        ocean_keywords = ['ocean', 'sea', 'marine', 'sst', 'chlorophyll', 'wave']
-        if any(keyword in query_lower for keyword in ocean_keywords):
-            return 'ocean'
-        
-        # Data access queries
-        data_keywords = ['data', 'download', 'access', 'api', 'format']
-        if any(keyword in query_lower for keyword in data_keywords):
-            return 'data_access'
+        categories = list(self.QUERY_KEYWORDS)
+        best = len(categories)
+        for _, rank in self.keyword_automaton.iter(query.lower()):
+            if rank < best:
+                best = rank
+                if best == 0:
+                    break
+        
+        # A recognized satellite entity classifies the query even without a keyword
+        satellite = self.query_precedence['satellite']
+        if best > satellite and any(entity['type'] == 'SATELLITE' for entity in entities):
+            best = satellite
         
         # General information
-        return 'general'
+        return categories[best] if best < len(categories) else 'general'
     
-    async def _retrieve_vector_context(self, query: str, location: Dict = None) -> List[SearchResult]:
+    async def _retrieve_vector_context(self, query: str, location: Dict = None,
+                                       query_embedding: Any = None) -> List[SearchResult]:
         """Retrieve relevant context using vector search"""
         # Apply location filter if provided
         filter_metadata = {}
@@ -213,7 +411,7 @@ class RAGService:
             filter_metadata['location'] = location
         
         # Use hybrid search for better results
-        results = await self.vector_service.hybrid_search(query, k=5)
+        results = await self.vector_service.hybrid_search(query, k=5, query_embedding=query_embedding)
         
         logger.debug(f"Retrieved {len(results)} vector search results")
         return results
@@ -225,13 +423,15 @@ class RAGService:
         
         entity_names = [entity['text'] for entity in entities]
         
-        # Query knowledge graph based on query type
-        if query_type == 'satellite':
-            kg_results = await self.kg_service.query_for_chatbot(entity_names, 'related')
-        elif query_type in ['weather', 'ocean']:
-            kg_results = await self.kg_service.query_for_chatbot(entity_names, 'direct')
-        else:
-            kg_results = await self.kg_service.query_for_chatbot(entity_names, 'related')
+        # Query knowledge graph based on query type; answer from documents alone
+        # if the graph is unavailable
+        try:
+            kg_results = await self.kg_service.query_for_chatbot(
+                entity_names, self.KG_QUERY_MODES.get(query_type, 'related')
+            )
+        except Exception as e:
+            logger.warning(f"Knowledge graph context unavailable: {e}")
+            return []
         
         logger.debug(f"Retrieved {len(kg_results)} knowledge graph results")
         return kg_results
@@ -241,16 +441,9 @@ class RAGService:
                                query_type: str) -> Dict[str, Any]:
         """Generate response using LLM or rule-based approach"""
         
-        # Prepare context
-        context_parts = []
+        # Prepare sources in relevance order
         sources = []
-        
-        # Add vector search context
         for result in vector_results:
-            context_parts.append(f"Source: {result.document.metadata.get('title', 'Document')}")
-            context_parts.append(f"Content: {result.document.content[:500]}...")
-            context_parts.append("---")
-            
             sources.append({
                 'url': result.document.metadata.get('url', ''),
                 'title': result.document.metadata.get('title', 'Document'),
@@ -258,14 +451,7 @@ class RAGService:
                 'relevance': result.score,
                 'type': 'document'
             })
-        
-        # Add knowledge graph context
         for kg_item in kg_context:
-            context_parts.append(f"Entity: {kg_item.get('entity', '')}")
-            context_parts.append(f"Type: {kg_item.get('type', '')}")
-            context_parts.append(f"Properties: {kg_item.get('properties', {})}")
-            context_parts.append("---")
-            
             sources.append({
                 'entity': kg_item.get('entity', ''),
                 'type': kg_item.get('type', ''),
@@ -274,21 +460,25 @@ class RAGService:
                 'type': 'knowledge_graph'
             })
         
-        context = "\n".join(context_parts)
+        context, context_version = self._build_context_pack(vector_results, kg_context)
         
         if self.llm and settings.OPENAI_API_KEY:
             # Use OpenAI for response generation
-            prompt = self._create_prompt(query, context, query_type)
+            answer_key = (context_version, " ".join(query.lower().split()), query_type)
+            answer = self._answer_cache.get(answer_key)
             
             try:
-                response = await self._call_openai(prompt)
-                answer = response.strip()
+                if answer is None:
+                    messages = self._create_messages(query, context, query_type)
+                    answer = (await self._call_openai(messages)).strip()
+                    if settings.CHAT_CACHE_TTL > 0:
+                        self._answer_cache[answer_key] = answer
             except Exception as e:
                 logger.error(f"OpenAI API call failed: {e}")
-                answer = await self._generate_fallback_response(query, vector_results, kg_context, query_type)
+                answer = self._generate_fallback_response(query, vector_results, kg_context, query_type)
         else:
             # Use rule-based response generation
-            answer = await self._generate_fallback_response(query, vector_results, kg_context, query_type)
+            answer = self._generate_fallback_response(query, vector_results, kg_context, query_type)
         
         return {
             'answer': answer,
@@ -296,59 +486,79 @@ class RAGService:
             'reasoning': f"Generated response based on {len(vector_results)} documents and {len(kg_context)} knowledge graph entities"
         }
     
-    def _create_prompt(self, query: str, context: str, query_type: str) -> str:
-        """Create prompt for LLM"""
-        system_prompt = """You are an AI assistant specialized in MOSDAC (Meteorological & Oceanographic Satellite Data Archival Centre) data and services. 
+    @staticmethod
+    def _build_context_pack(vector_results: List[SearchResult], kg_context: List[Dict]) -> tuple:
+        """Canonical LLM context and its version hash
+        
+        Documents are deduplicated and ordered by id, graph entities by name and
+        type, and properties are serialized with sorted keys, so the same
+        retrieval set always yields the same text (and prompt) whatever order it
+        was retrieved in.
+        """
+        documents = {result.document.id: result.document for result in vector_results}
+        kg_items = {(item.get('entity', ''), item.get('type', '')): item for item in kg_context}
+        
+        # One formatted block per item, joined once
+        context_parts = []
+        for doc_id in sorted(documents):
+            document = documents[doc_id]
+            context_parts.append(
+                f"Source: {document.metadata.get('title', 'Document')}\n"
+                f"Content: {document.content[:500]}...\n"
+                "---"
+            )
         
-Your role is to provide accurate, helpful information about:
-- Indian meteorological and oceanographic satellites (INSAT, SCATSAT, OCEANSAT, etc.)
-- Weather data and forecasting
-- Ocean data and marine parameters
-- Satellite data products and access methods
-- ISRO missions and capabilities
-
-Guidelines:
-1. Be accurate and cite sources when possible
-2. If you don't know something, say so clearly
-3. Provide practical information about data access when relevant
-4. Use technical terms appropriately but explain them when needed
-5. Keep responses concise but comprehensive"""
+        for key in sorted(kg_items, key=lambda key: (str(key[0]), str(key[1]))):
+            entity, entity_type = key
+            properties = json.dumps(kg_items[key].get('properties', {}), sort_keys=True, default=str)
+            context_parts.append(
+                f"Entity: {entity}\n"
+                f"Type: {entity_type}\n"
+                f"Properties: {properties}\n"
+                "---"
+            )
         
-        user_prompt = f"""
-Context Information:
+        context = "\n".join(context_parts)
+        version = hashlib.blake2b(context.encode(), digest_size=8).hexdigest()
+        return context, version
+    
+    def _create_messages(self, query: str, context: str, query_type: str) -> List[Dict[str, str]]:
+        """Create chat messages for the LLM
+        
+        The static SYSTEM_PROMPT comes first and unchanged, so it forms a
+        cacheable prompt prefix; everything query-specific is in the user message.
+        """
+        user_prompt = f"""Context Information:
 {context}
 
 User Question: {query}
 
-Query Type: {query_type}
-
-Please provide a helpful and accurate response based on the context provided. If the context doesn't contain enough information to fully answer the question, acknowledge this and provide what information you can.
-"""
+Query Type: {query_type}"""
         
-        return f"{system_prompt}\n\n{user_prompt}"
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
     
-    async def _call_openai(self, prompt: str) -> str:
-        """Call OpenAI API asynchronously"""
+    async def _call_openai(self, messages: List[Dict[str, str]]) -> str:
+        """Call the OpenAI chat completions API"""
         try:
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: openai.Completion.create(
-                    engine="text-davinci-003",
-                    prompt=prompt,
-                    max_tokens=500,
-                    temperature=0.7,
-                    top_p=1.0,
-                    frequency_penalty=0.0,
-                    presence_penalty=0.0
-                )
+            response = await self.openai_client.chat.completions.create(
+                model=settings.OPENAI_CHAT_MODEL,
+                messages=messages,
+                max_tokens=500,
+                temperature=0.7,
+                top_p=1.0,
+                frequency_penalty=0.0,
+                presence_penalty=0.0
             )
-            return response.choices[0].text.strip()
+            return response.choices[0].message.content.strip()
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             raise
     
-    async def _generate_fallback_response(self, query: str, vector_results: List[SearchResult], 
-                                        kg_context: List[Dict], query_type: str) -> str:
+    def _generate_fallback_response(self, query: str, vector_results: List[SearchResult], 
+                                  kg_context: List[Dict], query_type: str) -> str:
         """Generate fallback response using rule-based approach"""
         
         if query_type == 'satellite':
@@ -371,15 +581,12 @@ Please provide a helpful and accurate response based on the context provided. If
         response_parts = []
         
         # Extract satellite information from context
-        satellites_mentioned = set()
-        for result in vector_results:
-            content = result.document.content.lower()
-            if 'insat' in content:
-                satellites_mentioned.add('INSAT series')
-            if 'scatsat' in content:
-                satellites_mentioned.add('SCATSAT')
-            if 'oceansat' in content:
-                satellites_mentioned.add('OCEANSAT')
+        hits = {
+            match.lastgroup
+            for result in vector_results
+            for match in _SAT_RE.finditer(result.document.content)
+        }
+        satellites_mentioned = [name for group, name in SATELLITE_DISPLAY_NAMES.items() if group in hits]
         
         if satellites_mentioned:
             response_parts.append(f"Based on MOSDAC data, the following satellites are relevant: {', '.join(satellites_mentioned)}.")
@@ -429,8 +636,8 @@ Please provide a helpful and accurate response based on the context provided. If
         
         return "I can help you with information about MOSDAC satellites, weather data, oceanographic parameters, and data access methods. Could you please be more specific about what you'd like to know?"
     
-    async def _calculate_confidence(self, response: Dict, vector_results: List[SearchResult], 
-                                  kg_context: List[Dict]) -> float:
+    def _calculate_confidence(self, response: Dict, vector_results: List[SearchResult], 
+                            kg_context: List[Dict]) -> float:
         """Calculate confidence score for the response"""
         base_confidence = 0.5
         
@@ -455,18 +662,47 @@ Please provide a helpful and accurate response based on the context provided. If
     async def handle_geospatial_query(self, query: str, location: Dict[str, Any]) -> RAGResponse:
         """Handle location-aware queries"""
         # Add location context to query
-        location_context = f"Location: {location.get('address', f'{location.get(\"lat\", \"\")}, {location.get(\"lon\", \"\")}')}. "
+        address = location.get('address', f"{location.get('lat', '')}, {location.get('lon', '')}")
+        location_context = f"Location: {address}. "
         enhanced_query = location_context + query
         
         return await self.process_query(enhanced_query, location=location)
     
-    async def get_conversation_history(self, session_id: str) -> List[Dict]:
-        """Get conversation history for a session"""
-        # This would typically be stored in a database
-        # For now, return empty list
-        return []
+    async def close(self):
+        """Close the OpenAI client's connection pool"""
+        if self.openai_client is not None:
+            await self.openai_client.close()
+    
+    def record_exchange(self, session_id: str, query: str, answer: str):
+        """Append a user/assistant exchange to the session history"""
+        history = self.conversation_history.get(session_id)
+        if history is None:
+            history = deque(maxlen=settings.CHAT_HISTORY_MAX_MESSAGES)
+            self.conversation_history[session_id] = history
+        timestamp = TimeCache.iso()
+        history.append({"role": "user", "content": query, "timestamp": timestamp})
+        history.append({"role": "assistant", "content": answer, "timestamp": timestamp})
+    
+    async def get_conversation_history(self, session_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """Get the last limit messages of a session's history (all if limit is None)"""
+        # This would typically be stored in a database (e.g. Redis LRANGE key -limit -1)
+        history = self.conversation_history.get(session_id)
+        if not history:
+            return []
+        if limit is None or limit >= len(history):
+            return list(history)
+        if limit <= 0:
+            return []
+        # Walk from the tail so only limit entries are touched
+        tail = list(islice(reversed(history), limit))
+        tail.reverse()
+        return tail
+    
+    async def get_conversation_length(self, session_id: str) -> int:
+        """Number of messages stored for a session"""
+        return len(self.conversation_history.get(session_id, ()))
     
     async def clear_conversation_history(self, session_id: str):
         """Clear conversation history for a session"""
-        self.memory.clear()
+        self.conversation_history.pop(session_id, None)
         logger.info(f"Cleared conversation history for session: {session_id}")
\ No newline at end of file
@@ -32,14 +32,12 @@ class ScraperService:
             raise
     
     async def scrape_single_url(self, url: str) -> ScrapedContent:
-        """Scrape a single URL"""
+        """Scrape a single URL, revalidating any cached copy with a conditional GET"""
         logger.info(f"Scraping single URL: {url}")
         
         try:
-            import aiohttp
-            async with aiohttp.ClientSession(**self.scraper.session_config) as session:
-                content = await self.scraper.scrape_page_enhanced(session, url)
-                return content
+            session = await self.scraper.get_session()
+            return await self.scraper.scrape_page_enhanced(session, url, revalidate=True)
         except Exception as e:
             logger.error(f"Failed to scrape {url}: {e}")
             raise
@@ -50,4 +48,8 @@ class ScraperService:
             "scraped_urls": len(self.scraper.scraped_urls),
             "failed_urls": len(self.scraper.failed_urls),
             "cached_items": len(self.scraper.content_cache)
-        }
\ No newline at end of file
+        }
+    
+    async def close(self):
+        """Release the scraper's HTTP session and workers"""
+        await self.scraper.close()
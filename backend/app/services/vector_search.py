@@ -1,26 +1,38 @@
 import faiss
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
+import os
 import pickle
 import json
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import re
+from array import array
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import asyncio
+from collections import deque
 import aiofiles
-from dataclasses import dataclass, asdict
+from cachetools import LRUCache
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dataclasses import dataclass
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Terms for keyword search, in documents and queries alike
+_TOKEN_RE = re.compile(r"\w+")
+
+# Embeddings are not kept per document; row i of VectorSearchService._vectors
+# belongs to documents[i]
+@dataclass(slots=True)
 class Document:
     id: str
     content: str
     metadata: Dict[str, Any]
-    embedding: Optional[np.ndarray] = None
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     document: Document
     score: float
@@ -31,32 +43,153 @@ class VectorSearchService:
     
     def __init__(self, model_name: str = None):
         self.model_name = model_name or settings.EMBEDDING_MODEL
-        self.model = SentenceTransformer(self.model_name)
+        self.device = settings.EMBEDDING_DEVICE or self._default_device()
+        self.model = self._load_model()
+        # Normalized query embeddings by (model, query); entries are read-only
+        self._query_cache = LRUCache(maxsize=max(settings.QUERY_EMBEDDING_CACHE_SIZE, 1))
+        # One encoding process per GPU, for large batches on multi-GPU hosts
+        self._mp_pool = None
+        if self.embedding_backend == 'torch' and self.device == 'cuda' and torch.cuda.device_count() > 1:
+            self._mp_pool = self.model.start_multi_process_pool()
+            logger.info(f"Started embedding pool on {torch.cuda.device_count()} GPUs")
         self.dimension = self.model.get_sentence_embedding_dimension()
         
-        # Initialize FAISS index
-        self.index = faiss.IndexFlatIP(self.dimension)  # Inner product for cosine similarity
+        # Initialize FAISS index; inner product on normalized embeddings is cosine similarity
+        self.index_factory = settings.VECTOR_INDEX_FACTORY
+        self._gpu_resources = None
+        self._on_gpu = False
+        self.index = self._create_index()
+        # Row-major embeddings in document order, also searched exactly on small
+        # corpora; rows past _vector_count are spare capacity
+        self._vectors: np.ndarray = np.empty((0, self.dimension), dtype=np.float32)
+        self._vector_count = 0
         self.documents: List[Document] = []
         self.id_to_index: Dict[str, int] = {}
+        # Keyword search postings: lowercased term -> ascending document indices,
+        # as int32 arrays that grow in place (amortized O(1) per entry)
+        self._postings: Dict[str, array] = {}
+        # Documents accepted by add_documents(mode="async") and not yet indexed,
+        # with the event set once they are
+        self._embed_queue: asyncio.Queue = asyncio.Queue()
+        self._pending_ids: Dict[str, asyncio.Event] = {}
+        self._embed_worker: Optional[asyncio.Task] = None
         
         # Paths
         self.index_path = Path(settings.VECTOR_INDEX_PATH)
         self.index_path.mkdir(parents=True, exist_ok=True)
         
-        logger.info(f"Initialized VectorSearchService with model: {self.model_name}")
+        logger.info(f"Initialized VectorSearchService with model: {self.model_name} on {self.device}")
+    
+    @staticmethod
+    def _default_device() -> str:
+        if torch.cuda.is_available():
+            return 'cuda'
+        if torch.backends.mps.is_available():
+            return 'mps'
+        return 'cpu'
+    
+    def _load_model(self) -> SentenceTransformer:
+        """Embedding model on the configured backend, falling back to torch"""
+        self.embedding_backend = settings.EMBEDDING_BACKEND
+        if self.embedding_backend != 'torch':
+            model_kwargs = {'file_name': settings.EMBEDDING_MODEL_FILE} if settings.EMBEDDING_MODEL_FILE else None
+            try:
+                return SentenceTransformer(
+                    self.model_name,
+                    device=self.device,
+                    backend=self.embedding_backend,
+                    model_kwargs=model_kwargs
+                )
+            except (TypeError, ImportError) as e:
+                # TypeError: sentence-transformers too old for backends; ImportError: runtime missing
+                logger.warning(f"Embedding backend {self.embedding_backend} unavailable, using torch: {e}")
+                self.embedding_backend = 'torch'
+        
+        model = SentenceTransformer(self.model_name, device=self.device)
+        if settings.EMBEDDING_FP16 and self.device != 'cpu':
+            model.half()
+        return model
+    
+    def _create_index(self) -> faiss.Index:
+        """Empty index of the configured type"""
+        index = faiss.index_factory(self.dimension, self.index_factory, faiss.METRIC_INNER_PRODUCT)
+        return self._prepare_index(index)
+    
+    def _prepare_index(self, index: faiss.Index) -> faiss.Index:
+        """Apply search-time parameters, which aren't stored with the index, and
+        move the index to GPU when enabled and supported"""
+        hnsw = getattr(faiss.downcast_index(index), 'hnsw', None)
+        if hnsw is not None:
+            hnsw.efSearch = settings.VECTOR_HNSW_EF_SEARCH
+        
+        self._on_gpu = False
+        if not settings.VECTOR_INDEX_GPU or not hasattr(faiss, 'StandardGpuResources') or faiss.get_num_gpus() == 0:
+            return index
+        if self._gpu_resources is None:
+            self._gpu_resources = faiss.StandardGpuResources()
+        try:
+            index = faiss.index_cpu_to_gpu(self._gpu_resources, 0, index)
+        except RuntimeError as e:
+            logger.info(f"Keeping {self.index_factory} index on CPU: {e}")
+            return index
+        self._on_gpu = True
+        logger.info(f"Moved {self.index_factory} index to GPU")
+        return index
+    
+    def _add_to_index(self, embeddings: np.ndarray):
+        embeddings = np.ascontiguousarray(embeddings, dtype='float32')
+        if not self.index.is_trained:
+            logger.info(f"Training {self.index_factory} index on {len(embeddings)} vectors")
+            self.index.train(embeddings)
+        self.index.add(embeddings)
+    
+    def _set_vectors(self, vectors: np.ndarray):
+        """Replace the embedding matrix with vectors (all embeddings, in document order)"""
+        self._vector_count = len(vectors)
+        self._vectors = vectors
+    
+    def _append_vectors(self, embeddings: np.ndarray):
+        """Append to the embedding matrix, growing it in amortized blocks"""
+        needed = self._vector_count + len(embeddings)
+        if needed > len(self._vectors) or not self._vectors.flags.writeable:
+            grown = np.empty((max(needed, 2 * len(self._vectors), 4096), self.dimension), dtype=np.float32)
+            grown[:self._vector_count] = self._vectors[:self._vector_count]
+            self._vectors = grown
+        self._vectors[self._vector_count:needed] = embeddings
+        self._vector_count = needed
     
-    async def add_documents(self, documents: List[Dict[str, Any]]) -> int:
-        """Add documents to the vector index"""
+    def _search_vectors(self, queries: np.ndarray, n_results: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(scores, indices) of the n_results best documents per query row, best first
+        
+        Small corpora are scored exactly with one matrix product; larger ones
+        go through the FAISS index.
+        """
+        if self._vector_count > settings.VECTOR_EXACT_SEARCH_MAX:
+            return self.index.search(queries, n_results)
+        
+        scores = queries @ self._vectors[:self._vector_count].T
+        n_results = min(n_results, scores.shape[1])
+        top = np.argpartition(-scores, n_results - 1, axis=1)[:, :n_results]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        return np.take_along_axis(top_scores, order, axis=1), np.take_along_axis(top, order, axis=1)
+    
+    async def add_documents(self, documents: List[Dict[str, Any]], mode: str = "sync") -> int:
+        """Add documents to the vector index
+        
+        With mode="async" the documents are queued for a background worker and
+        the call returns at once; wait_indexed() tells when one is searchable.
+        An index that still needs training is always filled synchronously.
+        """
         logger.info(f"Adding {len(documents)} documents to vector index...")
         
         new_documents = []
-        texts_to_embed = []
         
         for doc_data in documents:
-            doc_id = doc_data.get('id', f"doc_{len(self.documents)}")
+            doc_id = doc_data.get('id', f"doc_{len(self.documents) + len(self._pending_ids)}")
             
             # Skip if document already exists
-            if doc_id in self.id_to_index:
+            if doc_id in self.id_to_index or doc_id in self._pending_ids:
                 logger.debug(f"Document {doc_id} already exists, skipping")
                 continue
             
@@ -67,67 +200,202 @@ class VectorSearchService:
             )
             
             new_documents.append(document)
-            texts_to_embed.append(document.content)
         
         if not new_documents:
             logger.info("No new documents to add")
             return 0
         
-        # Generate embeddings
-        logger.info(f"Generating embeddings for {len(texts_to_embed)} documents...")
-        embeddings = await self._generate_embeddings_async(texts_to_embed)
-        
-        # Normalize embeddings for cosine similarity
-        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
-        
-        # Add to FAISS index
-        start_index = len(self.documents)
-        self.index.add(embeddings.astype('float32'))
-        
-        # Update document storage and mapping
-        for i, document in enumerate(new_documents):
-            document.embedding = embeddings[i]
-            self.documents.append(document)
-            self.id_to_index[document.id] = start_index + i
+        if mode == "async" and self.index.is_trained:
+            for document in new_documents:
+                self._pending_ids[document.id] = asyncio.Event()
+                self._embed_queue.put_nowait(document)
+            if self._embed_worker is None or self._embed_worker.done():
+                self._embed_worker = asyncio.create_task(self._drain_embed_queue())
+            logger.info(f"Queued {len(new_documents)} documents for background embedding")
+            return len(new_documents)
         
+        await self._index_documents(new_documents)
         logger.info(f"Successfully added {len(new_documents)} documents to index")
         return len(new_documents)
     
+    async def _index_documents(self, new_documents: List[Document]):
+        """Embed documents and add them to the index, storage and postings"""
+        # Generate embeddings chunk by chunk, adding each to the FAISS index
+        # while the following chunks are being embedded
+        logger.info(f"Generating embeddings for {len(new_documents)} documents...")
+        async for chunk, embeddings in self._embed_chunks(new_documents):
+            start_index = len(self.documents)
+            self._add_to_index(embeddings)
+            self._append_vectors(embeddings)
+            
+            # Update document storage and mapping
+            for i, document in enumerate(chunk):
+                self.id_to_index[document.id] = start_index + i
+            self.documents.extend(chunk)
+            self._index_terms(start_index, chunk)
+    
+    async def _drain_embed_queue(self):
+        """Background worker: index queued documents in EMBEDDING_QUEUE_BATCH steps"""
+        while True:
+            batch = [await self._embed_queue.get()]
+            while len(batch) < settings.EMBEDDING_QUEUE_BATCH and not self._embed_queue.empty():
+                batch.append(self._embed_queue.get_nowait())
+            try:
+                await self._index_documents(batch)
+                logger.debug(f"Indexed {len(batch)} queued documents")
+            except Exception as e:
+                logger.error(f"Background embedding failed for {len(batch)} documents: {e}")
+            finally:
+                for document in batch:
+                    event = self._pending_ids.pop(document.id, None)
+                    if event is not None:
+                        event.set()
+                    self._embed_queue.task_done()
+    
+    async def wait_indexed(self, doc_id: str) -> bool:
+        """Wait until a queued document has been indexed; False if it never was"""
+        event = self._pending_ids.get(doc_id)
+        if event is not None:
+            await event.wait()
+        return doc_id in self.id_to_index
+    
+    async def _embed_chunks(self, documents: List[Document]) -> AsyncIterator[Tuple[List[Document], np.ndarray]]:
+        """Yield (chunk, embeddings) in order, keeping up to EMBEDDING_PIPELINE_DEPTH
+        chunks encoding in the executor ahead of the consumer
+        
+        An index that still needs training gets everything as one chunk, so it
+        is trained on all the vectors.
+        """
+        loop = asyncio.get_running_loop()
+        size = settings.EMBEDDING_PIPELINE_CHUNK if self.index.is_trained else len(documents)
+        chunks = iter([documents[i:i + size] for i in range(0, len(documents), size)])
+        in_flight = deque()
+        
+        def submit() -> bool:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            in_flight.append((chunk, loop.run_in_executor(None, self._encode, [doc.content for doc in chunk])))
+            return True
+        
+        while len(in_flight) < max(settings.EMBEDDING_PIPELINE_DEPTH, 1) and submit():
+            pass
+        while in_flight:
+            chunk, future = in_flight.popleft()
+            embeddings = await future
+            submit()
+            yield chunk, embeddings
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """L2-normalized embeddings, encoding each distinct text once
+        
+        encode() sorts its input by length before batching, so batches carry
+        little padding; duplicates are collapsed first and scattered back.
+        """
+        unique = dict.fromkeys(texts)
+        if self._mp_pool is not None and len(unique) > settings.EMBEDDING_MULTI_GPU_MIN_TEXTS:
+            embeddings = np.ascontiguousarray(self.model.encode_multi_process(
+                list(unique), self._mp_pool, batch_size=settings.EMBEDDING_BATCH_SIZE
+            ), dtype=np.float32)
+            # In place, in one SIMD pass
+            faiss.normalize_L2(embeddings)
+        else:
+            embeddings = self.model.encode(
+                list(unique),
+                batch_size=settings.EMBEDDING_BATCH_SIZE,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+            # fp16 models return float16; everything downstream works in float32
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if len(unique) == len(texts):
+            return embeddings
+        positions = {text: i for i, text in enumerate(unique)}
+        return embeddings[[positions[text] for text in texts]]
+    
     async def _generate_embeddings_async(self, texts: List[str]) -> np.ndarray:
-        """Generate embeddings asynchronously"""
+        """Generate L2-normalized embeddings asynchronously"""
         # Run embedding generation in thread pool to avoid blocking
         loop = asyncio.get_event_loop()
-        embeddings = await loop.run_in_executor(
-            None, 
-            self.model.encode, 
-            texts
-        )
+        embeddings = await loop.run_in_executor(None, self._encode, texts)
         return embeddings
     
-    async def search(self, query: str, k: int = 5, filter_metadata: Dict[str, Any] = None) -> List[SearchResult]:
+    async def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed several queries in a single model call, L2-normalized
+        
+        Recently seen queries come from an LRU cache; only the rest are encoded.
+        """
+        if settings.QUERY_EMBEDDING_CACHE_SIZE <= 0:
+            return await self._generate_embeddings_async(queries)
+        
+        keys = [(self.model_name, query) for query in queries]
+        cached = [self._query_cache.get(key) for key in keys]
+        missing = list(dict.fromkeys(key[1] for key, vector in zip(keys, cached) if vector is None))
+        if not missing:
+            return np.stack(cached)
+        
+        fresh = dict(zip(missing, await self._generate_embeddings_async(missing)))
+        for query, vector in fresh.items():
+            vector.setflags(write=False)
+            self._query_cache[(self.model_name, query)] = vector
+        return np.stack([
+            vector if vector is not None else fresh[query]
+            for query, vector in zip(queries, cached)
+        ])
+    
+    async def search(self, query: str, k: int = 5, filter_metadata: Dict[str, Any] = None,
+                     query_embedding: Optional[np.ndarray] = None) -> List[SearchResult]:
         """Search for similar documents"""
         if self.index.ntotal == 0:
             logger.warning("Vector index is empty")
             return []
         
-        # Generate query embedding
-        query_embedding = await self._generate_embeddings_async([query])
-        query_embedding = query_embedding / np.linalg.norm(query_embedding)
+        # Generate query embedding unless a precomputed one was passed in
+        if query_embedding is None:
+            query_embedding = await self.embed_queries([query])
+        else:
+            query_embedding = np.asarray(query_embedding).reshape(1, -1)
         
-        # Search in FAISS index
-        scores, indices = self.index.search(query_embedding.astype('float32'), min(k * 2, self.index.ntotal))
+        # Search the stored vectors; over-fetch only to leave room for post-filtering
+        fetch_k = min(k * 2 if filter_metadata else k, self.index.ntotal)
+        scores, indices = self._search_vectors(np.asarray(query_embedding, dtype=np.float32), fetch_k)
+        results = self._collect_results(scores[0], indices[0], k, filter_metadata)
         
+        logger.debug(f"Search for '{query}' returned {len(results)} results")
+        return results
+    
+    async def search_batch(self, queries: List[str], k: int = 5,
+                           query_embeddings: Optional[np.ndarray] = None) -> List[List[SearchResult]]:
+        """Search for several queries with a single call over the stacked embeddings"""
+        if self.index.ntotal == 0:
+            logger.warning("Vector index is empty")
+            return [[] for _ in queries]
+        
+        if query_embeddings is None:
+            query_embeddings = await self.embed_queries(queries)
+        query_embeddings = np.asarray(query_embeddings, dtype='float32').reshape(len(queries), -1)
+        
+        scores, indices = self._search_vectors(query_embeddings, min(k, self.index.ntotal))
+        return [
+            self._collect_results(row_scores, row_indices, k)
+            for row_scores, row_indices in zip(scores, indices)
+        ]
+    
+    def _collect_results(self, scores: np.ndarray, indices: np.ndarray, k: int,
+                         filter_metadata: Dict[str, Any] = None) -> List[SearchResult]:
+        """Turn one row of FAISS hits into up to k filtered SearchResults"""
+        matches = self._compile_filter(filter_metadata) if filter_metadata else None
         results = []
-        for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
+        for i, (score, idx) in enumerate(zip(scores, indices)):
             if idx == -1:  # FAISS returns -1 for invalid indices
                 continue
                 
             document = self.documents[idx]
             
             # Apply metadata filtering if specified
-            if filter_metadata:
-                if not self._matches_filter(document.metadata, filter_metadata):
-                    continue
+            if matches is not None and not matches(document.metadata):
+                continue
             
             results.append(SearchResult(
                 document=document,
@@ -138,23 +406,31 @@ class VectorSearchService:
             if len(results) >= k:
                 break
         
-        logger.debug(f"Search for '{query}' returned {len(results)} results")
         return results
     
-    def _matches_filter(self, metadata: Dict[str, Any], filter_criteria: Dict[str, Any]) -> bool:
-        """Check if document metadata matches filter criteria"""
-        for key, value in filter_criteria.items():
-            if key not in metadata:
-                return False
-            
-            if isinstance(value, list):
-                if metadata[key] not in value:
+    @staticmethod
+    def _compile_filter(filter_criteria: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+        """Predicate for filter criteria, resolved once per search
+        
+        A list value matches any of its items, anything else must be equal.
+        Built from closures rather than generated source, since criteria can
+        come from request data.
+        """
+        one_of = [(key, value) for key, value in filter_criteria.items() if isinstance(value, list)]
+        equal_to = [(key, value) for key, value in filter_criteria.items() if not isinstance(value, list)]
+        missing = object()
+        
+        def matches(metadata: Dict[str, Any]) -> bool:
+            for key, value in equal_to:
+                if metadata.get(key, missing) != value:
                     return False
-            else:
-                if metadata[key] != value:
+            for key, values in one_of:
+                found = metadata.get(key, missing)
+                if found is missing or found not in values:
                     return False
+            return True
         
-        return True
+        return matches
     
     async def search_with_reranking(self, query: str, k: int = 5, rerank_factor: int = 3) -> List[SearchResult]:
         """Search with reranking for better results"""
@@ -173,6 +449,7 @@ class VectorSearchService:
     async def _rerank_results(self, query: str, results: List[SearchResult]) -> List[SearchResult]:
         """Rerank search results using additional scoring"""
         # Simple reranking based on content length and metadata
+        query_lower = query.lower()
         for result in results:
             # Adjust score based on content quality indicators
             content_length_score = min(len(result.document.content) / 1000, 1.0)  # Normalize to 0-1
@@ -180,7 +457,7 @@ class VectorSearchService:
             # Boost score for certain metadata
             metadata_boost = 0.0
             if 'title' in result.document.metadata:
-                if query.lower() in result.document.metadata['title'].lower():
+                if query_lower in result.document.metadata['title'].lower():
                     metadata_boost += 0.1
             
             if 'entity_count' in result.document.metadata:
@@ -205,10 +482,11 @@ class VectorSearchService:
         
         return await self.search(query, k, filter_metadata)
     
-    async def hybrid_search(self, query: str, k: int = 5, alpha: float = 0.7) -> List[SearchResult]:
+    async def hybrid_search(self, query: str, k: int = 5, alpha: float = 0.7,
+                            query_embedding: Optional[np.ndarray] = None) -> List[SearchResult]:
         """Hybrid search combining semantic and keyword matching"""
         # Get semantic search results
-        semantic_results = await self.search(query, k * 2)
+        semantic_results = await self.search(query, k * 2, query_embedding=query_embedding)
         
         # Get keyword search results
         keyword_results = await self._keyword_search(query, k * 2)
@@ -222,67 +500,76 @@ class VectorSearchService:
         
         return combined_results[:k]
     
+    async def hybrid_search_batch(self, queries: List[str], k: int = 5, alpha: float = 0.7,
+                                  query_embeddings: Optional[np.ndarray] = None) -> List[List[SearchResult]]:
+        """hybrid_search for several queries, sharing one batched semantic search"""
+        semantic_batch = await self.search_batch(queries, k * 2, query_embeddings=query_embeddings)
+        
+        results = []
+        for query, semantic_results in zip(queries, semantic_batch):
+            keyword_results = await self._keyword_search(query, k * 2)
+            results.append(self._combine_search_results(semantic_results, keyword_results, alpha)[:k])
+        return results
+    
+    def _index_terms(self, start_index: int, documents: List[Document]):
+        """Add the terms of documents stored from start_index on to the postings"""
+        postings = self._postings
+        for i, document in enumerate(documents, start_index):
+            for term in set(_TOKEN_RE.findall(document.content.lower())):
+                term_postings = postings.get(term)
+                if term_postings is None:
+                    postings[term] = term_postings = array('i')
+                term_postings.append(i)
+    
     async def _keyword_search(self, query: str, k: int) -> List[SearchResult]:
-        """Simple keyword-based search"""
-        query_terms = query.lower().split()
-        scored_docs = []
+        """Keyword search: score is the fraction of query terms a document contains"""
+        query_terms = _TOKEN_RE.findall(query.lower())
+        if not query_terms or not self.documents or k <= 0:
+            return []
         
-        for i, document in enumerate(self.documents):
-            content_lower = document.content.lower()
-            
-            # Calculate keyword match score
-            matches = sum(1 for term in query_terms if term in content_lower)
-            if matches > 0:
-                score = matches / len(query_terms)
-                scored_docs.append(SearchResult(
-                    document=document,
-                    score=score,
-                    rank=i
-                ))
-        
-        # Sort by score and return top k
-        scored_docs.sort(key=lambda x: x.score, reverse=True)
-        return scored_docs[:k]
+        # Each document appears once per term's postings, so plain fancy-index adds are exact
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        for term in query_terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                scores[np.frombuffer(postings, dtype=np.int32)] += 1
+        
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+            matched.sort()
+        # Highest score first, ties in document order
+        matched = matched[np.argsort(-scores[matched], kind='stable')]
+        
+        return [
+            SearchResult(
+                document=self.documents[i],
+                score=float(scores[i]) / len(query_terms),
+                rank=int(i)
+            )
+            for i in matched
+        ]
     
     def _combine_search_results(self, semantic_results: List[SearchResult], 
                                keyword_results: List[SearchResult], 
                                alpha: float) -> List[SearchResult]:
-        """Combine semantic and keyword search results"""
-        # Create a mapping of document ID to results
-        doc_scores = {}
-        
-        # Add semantic scores
-        for result in semantic_results:
-            doc_id = result.document.id
-            doc_scores[doc_id] = {
-                'document': result.document,
-                'semantic_score': result.score,
-                'keyword_score': 0.0
-            }
-        
-        # Add keyword scores
+        """Combine semantic and keyword search results
+        
+        Works on the handful of candidates a hybrid search returns: one dict
+        of [document, partial score] in first-seen order, then one sort.
+        """
+        combined = {
+            result.document.id: [result.document, alpha * result.score]
+            for result in semantic_results
+        }
         for result in keyword_results:
-            doc_id = result.document.id
-            if doc_id in doc_scores:
-                doc_scores[doc_id]['keyword_score'] = result.score
-            else:
-                doc_scores[doc_id] = {
-                    'document': result.document,
-                    'semantic_score': 0.0,
-                    'keyword_score': result.score
-                }
-        
-        # Calculate combined scores
-        combined_results = []
-        for doc_id, scores in doc_scores.items():
-            combined_score = (alpha * scores['semantic_score'] + 
-                            (1 - alpha) * scores['keyword_score'])
-            
-            combined_results.append(SearchResult(
-                document=scores['document'],
-                score=combined_score,
-                rank=0  # Will be set after sorting
-            ))
+            entry = combined.setdefault(result.document.id, [result.document, 0.0])
+            entry[1] += (1 - alpha) * result.score
+        
+        combined_results = [
+            SearchResult(document=document, score=score, rank=0)
+            for document, score in combined.values()
+        ]
         
         # Sort by combined score and update ranks
         combined_results.sort(key=lambda x: x.score, reverse=True)
@@ -291,30 +578,75 @@ class VectorSearchService:
         
         return combined_results
     
+    def _snapshot_store(self) -> Tuple[bytes, List[Document], np.ndarray]:
+        """Serialized index, documents and embeddings as of now, for _write_store
+        
+        Taken on the event loop so documents added while the files are being
+        written can't leave them out of step with each other.
+        """
+        cpu_index = faiss.index_gpu_to_cpu(self.index) if self._on_gpu else self.index
+        index_bytes = faiss.serialize_index(cpu_index).tobytes()
+        documents = list(self.documents)
+        # Rows below the count are never rewritten, so the slice stays valid
+        return index_bytes, documents, self._vectors[:self._vector_count]
+    
+    def _write_store(self, index_bytes: bytes, documents: List[Document], embeddings: np.ndarray):
+        """Write the index, documents (Parquet) and embeddings (.npy); runs in an executor
+        
+        Files are written under temporary names and swapped in, so a store
+        that is currently memory-mapped is never truncated underneath it.
+        """
+        index_file = self.index_path / "index.faiss"
+        index_file.with_suffix('.tmp').write_bytes(index_bytes)
+        os.replace(index_file.with_suffix('.tmp'), index_file)
+        
+        table = pa.table({
+            'id': [doc.id for doc in documents],
+            'content': [doc.content for doc in documents],
+            'metadata': [json.dumps(doc.metadata, default=str) for doc in documents]
+        })
+        documents_file = self.index_path / "documents.parquet"
+        pq.write_table(table, documents_file.with_suffix('.tmp'))
+        os.replace(documents_file.with_suffix('.tmp'), documents_file)
+        
+        embeddings_file = self.index_path / "embeddings.npy"
+        with open(embeddings_file.with_suffix('.tmp'), 'wb') as f:
+            np.save(f, embeddings)
+        os.replace(embeddings_file.with_suffix('.tmp'), embeddings_file)
+    
+    def _read_store(self) -> Tuple[List[Document], np.ndarray]:
+        """Documents from the Parquet store and the embedding matrix, memory-mapped from disk"""
+        columns = pq.read_table(self.index_path / "documents.parquet").to_pydict()
+        embeddings = np.load(self.index_path / "embeddings.npy", mmap_mode='r')
+        documents = [
+            Document(id=doc_id, content=content, metadata=json.loads(metadata))
+            for doc_id, content, metadata in zip(columns['id'], columns['content'], columns['metadata'])
+        ]
+        return documents, embeddings
+    
+    async def _read_legacy_store(self, metadata_file: Path) -> Tuple[List[Document], np.ndarray]:
+        """Documents and embeddings from a metadata.pkl written by older versions"""
+        async with aiofiles.open(metadata_file, 'rb') as f:
+            metadata = pickle.loads(await f.read())
+        
+        documents = []
+        embeddings = []
+        for doc_dict in metadata['documents']:
+            embeddings.append(doc_dict.pop('embedding'))
+            documents.append(Document(**doc_dict))
+        if not embeddings:
+            return documents, np.empty((0, self.dimension), dtype=np.float32)
+        return documents, np.array(embeddings, dtype=np.float32)
+    
     async def save_index(self):
         """Save FAISS index and metadata to disk"""
         try:
-            # Save FAISS index
-            index_file = self.index_path / "index.faiss"
-            faiss.write_index(self.index, str(index_file))
-            
-            # Save documents and metadata
-            metadata_file = self.index_path / "metadata.pkl"
-            async with aiofiles.open(metadata_file, 'wb') as f:
-                # Convert documents to serializable format
-                serializable_docs = []
-                for doc in self.documents:
-                    doc_dict = asdict(doc)
-                    if doc_dict['embedding'] is not None:
-                        doc_dict['embedding'] = doc_dict['embedding'].tolist()
-                    serializable_docs.append(doc_dict)
-                
-                await f.write(pickle.dumps({
-                    'documents': serializable_docs,
-                    'id_to_index': self.id_to_index,
-                    'model_name': self.model_name,
-                    'dimension': self.dimension
-                }))
+            # Save FAISS index, documents and embeddings; only the in-memory
+            # snapshot is taken on the event loop, the file I/O runs in the executor
+            await asyncio.get_running_loop().run_in_executor(None, self._write_store, *self._snapshot_store())
+            legacy_file = self.index_path / "metadata.pkl"
+            if legacy_file.exists():
+                legacy_file.unlink()
             
             # Save configuration
             config_file = self.index_path / "config.json"
@@ -322,7 +654,7 @@ class VectorSearchService:
                 'model_name': self.model_name,
                 'dimension': self.dimension,
                 'total_documents': len(self.documents),
-                'index_type': 'IndexFlatIP',
+                'index_type': self.index_factory,
                 'created_at': str(asyncio.get_event_loop().time())
             }
             
@@ -339,33 +671,46 @@ class VectorSearchService:
         """Load FAISS index and metadata from disk"""
         try:
             index_file = self.index_path / "index.faiss"
-            metadata_file = self.index_path / "metadata.pkl"
+            documents_file = self.index_path / "documents.parquet"
+            legacy_file = self.index_path / "metadata.pkl"
             
-            if not (index_file.exists() and metadata_file.exists()):
+            if not (index_file.exists() and (documents_file.exists() or legacy_file.exists())):
                 logger.info("No existing vector index found")
                 return False
             
             # Load FAISS index
-            self.index = faiss.read_index(str(index_file))
+            index = await asyncio.get_running_loop().run_in_executor(None, faiss.read_index, str(index_file))
+            self.index = self._prepare_index(index)
+            
+            config_file = self.index_path / "config.json"
+            config = {}
+            if config_file.exists():
+                async with aiofiles.open(config_file, 'r') as f:
+                    config = json.loads(await f.read())
             
-            # Load metadata
-            async with aiofiles.open(metadata_file, 'rb') as f:
-                content = await f.read()
-                metadata = pickle.loads(content)
+            # Restore documents; positions in the list are FAISS ids
+            if documents_file.exists():
+                self.documents, vectors = await asyncio.get_running_loop().run_in_executor(None, self._read_store)
+            else:
+                self.documents, vectors = await self._read_legacy_store(legacy_file)
+            self._set_vectors(vectors)
             
-            # Restore documents
-            self.documents = []
-            for doc_dict in metadata['documents']:
-                if doc_dict['embedding'] is not None:
-                    doc_dict['embedding'] = np.array(doc_dict['embedding'])
-                
-                self.documents.append(Document(**doc_dict))
+            self.id_to_index = {doc.id: i for i, doc in enumerate(self.documents)}
+            self._postings = {}
+            self._index_terms(0, self.documents)
             
-            self.id_to_index = metadata['id_to_index']
+            # Indexes saved as another type (or before the type was recorded) are
+            # rebuilt from the stored embeddings
+            saved_type = config.get('index_type')
+            if saved_type != self.index_factory and self.documents:
+                logger.info(f"Rebuilding vector index as {self.index_factory} (saved as {saved_type})")
+                self.index = self._create_index()
+                self._add_to_index(vectors)
             
             # Verify model compatibility
-            if metadata['model_name'] != self.model_name:
-                logger.warning(f"Model mismatch: saved={metadata['model_name']}, current={self.model_name}")
+            saved_model = config.get('model_name', self.model_name)
+            if saved_model != self.model_name:
+                logger.warning(f"Model mismatch: saved={saved_model}, current={self.model_name}")
             
             logger.info(f"Loaded vector index with {len(self.documents)} documents")
             return True
@@ -374,6 +719,14 @@ class VectorSearchService:
             logger.error(f"Failed to load vector index: {e}")
             return False
     
+    def _bytes_per_vector(self) -> int:
+        """Size of one stored vector code (graph links and IVF lists not included)"""
+        index = faiss.downcast_index(self.index)
+        storage = getattr(index, 'storage', None)
+        if storage is not None:
+            index = faiss.downcast_index(storage)
+        return getattr(index, 'code_size', self.dimension * 4)
+    
     async def get_statistics(self) -> Dict[str, Any]:
         """Get vector search statistics"""
         return {
@@ -381,11 +734,23 @@ class VectorSearchService:
             'index_size': self.index.ntotal,
             'dimension': self.dimension,
             'model_name': self.model_name,
+            'device': self.device,
+            'embedding_backend': self.embedding_backend,
             'index_type': type(self.index).__name__,
-            'memory_usage_mb': self.index.ntotal * self.dimension * 4 / (1024 * 1024)  # Approximate
+            'bytes_per_vector': self._bytes_per_vector(),
+            'memory_usage_mb': self.index.ntotal * self._bytes_per_vector() / (1024 * 1024)  # Approximate
         }
     
     async def close(self):
         """Cleanup resources"""
+        if self._embed_worker is not None:
+            # Index what is still queued before saving
+            if not self._embed_worker.done():
+                await self._embed_queue.join()
+            self._embed_worker.cancel()
+            self._embed_worker = None
         await self.save_index()
+        if self._mp_pool is not None:
+            SentenceTransformer.stop_multi_process_pool(self._mp_pool)
+            self._mp_pool = None
         logger.info("Vector search service closed")
\ No newline at end of file